@@ -10,11 +10,12 @@ import sys
 import logging
 from typing import Optional, List, Dict, Any
 from datetime import datetime
+import json
 import uuid
 
 from fastapi import FastAPI, HTTPException, Query, Depends, Path
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 import uvicorn
 
 # Add project root to path
@@ -25,6 +26,7 @@ from chat_engine import get_chat_engine, RAGChatEngine
 
 # Use MongoDB retriever instead of mock data retriever
 from mongodb_retriever import MongoDBDocumentRetriever as DocumentRetriever
+from mongodb_client_registry import get_client_registry
 from schemas import (
     RAGChatRequest,
     RAGChatResponse,
@@ -94,7 +96,8 @@ async def _process_chat_request(
             logger.info(f"Processing standalone chat: {log_query}")
 
         # Process chat với chat engine - KHÔNG modify request.conversation_id
-        response = chat_engine.chat(request, effective_conversation_id)
+        # (async path: không block event loop trong lúc embed/search/LLM call)
+        response = await chat_engine.achat(request, effective_conversation_id)
 
         # Log success với debug info
         logger.info(f"=== CHAT RESPONSE DEBUG ===")
@@ -121,7 +124,9 @@ def get_retriever_instance() -> DocumentRetriever:
     """Get document retriever instance."""
     global _retriever
     if _retriever is None:
-        _retriever = DocumentRetriever()
+        # Live indexing: apply MongoDB changes in background thay vì rebuild
+        auto_refresh = os.getenv("RAG_AUTO_REFRESH", "true").lower() == "true"
+        _retriever = DocumentRetriever(auto_refresh=auto_refresh)
         _retriever.initialize()
     return _retriever
 
@@ -136,6 +141,18 @@ def get_chat_engine_instance() -> RAGChatEngine:
     return _chat_engine
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background watcher, close conversation store và MongoDB connections."""
+    if _retriever is not None:
+        _retriever.close()
+    if _chat_engine is not None:
+        if _chat_engine.summarizer is not None:
+            _chat_engine.summarizer.close()
+        _chat_engine.conversation_store.close()
+    get_client_registry().close_all()
+
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -236,6 +253,47 @@ async def chat_with_rag(
     )
 
 
+@app.post(
+    "/chat/stream",
+    summary="Streaming Chat Endpoint",
+    description="""
+          **Streaming version của /chat (Server-Sent Events).**
+          
+          Giảm time-to-first-byte: client nhận sources ngay sau retrieval,
+          sau đó từng token của câu trả lời trong lúc LLM đang generate.
+          
+          **Events:**
+          - `sources`: conversation_id, context và retrieved documents
+          - `token`: `{"text": "..."}` - một phần câu trả lời
+          - `done`: processing_time, metadata (conversation đã được lưu)
+          - `error`: error message
+          
+          Conversation handling giống /chat (tự tạo conversation_id nếu không có).
+          """,
+)
+async def chat_stream(
+    request: RAGChatRequest,
+    chat_engine: RAGChatEngine = Depends(get_chat_engine_instance),
+):
+    """Streaming chat endpoint (SSE)."""
+    if not request.conversation_id:
+        request.conversation_id = str(uuid.uuid4())
+        logger.info(
+            f"🆕 New Chat (stream) - Auto-generated conversation ID: {request.conversation_id}"
+        )
+
+    async def event_stream():
+        async for event in chat_engine.astream_chat(request, request.conversation_id):
+            payload = json.dumps(event["data"], ensure_ascii=False)
+            yield f"event: {event['event']}\ndata: {payload}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post(
     "/chat/quick",
     summary="Quick Anonymous Chat",
@@ -357,7 +415,7 @@ async def get_conversation(
 ):
     """Get conversation history by ID."""
     try:
-        conversation = chat_engine.get_conversation(conversation_id)
+        conversation = await chat_engine.aget_conversation(conversation_id)
         if not conversation:
             raise HTTPException(status_code=404, detail="Conversation not found")
         return conversation
@@ -374,16 +432,22 @@ async def list_conversations(
     limit: int = Query(
         default=20, description="Maximum conversations to return", ge=1, le=100
     ),
+    cursor: Optional[str] = Query(
+        default=None, description="next_cursor from the previous page"
+    ),
     chat_engine: RAGChatEngine = Depends(get_chat_engine_instance),
 ):
-    """List recent conversations."""
+    """List recent conversations (newest first, cursor-paginated, without messages)."""
     try:
-        conversations = chat_engine.list_conversations(limit=limit)
+        conversations, next_cursor = await chat_engine.alist_conversations(
+            limit=limit, cursor=cursor
+        )
 
         return ConversationListResponse(
             conversations=conversations,
             total=len(conversations),
-            has_more=False,  # Simple implementation
+            has_more=next_cursor is not None,
+            next_cursor=next_cursor,
         )
 
     except Exception as e:
@@ -397,7 +461,7 @@ async def delete_conversation(
 ):
     """Delete conversation by ID."""
     try:
-        success = chat_engine.delete_conversation(conversation_id)
+        success = await chat_engine.adelete_conversation(conversation_id)
         if not success:
             raise HTTPException(status_code=404, detail="Conversation not found")
 
@@ -420,25 +484,30 @@ async def search_documents(
     ),
     topic: Optional[str] = Query(default=None, description="Filter by topic"),
     category: Optional[str] = Query(default=None, description="Filter by category"),
+    mode: str = Query(
+        default="vector",
+        description="Retrieval mode: vector, lexical or hybrid",
+        pattern="^(vector|lexical|hybrid)$",
+    ),
     retriever: DocumentRetriever = Depends(get_retriever_instance),
 ):
     """
-    Search documents sử dụng vector similarity.
+    Search documents sử dụng vector similarity, BM25 hoặc hybrid (RRF).
 
     Return relevant document chunks với similarity scores.
     """
     try:
-        # Create retrieval config
+        # Create retrieval config (filters are applied inside the vector search)
         config = RetrievalConfig(
-            top_k=top_k, similarity_threshold=threshold, topic_filter=topic
+            top_k=top_k,
+            similarity_threshold=threshold,
+            topic_filter=topic,
+            category_filter=category,
+            retrieval_mode=mode,
         )
 
         # Search documents
-        results = retriever.retrieve_documents(query, config)
-
-        # Filter by category if specified
-        if category:
-            results = [r for r in results if r.category.lower() == category.lower()]
+        results = await retriever.aretrieve_documents(query, config)
 
         return {
             "query": query,
@@ -449,6 +518,7 @@ async def search_documents(
                 "threshold": threshold,
                 "topic_filter": topic,
                 "category_filter": category,
+                "retrieval_mode": mode,
             },
         }
 
@@ -508,8 +578,9 @@ async def get_filter_options(
 ):
     """Get all available filter options."""
     try:
-        topics = retriever.list_all_topics()
-        categories = retriever.list_all_categories()
+        facets = retriever.get_filter_options()
+        topics = facets["topics"]
+        categories = facets["categories"]
 
         return {
             "topics": topics,
@@ -555,9 +626,15 @@ async def rebuild_search_index(
     retriever: DocumentRetriever = Depends(get_retriever_instance),
 ):
     """Rebuild FAISS search index từ source data."""
+    if retriever.read_only:
+        raise HTTPException(
+            status_code=409,
+            detail="Index is served read-only (RAG_READ_ONLY_INDEX=true)",
+        )
+
     try:
         logger.info("Rebuilding search index...")
-        retriever.rebuild_index()
+        await retriever.arebuild_index()
 
         stats = retriever.get_stats()
 
@@ -1,10 +1,16 @@
 import os
+import asyncio
 import logging
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
 from datetime import datetime
 import json
 from mongodb_retriever import MongoDBDocumentRetriever as DocumentRetriever
-from llm_adapter import GeminiChatAdapter
+from llm_adapter import FAILURE_MESSAGE, GeminiChatAdapter
+from response_cache import SemanticResponseCache
+from reranker import CrossEncoderReranker
+from conversation_store import ConversationStore, create_conversation_store
+from context_packer import ContextPacker
+from conversation_summarizer import ConversationSummarizer, summary_message
 from schemas import (
     RAGChatRequest,
     RAGChatResponse,
@@ -24,6 +30,11 @@ class RAGChatEngine:
         self,
         retriever: Optional[DocumentRetriever] = None,
         llm_adapter: Optional[GeminiChatAdapter] = None,
+        response_cache: Optional[SemanticResponseCache] = None,
+        reranker: Optional[CrossEncoderReranker] = None,
+        conversation_store: Optional[ConversationStore] = None,
+        context_packer: Optional[ContextPacker] = None,
+        summarizer: Optional[ConversationSummarizer] = None,
     ):
         """
         Initialize RAG chat engine.
@@ -31,12 +42,50 @@ class RAGChatEngine:
         Args:
             retriever: Document retriever instance
             llm_adapter: LLM adapter for chat generation
+            response_cache: Optional semantic answer cache
+                (default: enabled by RAG_RESPONSE_CACHE=true)
+            reranker: Cross-encoder used when RetrievalConfig.rerank is set
+                (model loaded on first use)
+            conversation_store: Conversation history storage (default:
+                RAG_CONVERSATION_BACKEND env, LRU-cached SQLite or MongoDB)
+            context_packer: Fits history + sources into
+                ChatConfig.max_context_tokens
+            summarizer: Rolling summaries of long conversations
+                (default: enabled unless RAG_CONVERSATION_SUMMARY=false)
         """
         self.retriever = retriever or DocumentRetriever()
         self.llm_adapter = llm_adapter or GeminiChatAdapter()
-
-        # Conversation storage (in-memory, có thể migrate to DB)
-        self.conversations: Dict[str, ConversationHistory] = {}
+        self.reranker = reranker or CrossEncoderReranker()
+
+        # Semantic answer cache (opt-in) cho câu hỏi FAQ lặp lại
+        if response_cache is None and (
+            os.getenv("RAG_RESPONSE_CACHE", "false").lower() == "true"
+        ):
+            response_cache = SemanticResponseCache(
+                max_entries=int(os.getenv("RAG_RESPONSE_CACHE_SIZE", "256")),
+                similarity_threshold=float(
+                    os.getenv("RAG_RESPONSE_CACHE_THRESHOLD", "0.95")
+                ),
+            )
+        self.response_cache = response_cache
+
+        # Conversation storage: bounded hot cache + durable backend
+        self.conversation_store = conversation_store or create_conversation_store()
+
+        # Token budget split between history and merged source chunks
+        self.context_packer = context_packer or ContextPacker()
+
+        # Older messages are replaced by a background-computed summary
+        if (
+            summarizer is None
+            and os.getenv("RAG_CONVERSATION_SUMMARY", "true").lower() == "true"
+            # Canned answers are no summary
+            and not getattr(self.llm_adapter, "use_canned_responses", False)
+        ):
+            summarizer = ConversationSummarizer(
+                self.llm_adapter, token_counter=self.context_packer.count_tokens
+            )
+        self.summarizer = summarizer
 
     def initialize(self, force_rebuild_index: bool = False) -> None:
         """Initialize all components."""
@@ -60,141 +109,486 @@ class RAGChatEngine:
         start_time = datetime.now()
 
         try:
-            # Debug log
-            logger.info(f"=== CHAT ENGINE DEBUG ===")
-            logger.info(f"Query: '{request.query}'")
-            logger.info(f"Conversation ID: {conversation_id}")
-            logger.info(f"Retrieval config: {request.retrieval_config}")
+            self._log_request(request, conversation_id)
 
-            # 1. Retrieve relevant documents
+            # 1. Retrieve relevant documents (+ optional re-ranking)
             retrieved_docs = self.retriever.retrieve_documents(
-                query=request.query, config=request.retrieval_config
+                query=request.query, config=self._get_candidate_config(request)
             )
+            retrieved_docs, retrieval_metadata = self._rerank(request, retrieved_docs)
 
-            logger.info(f"Retrieved {len(retrieved_docs)} documents")
-            for i, doc in enumerate(retrieved_docs):
-                logger.info(
-                    f"  Doc {i+1}: {doc.topic} (score: {doc.similarity_score:.3f})"
-                )
+            # 2. Build token-budgeted context + semantic cache lookup
+            history = self._get_conversation_history(
+                conversation_id, request.chat_config
+            )
+            context, cache_args, cached_response = self._prepare_chat(
+                request,
+                retrieved_docs,
+                conversation_id,
+                start_time,
+                retrieval_metadata,
+                history,
+            )
+            if cached_response:
+                return cached_response
+
+            # 3-4. Generate response sử dụng LLM (với conversation history)
+            messages = self._build_messages(request, context, history)
+            llm_response = self.llm_adapter.generate_response(
+                messages, request.chat_config
+            )
+
+            # 5-6. Store conversation và build response
+            return self._finalize_chat(
+                request,
+                conversation_id,
+                retrieved_docs,
+                context,
+                llm_response,
+                cache_args,
+                start_time,
+                retrieval_metadata,
+            )
 
-            # 2. Build context từ retrieved documents
-            context = self._build_context(retrieved_docs, request.chat_config)
+        except Exception as e:
+            logger.error(f"Error processing chat request: {e}")
+            return self._build_error_response(e, conversation_id, start_time)
+
+    async def achat(
+        self, request: RAGChatRequest, conversation_id: Optional[str] = None
+    ) -> RAGChatResponse:
+        """
+        Async version of chat() cho FastAPI endpoints.
 
-            # 3. Get conversation history if available
-            conversation_history = self._get_conversation_history(conversation_id)
+        Embedding + FAISS search chạy trên bounded executor của retriever,
+        Gemini call dùng async I/O, nên event loop không bị block.
 
-            # 4. Generate response sử dụng LLM
-            llm_response = self._generate_response(
-                query=request.query,
-                context=context,
-                conversation_history=conversation_history,
-                config=request.chat_config,
+        Args:
+            request: Chat request với query và configs
+            conversation_id: Optional conversation ID for context
+
+        Returns:
+            Chat response with answer và context
+        """
+        start_time = datetime.now()
+
+        try:
+            self._log_request(request, conversation_id)
+
+            # 1. Retrieve relevant documents (off the event loop)
+            retrieved_docs, retrieval_metadata = await self._aretrieve(request)
+
+            # 2. Build token-budgeted context + semantic cache lookup
+            history = await self._aget_conversation_history(
+                conversation_id, request.chat_config
+            )
+            context, cache_args, cached_response = self._prepare_chat(
+                request,
+                retrieved_docs,
+                conversation_id,
+                start_time,
+                retrieval_metadata,
+                history,
             )
+            if cached_response:
+                return cached_response
 
-            # 5. Store conversation
-            if conversation_id:
-                self._update_conversation(conversation_id, request.query, llm_response)
-
-            # 6. Build response
-            response = RAGChatResponse(
-                answer=llm_response,
-                context=context,
-                conversation_id=conversation_id,
-                timestamp=start_time.isoformat(),
-                processing_time=(datetime.now() - start_time).total_seconds(),
-                retrieved_documents=[doc.model_dump() for doc in retrieved_docs],
+            # 3-4. Generate response sử dụng LLM (async)
+            messages = self._build_messages(request, context, history)
+            llm_response = await self.llm_adapter.agenerate_response(
+                messages, request.chat_config
             )
 
-            logger.info(f"Chat processed in {response.processing_time:.2f}s")
-            return response
+            # 5-6. Store conversation (off the event loop) và build response
+            return await asyncio.get_running_loop().run_in_executor(
+                None,
+                self._finalize_chat,
+                request,
+                conversation_id,
+                retrieved_docs,
+                context,
+                llm_response,
+                cache_args,
+                start_time,
+                retrieval_metadata,
+            )
 
         except Exception as e:
             logger.error(f"Error processing chat request: {e}")
+            return self._build_error_response(e, conversation_id, start_time)
 
-            # Return error response
-            return RAGChatResponse(
-                answer=f"Xin lỗi, đã có lỗi xảy ra khi xử lý câu hỏi của bạn: {str(e)}",
-                context=ConversationContext(
-                    retrieved_count=0, context_used=False, sources=[]
-                ),
-                conversation_id=conversation_id,
-                timestamp=start_time.isoformat(),
-                processing_time=(datetime.now() - start_time).total_seconds(),
-                retrieved_documents=[],
+    async def astream_chat(
+        self, request: RAGChatRequest, conversation_id: Optional[str] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream chat response: sources trước, sau đó từng token từ LLM.
+
+        Conversation được lưu (via _update_conversation) khi stream hoàn tất.
+
+        Args:
+            request: Chat request với query và configs
+            conversation_id: Optional conversation ID for context
+
+        Yields:
+            Events {"event": "sources" | "token" | "done" | "error", "data": {...}}
+        """
+        start_time = datetime.now()
+
+        try:
+            self._log_request(request, conversation_id)
+
+            # 1. Retrieve relevant documents (off the event loop)
+            retrieved_docs, retrieval_metadata = await self._aretrieve(request)
+
+            # 2. Build token-budgeted context + semantic cache lookup
+            history = await self._aget_conversation_history(
+                conversation_id, request.chat_config
+            )
+            context, cache_args, cached_response = self._prepare_chat(
+                request,
+                retrieved_docs,
+                conversation_id,
+                start_time,
+                retrieval_metadata,
+                history,
             )
 
-    def _build_context(
-        self, retrieved_docs: List, config: ChatConfig
-    ) -> ConversationContext:
-        """Build context object từ retrieved documents."""
-        if not retrieved_docs:
-            return ConversationContext(
-                retrieved_count=0, context_used=False, sources=[]
+            yield {
+                "event": "sources",
+                "data": {
+                    "conversation_id": conversation_id,
+                    "context": context.model_dump(),
+                    "retrieved_documents": [doc.model_dump() for doc in retrieved_docs],
+                },
+            }
+
+            if cached_response:
+                yield {"event": "token", "data": {"text": cached_response.answer}}
+                yield {
+                    "event": "done",
+                    "data": {
+                        "conversation_id": conversation_id,
+                        "processing_time": cached_response.processing_time,
+                        "metadata": cached_response.metadata,
+                    },
+                }
+                return
+
+            # 3-4. Stream response từ LLM
+            messages = self._build_messages(request, context, history)
+            answer_parts = []
+            async for text in self.llm_adapter.astream_response(
+                messages, request.chat_config
+            ):
+                answer_parts.append(text)
+                yield {"event": "token", "data": {"text": text}}
+
+            # 5-6. Store conversation sau khi stream hoàn tất
+            response = await asyncio.get_running_loop().run_in_executor(
+                None,
+                self._finalize_chat,
+                request,
+                conversation_id,
+                retrieved_docs,
+                context,
+                "".join(answer_parts).strip(),
+                cache_args,
+                start_time,
+                retrieval_metadata,
             )
+            yield {
+                "event": "done",
+                "data": {
+                    "conversation_id": conversation_id,
+                    "processing_time": response.processing_time,
+                    "metadata": response.metadata,
+                },
+            }
 
-        # Collect sources
-        sources = []
-        context_text_parts = []
+        except Exception as e:
+            logger.error(f"Error streaming chat request: {e}")
+            yield {
+                "event": "error",
+                "data": {
+                    "conversation_id": conversation_id,
+                    "message": f"Xin lỗi, đã có lỗi xảy ra khi xử lý câu hỏi của bạn: {str(e)}",
+                },
+            }
 
-        for doc in retrieved_docs[: config.max_context_docs]:
-            # Add to sources
-            sources.append(
-                {
-                    "document_id": doc.document_id,
-                    "topic": doc.topic,
-                    "category": doc.category,
-                    "similarity_score": doc.similarity_score,
-                    "chunk_text": (
-                        getattr(doc, "chunk_text", doc.content or "")[:200] + "..."
-                        if len(getattr(doc, "chunk_text", doc.content or "")) > 200
-                        else getattr(doc, "chunk_text", doc.content or "")
+    def _log_request(
+        self, request: RAGChatRequest, conversation_id: Optional[str]
+    ) -> None:
+        """Debug log cho chat request."""
+        logger.info(f"=== CHAT ENGINE DEBUG ===")
+        logger.info(f"Query: '{request.query}'")
+        logger.info(f"Conversation ID: {conversation_id}")
+        logger.info(f"Retrieval config: {request.retrieval_config}")
+
+    def _get_candidate_config(self, request: RAGChatRequest) -> RetrievalConfig:
+        """Retrieval config, over-fetching candidates when re-ranking is enabled."""
+        config = request.retrieval_config
+        if not config.rerank:
+            return config
+        return config.model_copy(
+            update={"top_k": max(config.top_k, config.rerank_candidates)}
+        )
+
+    def _rerank(
+        self, request: RAGChatRequest, candidates: List
+    ) -> Tuple[List, Optional[Dict[str, Any]]]:
+        """
+        Re-rank over-fetched candidates và keep the best for the context.
+
+        Returns:
+            (documents, retrieval_metadata) - metadata has re-rank timings
+        """
+        config = request.retrieval_config
+        if not config.rerank:
+            return candidates, None
+
+        keep = min(config.top_k, request.chat_config.max_context_docs)
+        try:
+            documents, timings = self.reranker.rerank(
+                request.query, candidates, keep, budget_ms=config.rerank_budget_ms
+            )
+        except Exception as e:
+            # Re-ranking is an optimization: fall back to retrieval order
+            logger.warning(f"Rerank failed, keeping retrieval order: {e}")
+            return candidates[:keep], {"rerank": {"error": str(e)}}
+
+        logger.info(f"Rerank: {timings}")
+        return documents, {"rerank": timings}
+
+    async def _aretrieve(
+        self, request: RAGChatRequest
+    ) -> Tuple[List, Optional[Dict[str, Any]]]:
+        """Async retrieval + re-ranking (cross-encoder runs off the event loop)."""
+        candidates = await self.retriever.aretrieve_documents(
+            query=request.query, config=self._get_candidate_config(request)
+        )
+        if not request.retrieval_config.rerank:
+            return candidates, None
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._rerank, request, candidates)
+
+    def _prepare_chat(
+        self,
+        request: RAGChatRequest,
+        retrieved_docs: List,
+        conversation_id: Optional[str],
+        start_time: datetime,
+        retrieval_metadata: Optional[Dict[str, Any]] = None,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+    ) -> Tuple[
+        ConversationContext, Optional[Dict[str, Any]], Optional[RAGChatResponse]
+    ]:
+        """
+        Build context từ retrieved documents và check semantic cache.
+
+        Returns:
+            (context, cache_args, cached_response) - cached_response is set on
+            a semantic cache hit
+        """
+        logger.info(f"Retrieved {len(retrieved_docs)} documents")
+        for i, doc in enumerate(retrieved_docs):
+            logger.info(f"  Doc {i+1}: {doc.topic} (score: {doc.similarity_score:.3f})")
+
+        context = self._build_context(
+            retrieved_docs, request.chat_config, conversation_history
+        )
+
+        # Semantic cache: reuse answer of an equivalent standalone question
+        cache_args = self._get_response_cache_args(
+            request, retrieved_docs, conversation_id
+        )
+        if cache_args:
+            cached = self.response_cache.lookup(**cache_args)
+            if cached:
+                logger.info(f"Semantic cache hit (cached query: '{cached.query}')")
+                return (
+                    context,
+                    cache_args,
+                    RAGChatResponse(
+                        answer=cached.answer,
+                        context=context,
+                        conversation_id=conversation_id,
+                        timestamp=start_time.isoformat(),
+                        processing_time=(datetime.now() - start_time).total_seconds(),
+                        retrieved_documents=[doc.model_dump() for doc in retrieved_docs],
+                        metadata={**(retrieval_metadata or {}), "cache_hit": True},
                     ),
-                }
+                )
+
+        return context, cache_args, None
+
+    def _finalize_chat(
+        self,
+        request: RAGChatRequest,
+        conversation_id: Optional[str],
+        retrieved_docs: List,
+        context: ConversationContext,
+        llm_response: str,
+        cache_args: Optional[Dict[str, Any]],
+        start_time: datetime,
+        retrieval_metadata: Optional[Dict[str, Any]] = None,
+    ) -> RAGChatResponse:
+        """Store conversation / cached answer và build chat response."""
+        if conversation_id:
+            self._update_conversation(conversation_id, request.query, llm_response)
+        elif cache_args and llm_response != FAILURE_MESSAGE:
+            # The outage apology (all models failed / circuits open) would be
+            # served to every similar question until the TTL expires
+            self.response_cache.store(
+                query=request.query, answer=llm_response, **cache_args
             )
 
-            # Add to context text
-            chunk_text = getattr(doc, "chunk_text", doc.content)
-            context_text_parts.append(f"[{doc.topic}] {chunk_text}")
+        metadata = dict(retrieval_metadata or {})
+        if cache_args:
+            metadata["cache_hit"] = False
+
+        response = RAGChatResponse(
+            answer=llm_response,
+            context=context,
+            conversation_id=conversation_id,
+            timestamp=start_time.isoformat(),
+            processing_time=(datetime.now() - start_time).total_seconds(),
+            retrieved_documents=[doc.model_dump() for doc in retrieved_docs],
+            metadata=metadata or None,
+        )
+
+        logger.info(f"Chat processed in {response.processing_time:.2f}s")
+        return response
+
+    def _build_error_response(
+        self, error: Exception, conversation_id: Optional[str], start_time: datetime
+    ) -> RAGChatResponse:
+        """Build error response khi chat processing fails."""
+        return RAGChatResponse(
+            answer=f"Xin lỗi, đã có lỗi xảy ra khi xử lý câu hỏi của bạn: {str(error)}",
+            context=ConversationContext(
+                retrieved_count=0, context_used=False, sources=[]
+            ),
+            conversation_id=conversation_id,
+            timestamp=start_time.isoformat(),
+            processing_time=(datetime.now() - start_time).total_seconds(),
+            retrieved_documents=[],
+        )
+
+    def _get_response_cache_args(
+        self,
+        request: RAGChatRequest,
+        retrieved_docs: List,
+        conversation_id: Optional[str],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Build semantic cache lookup arguments.
+
+        Returns None when the cache is disabled or bypassed (conversations
+        depend on history, so only standalone questions are cached).
+        """
+        if self.response_cache is None or conversation_id:
+            return None
+
+        vector_store = self.retriever.vector_store
+        return {
+            "query_vector": vector_store.embed_query(request.query),
+            "source_ids": [doc.chunk_id for doc in retrieved_docs],
+            "config_key": request.chat_config.model_dump_json(),
+            "index_version": vector_store.index_version,
+        }
+
+    def _build_context(
+        self,
+        retrieved_docs: List,
+        config: ChatConfig,
+        conversation_history: Optional[List[Dict[str, str]]] = None,
+    ) -> ConversationContext:
+        """
+        Build context object từ retrieved documents.
+
+        Sources get max_context_tokens minus the tokens used by history;
+        chunks of one document are merged and redundant chunks dropped.
+        """
+        history_tokens = self.context_packer.count_message_tokens(
+            conversation_history
+        )
+        if not retrieved_docs:
+            return ConversationContext(
+                retrieved_count=0,
+                context_used=False,
+                sources=[],
+                context_tokens=history_tokens,
+            )
+
+        packed = self.context_packer.pack_sources(
+            retrieved_docs[: config.max_context_docs],
+            config.max_context_tokens - history_tokens,
+        )
+        logger.info(
+            f"📦 Packed context: {packed.tokens} source + {history_tokens} history "
+            f"tokens (budget {config.max_context_tokens}), "
+            f"{packed.merged_chunks} merged, {packed.dropped_chunks} dropped"
+        )
 
         return ConversationContext(
             retrieved_count=len(retrieved_docs),
-            context_used=len(sources) > 0,
-            sources=sources,
-            context_text=(
-                "\n\n".join(context_text_parts) if context_text_parts else None
-            ),
+            context_used=len(packed.sources) > 0,
+            sources=packed.sources,
+            context_text=packed.context_text,
+            context_tokens=packed.tokens + history_tokens,
         )
 
     def _get_conversation_history(
-        self, conversation_id: Optional[str]
+        self, conversation_id: Optional[str], config: ChatConfig
     ) -> Optional[List[Dict[str, str]]]:
-        """Get conversation history for context."""
-        if not conversation_id or conversation_id not in self.conversations:
+        """
+        Conversation summary + recent messages within the history token budget.
+
+        Messages covered by the rolling summary are not sent again.
+        """
+        if not conversation_id:
             return None
 
-        history = self.conversations[conversation_id]
+        conversation = self.conversation_store.get(conversation_id)
+        if conversation is None:
+            return None
 
-        # Return recent messages for context (limit to avoid token overflow)
-        recent_messages = history.messages[-6:]  # Last 6 messages (3 exchanges)
+        history = []
+        budget = self.context_packer.history_budget(config.max_context_tokens)
+        if conversation.summary:
+            history.append(summary_message(conversation.summary))
+            budget -= self.context_packer.count_message_tokens(history)
 
-        formatted_history = []
-        for msg in recent_messages:
-            formatted_history.append({"role": msg["role"], "content": msg["content"]})
+        recent_messages = conversation.messages[
+            conversation.summarized_message_count :
+        ][-self.context_packer.max_history_messages :]
+        history.extend(self.context_packer.pack_history(recent_messages, budget))
+        return history or None
 
-        return formatted_history
+    async def _aget_conversation_history(
+        self, conversation_id: Optional[str], config: ChatConfig
+    ) -> Optional[List[Dict[str, str]]]:
+        """Async _get_conversation_history (store I/O off the event loop)."""
+        if not conversation_id:
+            return None
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self._get_conversation_history, conversation_id, config
+        )
 
-    def _generate_response(
+    def _build_messages(
         self,
-        query: str,
+        request: RAGChatRequest,
         context: ConversationContext,
         conversation_history: Optional[List[Dict[str, str]]],
-        config: ChatConfig,
-    ) -> str:
-        """Generate response sử dụng Gemini LLM."""
+    ) -> List[Dict[str, str]]:
+        """Build LLM messages: system prompt, conversation history, user prompt."""
+        config = request.chat_config
 
         # Build prompt
         system_prompt = self._build_system_prompt(config)
-        user_prompt = self._build_user_prompt(query, context, config)
+        user_prompt = self._build_user_prompt(request.query, context, config)
 
         # Prepare messages
         messages = [{"role": "system", "content": system_prompt}]
@@ -205,10 +599,7 @@ class RAGChatEngine:
 
         # Add current user query
         messages.append({"role": "user", "content": user_prompt})
-
-        # Generate response
-        response = self.llm_adapter.generate_response(messages, config)
-        return response
+        return messages
 
     def _build_system_prompt(self, config: ChatConfig) -> str:
         """Build system prompt cho Gemini."""
@@ -271,50 +662,74 @@ Lưu ý: Tôi không tìm thấy tài liệu nào liên quan đến câu hỏi n
     def _update_conversation(
         self, conversation_id: str, query: str, response: str
     ) -> None:
-        """Update conversation history."""
-
-        if conversation_id not in self.conversations:
-            self.conversations[conversation_id] = ConversationHistory(
-                conversation_id=conversation_id,
-                created_at=datetime.now().isoformat(),
-                updated_at=datetime.now().isoformat(),
-                messages=[],
-            )
-
-        conversation = self.conversations[conversation_id]
-
-        # Add user message
-        conversation.messages.append(
-            {"role": "user", "content": query, "timestamp": datetime.now().isoformat()}
-        )
-
-        # Add assistant response
-        conversation.messages.append(
-            {
-                "role": "assistant",
-                "content": response,
-                "timestamp": datetime.now().isoformat(),
-            }
+        """Append the exchange to conversation history (created on first use)."""
+        timestamp = datetime.now().isoformat()
+        self.conversation_store.append_messages(
+            conversation_id,
+            [
+                # User message
+                {"role": "user", "content": query, "timestamp": timestamp},
+                # Assistant response
+                {
+                    "role": "assistant",
+                    "content": response,
+                    "timestamp": datetime.now().isoformat(),
+                },
+            ],
         )
 
-        conversation.updated_at = datetime.now().isoformat()
+        if self.summarizer is not None:
+            self.summarizer.schedule(self.conversation_store, conversation_id)
 
     def get_conversation(self, conversation_id: str) -> Optional[ConversationHistory]:
         """Get conversation by ID."""
-        return self.conversations.get(conversation_id)
+        return self.conversation_store.get(conversation_id)
+
+    def list_conversations(
+        self, limit: int = 50, cursor: Optional[str] = None
+    ) -> Tuple[List[ConversationHistory], Optional[str]]:
+        """
+        List recent conversations (newest first), one page at a time.
+
+        Listed conversations carry headers only (message_count, no messages).
 
-    def list_conversations(self, limit: int = 50) -> List[ConversationHistory]:
-        """List recent conversations."""
-        conversations = list(self.conversations.values())
-        conversations.sort(key=lambda x: x.updated_at, reverse=True)
-        return conversations[:limit]
+        Args:
+            limit: Page size
+            cursor: next_cursor returned by the previous page
+
+        Returns:
+            (conversations, next_cursor or None on the last page)
+        """
+        return self.conversation_store.list_conversations(limit=limit, cursor=cursor)
 
     def delete_conversation(self, conversation_id: str) -> bool:
         """Delete conversation by ID."""
-        if conversation_id in self.conversations:
-            del self.conversations[conversation_id]
-            return True
-        return False
+        return self.conversation_store.delete(conversation_id)
+
+    async def aget_conversation(
+        self, conversation_id: str
+    ) -> Optional[ConversationHistory]:
+        """Async get_conversation (store I/O off the event loop)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self.get_conversation, conversation_id
+        )
+
+    async def alist_conversations(
+        self, limit: int = 50, cursor: Optional[str] = None
+    ) -> Tuple[List[ConversationHistory], Optional[str]]:
+        """Async list_conversations (store I/O off the event loop)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self.list_conversations, limit, cursor
+        )
+
+    async def adelete_conversation(self, conversation_id: str) -> bool:
+        """Async delete_conversation (store I/O off the event loop)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self.delete_conversation, conversation_id
+        )
 
     def get_stats(self) -> Dict[str, Any]:
         """Get chat engine statistics."""
@@ -322,16 +737,16 @@ Lưu ý: Tôi không tìm thấy tài liệu nào liên quan đến câu hỏi n
 
         return {
             "retriever": retriever_stats,
-            "conversations": {
-                "total_conversations": len(self.conversations),
-                "total_messages": sum(
-                    len(conv.messages) for conv in self.conversations.values()
-                ),
-            },
+            "conversations": self.conversation_store.get_stats(),
             "llm_adapter": {
                 "model": getattr(self.llm_adapter, "current_model", "unknown"),
                 "status": "ready",
             },
+            "response_cache": (
+                self.response_cache.get_stats() if self.response_cache else None
+            ),
+            "reranker": self.reranker.get_stats(),
+            "summarizer": self.summarizer.get_stats() if self.summarizer else None,
         }
 
 
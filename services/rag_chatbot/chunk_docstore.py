@@ -0,0 +1,157 @@
+"""
+Memory-mapped chunk docstore cho read-only serving.
+
+LangChain FAISS lưu docstore (chunk text + metadata) trong index.pkl, nên mỗi
+uvicorn worker unpickle toàn bộ chunks vào heap riêng. chunk_docstore.bin
+chứa cùng data ở dạng record file: workers mmap file read-only, page cache
+được share giữa các processes và chunk chỉ được decode khi search trả về nó.
+
+File layout (chunk_docstore.bin):
+    header  : MAGIC (8 bytes) + count (u64) + offsets_offset (u64) + ids_length (u64)
+    records : UTF-8 JSON [page_content, metadata] per chunk, in FAISS id order
+    offsets : (count + 1) little-endian u64 record offsets
+    ids     : compact JSON list of docstore ids (FAISS id order)
+"""
+
+import os
+import mmap
+import json
+import struct
+import logging
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+from langchain_community.docstore.base import Docstore
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+CHUNK_DOCSTORE_FILENAME = "chunk_docstore.bin"
+
+_MAGIC = b"RAGDOCS1"
+_HEADER = struct.Struct("<8sQQQ")
+
+
+def write_chunk_docstore(
+    directory: str, index_to_docstore_id: Dict[int, str], docstore: Docstore
+) -> None:
+    """
+    Write the docstore of a FAISS vectorstore to chunk_docstore.bin atomically.
+
+    Args:
+        directory: Persist directory
+        index_to_docstore_id: FAISS id -> docstore id
+        docstore: Docstore holding the chunk Documents
+    """
+    path = os.path.join(directory, CHUNK_DOCSTORE_FILENAME)
+    temp_path = path + ".tmp"
+
+    docstore_ids: List[str] = []
+    offsets: List[int] = []
+    offset = _HEADER.size
+
+    with open(temp_path, "wb") as f:
+        f.write(b"\0" * _HEADER.size)
+
+        for faiss_id in sorted(index_to_docstore_id):
+            docstore_id = index_to_docstore_id[faiss_id]
+            doc = docstore.search(docstore_id)
+            if not isinstance(doc, Document):
+                raise ValueError(f"Chunk {docstore_id} missing from docstore")
+
+            record = json.dumps(
+                [doc.page_content, doc.metadata],
+                ensure_ascii=False,
+                separators=(",", ":"),
+                default=str,
+            ).encode("utf-8")
+            f.write(record)
+            docstore_ids.append(docstore_id)
+            offsets.append(offset)
+            offset += len(record)
+
+        offsets.append(offset)
+        f.write(np.asarray(offsets, dtype="<u8").tobytes())
+
+        ids = json.dumps(
+            docstore_ids, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+        f.write(ids)
+
+        f.seek(0)
+        f.write(_HEADER.pack(_MAGIC, len(docstore_ids), offset, len(ids)))
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(temp_path, path)
+
+
+class MmapDocstore(Docstore):
+    """Read-only LangChain docstore decoding chunks lazily from a mmapped file."""
+
+    def __init__(self, path: str):
+        """
+        Map a chunk docstore file.
+
+        Args:
+            path: Path to chunk_docstore.bin
+        """
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError(f"Empty chunk docstore: {path}")
+            self._mm: Optional[mmap.mmap] = mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ
+            )
+
+        magic, count, offsets_offset, ids_length = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            self._mm.close()
+            raise ValueError(f"Invalid chunk docstore: {path}")
+
+        # Zero-copy view over the offsets table
+        self._offsets = np.frombuffer(
+            self._mm, dtype="<u8", count=count + 1, offset=offsets_offset
+        )
+        ids_offset = offsets_offset + 8 * (count + 1)
+        docstore_ids = json.loads(self._mm[ids_offset : ids_offset + ids_length])
+
+        self.index_to_docstore_id: Dict[int, str] = dict(enumerate(docstore_ids))
+        self._positions: Dict[str, int] = {
+            docstore_id: position for position, docstore_id in enumerate(docstore_ids)
+        }
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["MmapDocstore"]:
+        """Open chunk_docstore.bin in a persist directory (None if missing)."""
+        path = os.path.join(directory, CHUNK_DOCSTORE_FILENAME)
+        if not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def search(self, search: str) -> Union[str, Document]:
+        """Get a chunk Document by docstore id."""
+        position = self._positions.get(search)
+        if position is None or self._mm is None:
+            return f"ID {search} not found."
+
+        start = int(self._offsets[position])
+        end = int(self._offsets[position + 1])
+        page_content, metadata = json.loads(self._mm[start:end])
+        return Document(id=search, page_content=page_content, metadata=metadata)
+
+    def delete(self, ids: List) -> None:
+        """Read-only docstore: deletes are not supported."""
+        raise NotImplementedError("MmapDocstore is read-only")
+
+    def close(self) -> None:
+        """Unmap the backing file."""
+        if self._mm is not None:
+            self._offsets = None
+            self._mm.close()
+            self._mm = None
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+
+__all__ = ["MmapDocstore", "write_chunk_docstore", "CHUNK_DOCSTORE_FILENAME"]
@@ -0,0 +1,293 @@
+"""
+Pluggable chunking stage cho LangChainVectorStore.
+
+Strategies (ChunkingConfig.strategy, env RAG_CHUNK_STRATEGY):
+    sentence  - tách câu tiếng Việt (dấu câu + chữ hoa, xuống dòng, bỏ qua
+                viết tắt như "TS.", "v.v."), rồi gom câu thành chunks tối đa
+                chunk_size tokens (đo bằng tokenizer của embedding model) với
+                chunk_overlap tokens câu lặp lại giữa hai chunks liên tiếp
+    character - CharacterTextSplitter cũ (sizes tính theo ký tự)
+
+Documents ngắn hơn chunk_size và categories trong unsplit_categories (mặc định
+flashcard Q/A) được index nguyên một chunk. Default sizes lấy từ
+RetrievalConfig.chunk_size / chunk_overlap (override: RAG_CHUNK_SIZE,
+RAG_CHUNK_OVERLAP).
+"""
+
+import os
+import re
+import logging
+import unicodedata
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_text_splitters import CharacterTextSplitter
+
+from schemas import ChunkingConfig, RetrievalConfig
+
+logger = logging.getLogger(__name__)
+
+TokenCounter = Callable[[str], int]
+
+# Sentence end (punctuation + closing quotes + whitespace) or line break
+_BOUNDARY_RE = re.compile(r"[.!?…]+[\"”’')\]]*\s+|\n\s*")
+_LAST_WORD_RE = re.compile(r"(\w+(?:\.\w+)*)\W*$")
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+# Abbreviations ending with "." that do not end a sentence
+_ABBREVIATIONS = {
+    # Vietnamese titles / places / "vân vân", "ví dụ"
+    "tp",
+    "tt",
+    "ts",
+    "ths",
+    "th.s",
+    "pgs",
+    "gs",
+    "bs",
+    "ks",
+    "cn",
+    "v.v",
+    "vd",
+    # English
+    "mr",
+    "mrs",
+    "dr",
+    "e.g",
+    "i.e",
+    "vs",
+    "fig",
+}
+_SENTENCE_STARTS = "\"“‘(-•*"
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split Vietnamese (or English) text into sentences.
+
+    A sentence ends at ".", "!", "?" or "…" followed by whitespace and an
+    uppercase letter, digit or opening quote/bullet, or at a line break.
+    Abbreviations, initials ("Nguyễn V. A") và list numbers ("1. ") do not
+    end sentences.
+    """
+    text = unicodedata.normalize("NFC", text)
+    sentences: List[str] = []
+    start = 0
+
+    for match in _BOUNDARY_RE.finditer(text):
+        end = match.end()
+        if not match.group().startswith("\n") and end < len(text):
+            next_char = text[end]
+            if not (
+                next_char.isupper()
+                or next_char.isdigit()
+                or next_char in _SENTENCE_STARTS
+            ):
+                continue
+
+            before = text[max(start, match.start() - 24) : match.start()]
+            word_match = _LAST_WORD_RE.search(before)
+            word = word_match.group(1) if word_match else ""
+            if (
+                word.lower() in _ABBREVIATIONS
+                or (len(word) == 1 and word.isupper())
+                or (word.isdigit() and len(word) <= 2)
+            ):
+                continue
+
+        sentence = text[start:end].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = end
+
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+
+def approximate_tokens(text: str) -> int:
+    """Token count estimate (words + punctuation) when no tokenizer is available."""
+    return len(_TOKEN_RE.findall(text))
+
+
+@lru_cache(maxsize=4)
+def get_token_counter(model_name: str) -> TokenCounter:
+    """
+    Token counter using the embedding model's tokenizer (loaded once).
+
+    Falls back to approximate_tokens if the tokenizer cannot be loaded.
+    """
+    try:
+        from transformers import AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+    except Exception as e:
+        logger.warning(f"Tokenizer for {model_name} unavailable ({e}), approximating")
+        return approximate_tokens
+
+    def count_tokens(text: str) -> int:
+        return len(tokenizer.encode(text, add_special_tokens=False))
+
+    return count_tokens
+
+
+def get_chunking_config(tokenizer: Optional[str] = None) -> ChunkingConfig:
+    """
+    Chunking config từ env, defaulting to RetrievalConfig chunk settings.
+
+    Args:
+        tokenizer: Model name whose tokenizer measures chunk sizes
+    """
+    defaults = RetrievalConfig()
+    categories = os.getenv("RAG_UNSPLIT_CATEGORIES", "flashcard")
+    return ChunkingConfig(
+        strategy=os.getenv("RAG_CHUNK_STRATEGY", "sentence").lower(),
+        chunk_size=int(os.getenv("RAG_CHUNK_SIZE", str(defaults.chunk_size))),
+        chunk_overlap=int(
+            os.getenv("RAG_CHUNK_OVERLAP", str(defaults.chunk_overlap))
+        ),
+        unsplit_categories=[
+            category.strip().lower()
+            for category in categories.split(",")
+            if category.strip()
+        ],
+        tokenizer=tokenizer,
+    )
+
+
+class Chunker:
+    """Split document content into chunk texts according to a ChunkingConfig."""
+
+    def __init__(
+        self,
+        config: Optional[ChunkingConfig] = None,
+        token_counter: Optional[TokenCounter] = None,
+    ):
+        """
+        Initialize chunker.
+
+        Args:
+            config: Chunking settings (default: get_chunking_config())
+            token_counter: Token counting function (default: tokenizer of
+                config.tokenizer, loaded lazily, or approximate_tokens)
+        """
+        self.config = config or get_chunking_config()
+        self._token_counter = token_counter
+        self._unsplit = {
+            category.lower() for category in self.config.unsplit_categories
+        }
+        self._splitter = (
+            CharacterTextSplitter(
+                chunk_size=self.config.chunk_size,
+                chunk_overlap=self.config.chunk_overlap,
+                separator=". ",
+            )
+            if self.config.strategy == "character"
+            else None
+        )
+
+    def count_tokens(self, text: str) -> int:
+        """Count tokens với the configured tokenizer."""
+        if self._token_counter is None:
+            self._token_counter = (
+                get_token_counter(self.config.tokenizer)
+                if self.config.tokenizer
+                else approximate_tokens
+            )
+        return self._token_counter(text)
+
+    def split(self, text: str, metadata: Optional[Dict[str, Any]] = None) -> List[str]:
+        """
+        Split one document into chunk texts.
+
+        Args:
+            text: Document content
+            metadata: Document metadata (category decides unsplit documents)
+
+        Returns:
+            Chunk texts in document order
+        """
+        text = text.strip()
+        if not text:
+            return []
+
+        category = str((metadata or {}).get("category", "")).lower()
+        if category in self._unsplit:
+            return [text]
+
+        if self._splitter is not None:
+            return self._splitter.split_text(text)
+
+        if self.count_tokens(text) <= self.config.chunk_size:
+            return [text]
+
+        return self._pack(split_sentences(text))
+
+    def _pack(self, sentences: List[str]) -> List[str]:
+        """Greedily pack sentences into chunks với sentence-level overlap."""
+        size = self.config.chunk_size
+        overlap = min(self.config.chunk_overlap, size // 2)
+
+        units: List[Tuple[str, int]] = []
+        for sentence in sentences:
+            tokens = self.count_tokens(sentence)
+            if tokens > size:
+                units.extend(self._split_long(sentence))
+            else:
+                units.append((sentence, tokens))
+
+        chunks: List[str] = []
+        current: List[Tuple[str, int]] = []
+        current_tokens = 0
+
+        for unit in units:
+            if current and current_tokens + unit[1] > size:
+                chunks.append(" ".join(text for text, _ in current))
+
+                # Carry trailing sentences (<= overlap tokens) into the next chunk
+                carried: List[Tuple[str, int]] = []
+                carried_tokens = 0
+                for previous in reversed(current):
+                    if carried_tokens + previous[1] > overlap:
+                        break
+                    carried.insert(0, previous)
+                    carried_tokens += previous[1]
+
+                current, current_tokens = carried, carried_tokens
+                while current and current_tokens + unit[1] > size:
+                    current_tokens -= current.pop(0)[1]
+
+            current.append(unit)
+            current_tokens += unit[1]
+
+        if current:
+            chunks.append(" ".join(text for text, _ in current))
+        return chunks
+
+    def _split_long(self, sentence: str) -> List[Tuple[str, int]]:
+        """Split a sentence longer than chunk_size into word windows."""
+        windows: List[Tuple[str, int]] = []
+        words: List[str] = []
+        tokens = 0
+
+        for word in sentence.split():
+            word_tokens = self.count_tokens(word)
+            if words and tokens + word_tokens > self.config.chunk_size:
+                windows.append((" ".join(words), tokens))
+                words, tokens = [], 0
+            words.append(word)
+            tokens += word_tokens
+
+        if words:
+            windows.append((" ".join(words), tokens))
+        return windows
+
+
+__all__ = [
+    "Chunker",
+    "split_sentences",
+    "get_chunking_config",
+    "get_token_counter",
+    "approximate_tokens",
+]
@@ -0,0 +1,147 @@
+"""
+Circuit breaker cho LLM model fallback.
+
+Mỗi Gemini model có một breaker:
+
+    closed    - requests đi thẳng tới model; failure_threshold lỗi liên tiếp
+                (hoặc một lỗi quota/rate limit) mở breaker
+    open      - model bị bỏ qua trong recovery_timeout seconds
+    half_open - hết recovery_timeout, đúng một probe request được gửi; thành
+                công đóng breaker, thất bại mở lại thêm recovery_timeout
+"""
+
+import time
+import threading
+from typing import Any, Callable, Dict, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Thread-safe consecutive-failure circuit breaker with half-open probing."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 3,
+        recovery_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize circuit breaker.
+
+        Args:
+            name: Protected resource (model name)
+            failure_threshold: Consecutive failures that open the breaker
+            recovery_timeout: Seconds open before a half-open probe
+            clock: Monotonic time source
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._clock = clock
+
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+        self.stats = {
+            "successes": 0,
+            "failures": 0,
+            "ignored": 0,
+            "rejected": 0,
+            "opened": 0,
+        }
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Whether a request may be sent now.
+
+        An open breaker past recovery_timeout turns half-open and admits a
+        single probe; callers must then record its outcome (a probe without
+        outcome, e.g. a cancelled request, is replaced after recovery_timeout).
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+
+            now = self._clock()
+            if self._state == OPEN and now - self._opened_at >= self.recovery_timeout:
+                self._state = HALF_OPEN
+                self._probe_in_flight = False
+
+            if self._state == HALF_OPEN and (
+                not self._probe_in_flight
+                or now - self._probe_started >= self.recovery_timeout
+            ):
+                self._probe_in_flight = True
+                self._probe_started = now
+                return True
+
+            self.stats["rejected"] += 1
+            return False
+
+    def record_success(self) -> None:
+        """Close the breaker."""
+        with self._lock:
+            self.stats["successes"] += 1
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_ignored(self) -> None:
+        """
+        End a request whose error says nothing about the resource (e.g. a
+        rejected prompt): no state change, a half-open probe is released.
+        """
+        with self._lock:
+            self.stats["ignored"] += 1
+            self._probe_in_flight = False
+
+    def record_failure(self, trip: bool = False) -> None:
+        """
+        Count a failure.
+
+        Args:
+            trip: Open immediately (quota / rate limit errors, HTTP 429)
+        """
+        with self._lock:
+            self.stats["failures"] += 1
+            self._failures += 1
+            if (
+                trip
+                or self._state == HALF_OPEN
+                or self._failures >= self.failure_threshold
+            ):
+                if self._state != OPEN:
+                    self.stats["opened"] += 1
+                self._state = OPEN
+                self._opened_at = self._clock()
+                self._probe_in_flight = False
+
+    def get_state(self) -> Dict[str, Any]:
+        """Breaker state for health/model info endpoints."""
+        with self._lock:
+            retry_in: Optional[float] = None
+            if self._state == OPEN:
+                retry_in = max(
+                    0.0, self.recovery_timeout - (self._clock() - self._opened_at)
+                )
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "retry_in_seconds": retry_in,
+                **self.stats,
+            }
+
+
+__all__ = ["CircuitBreaker", "CLOSED", "OPEN", "HALF_OPEN"]
@@ -0,0 +1,160 @@
+"""
+Cached collection statistics cho MongoDB data source.
+
+Document counts dùng estimated_document_count (collection metadata, không scan)
+và facet lists (topics/categories) được cache in-memory với TTL. Change watcher
+và index rebuilds gọi record_changes()/invalidate() để bump per-collection
+change counters và drop cached values, nên /metadata/* endpoints trả lời từ
+memory thay vì chạy distinct scans mỗi request. Change watcher chỉ report
+SOURCE_COLLECTIONS (users, WH_Note, flash_cards), nên facets bị drop khi bất kỳ
+source collection nào thay đổi.
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from mongodb_adapter import SOURCE_COLLECTIONS
+
+logger = logging.getLogger(__name__)
+
+
+class CollectionStatsService:
+    """Cheap, cached document counts và facet values."""
+
+    def __init__(
+        self,
+        mongodb_adapter,
+        facet_ttl_seconds: Optional[float] = None,
+        count_ttl_seconds: Optional[float] = None,
+    ):
+        """
+        Initialize stats service.
+
+        Args:
+            mongodb_adapter: MongoDBAdapter providing the sync connection
+            facet_ttl_seconds: Facet cache TTL (default: RAG_FACET_CACHE_TTL env or 300)
+            count_ttl_seconds: Count cache TTL (default: RAG_COUNT_CACHE_TTL env or 30)
+        """
+        self.mongodb_adapter = mongodb_adapter
+        self.facet_ttl_seconds = (
+            facet_ttl_seconds
+            if facet_ttl_seconds is not None
+            else float(os.getenv("RAG_FACET_CACHE_TTL", "300"))
+        )
+        self.count_ttl_seconds = (
+            count_ttl_seconds
+            if count_ttl_seconds is not None
+            else float(os.getenv("RAG_COUNT_CACHE_TTL", "30"))
+        )
+
+        self._lock = threading.Lock()
+        # collection -> (count, cached_at)
+        self._counts: Dict[str, Tuple[int, float]] = {}
+        # (topics, categories, cached_at)
+        self._facets: Optional[Tuple[List[str], List[str], float]] = None
+        self._change_counters: Dict[str, int] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def get_document_count(self, collection_name: Optional[str] = None) -> int:
+        """
+        Estimated document count của một collection (cached).
+
+        Args:
+            collection_name: Collection name (default: adapter's main collection)
+
+        Returns:
+            Estimated number of documents
+        """
+        collection_name = collection_name or self.mongodb_adapter.collection_name
+        now = time.monotonic()
+
+        with self._lock:
+            cached = self._counts.get(collection_name)
+            if cached and now - cached[1] < self.count_ttl_seconds:
+                self.hits += 1
+                return cached[0]
+
+            self.misses += 1
+            count = self.mongodb_adapter.estimated_document_count(collection_name)
+            self._counts[collection_name] = (count, now)
+            return count
+
+    def get_facets(self) -> Dict[str, List[str]]:
+        """Get cached topics và categories (refreshed sau TTL hoặc invalidation)."""
+        now = time.monotonic()
+
+        with self._lock:
+            if self._facets and now - self._facets[2] < self.facet_ttl_seconds:
+                self.hits += 1
+            else:
+                # Single refresh under the lock: concurrent requests wait
+                # instead of each running the distinct scans
+                self.misses += 1
+                topics = self.mongodb_adapter.get_distinct_values("topic")
+                categories = self.mongodb_adapter.get_distinct_values("category")
+                self._facets = (topics, categories, now)
+                logger.debug(
+                    f"📊 Facets refreshed: {len(topics)} topics, "
+                    f"{len(categories)} categories"
+                )
+
+            topics, categories, _ = self._facets
+            return {"topics": list(topics), "categories": list(categories)}
+
+    def get_topics(self) -> List[str]:
+        """Get cached topic values."""
+        return self.get_facets()["topics"]
+
+    def get_categories(self) -> List[str]:
+        """Get cached category values."""
+        return self.get_facets()["categories"]
+
+    def record_changes(self, collection_names: Iterable[str]) -> None:
+        """
+        Record writes to collections: bump change counters và drop their cached values.
+
+        Args:
+            collection_names: Collections that changed (one entry per change)
+        """
+        # Topics/categories originate in the source collections
+        facet_sources = {self.mongodb_adapter.collection_name, *SOURCE_COLLECTIONS}
+
+        with self._lock:
+            for collection_name in collection_names:
+                self._change_counters[collection_name] = (
+                    self._change_counters.get(collection_name, 0) + 1
+                )
+                self._counts.pop(collection_name, None)
+                if collection_name in facet_sources:
+                    self._facets = None
+
+    def invalidate(self) -> None:
+        """Drop all cached counts và facets (e.g. after an index rebuild)."""
+        with self._lock:
+            self._counts.clear()
+            self._facets = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "cached_counts": {
+                    name: count for name, (count, _) in self._counts.items()
+                },
+                "facets_cached": self._facets is not None,
+                "change_counters": dict(self._change_counters),
+                "facet_ttl_seconds": self.facet_ttl_seconds,
+                "count_ttl_seconds": self.count_ttl_seconds,
+            }
+
+
+__all__ = ["CollectionStatsService"]
@@ -0,0 +1,272 @@
+"""
+Token-budgeted prompt packing cho RAGChatEngine.
+
+ChatConfig.max_context_tokens được chia giữa conversation history và
+retrieved sources:
+
+    history - các messages gần nhất (newest first) vừa trong
+              max_context_tokens * RAG_HISTORY_TOKEN_RATIO; phần budget
+              history không dùng hết được chuyển sang sources
+    sources - chunks (top max_context_docs) gom theo document_id theo thứ tự
+              rank; chunks liền kề/overlap của cùng document được merge (bỏ
+              đoạn lặp), chunks có text nằm trọn trong một đoạn đã chọn bị
+              drop; các documents được thêm vào cho đến khi hết budget
+
+Token counts dùng approximate_tokens của chunking (words + punctuation) hoặc
+tokenizer của RAG_CONTEXT_TOKENIZER nếu được set.
+"""
+
+import os
+import re
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from chunking import TokenCounter, approximate_tokens, get_token_counter
+from dedup import normalize_text
+
+logger = logging.getLogger(__name__)
+
+SOURCE_PREVIEW_CHARS = 200
+# Separator between non-adjacent chunks of one document
+GAP_SEPARATOR = " … "
+# Tokens per message for role markers ("User: ", "Assistant: ", newlines)
+MESSAGE_OVERHEAD_TOKENS = 4
+# Smallest remaining budget worth a truncated source
+MIN_TRUNCATED_TOKENS = 32
+
+_CHUNK_INDEX_RE = re.compile(r"_chunk_(\d+)$")
+
+
+class PackedContext(NamedTuple):
+    """Context text + sources vừa trong source budget."""
+
+    context_text: Optional[str]
+    sources: List[Dict[str, Any]]
+    tokens: int
+    merged_chunks: int
+    dropped_chunks: int
+
+
+def _chunk_index(doc: Any) -> Optional[int]:
+    """Position of a chunk in its document (metadata, else parsed from chunk_id)."""
+    chunk_index = getattr(doc, "chunk_index", None)
+    if chunk_index is not None:
+        return chunk_index
+    match = _CHUNK_INDEX_RE.search(getattr(doc, "chunk_id", "") or "")
+    return int(match.group(1)) if match else None
+
+
+def _chunk_text(doc: Any) -> str:
+    return getattr(doc, "chunk_text", None) or doc.content or ""
+
+
+def merge_overlapping(first: str, second: str) -> str:
+    """
+    Join two consecutive chunks, removing the text they share.
+
+    Overlap = longest word sequence ending ``first`` and starting ``second``
+    (chunkers repeat chunk_overlap tokens of sentences between neighbours).
+    """
+    first_words = first.split()
+    second_words = second.split()
+    for size in range(min(len(first_words), len(second_words)), 0, -1):
+        if first_words[-size:] == second_words[:size]:
+            return " ".join(first_words + second_words[size:])
+    return f"{first.rstrip()} {second.lstrip()}"
+
+
+class ContextPacker:
+    """Fill a token budget with conversation history và merged source chunks."""
+
+    def __init__(
+        self,
+        token_counter: Optional[TokenCounter] = None,
+        history_ratio: Optional[float] = None,
+        max_history_messages: Optional[int] = None,
+    ):
+        """
+        Initialize context packer.
+
+        Args:
+            token_counter: Text -> token count (default: RAG_CONTEXT_TOKENIZER
+                tokenizer, else approximate_tokens)
+            history_ratio: Share of max_context_tokens reserved for history
+                (default: RAG_HISTORY_TOKEN_RATIO env, 0.3)
+            max_history_messages: Recent messages considered for history
+                (default: RAG_HISTORY_MAX_MESSAGES env, 20)
+        """
+        if token_counter is None:
+            tokenizer = os.getenv("RAG_CONTEXT_TOKENIZER")
+            token_counter = (
+                get_token_counter(tokenizer) if tokenizer else approximate_tokens
+            )
+        if history_ratio is None:
+            history_ratio = float(os.getenv("RAG_HISTORY_TOKEN_RATIO", "0.3"))
+        if max_history_messages is None:
+            max_history_messages = int(os.getenv("RAG_HISTORY_MAX_MESSAGES", "20"))
+
+        self.count_tokens = token_counter
+        self.history_ratio = min(max(history_ratio, 0.0), 1.0)
+        self.max_history_messages = max_history_messages
+
+    def history_budget(self, max_context_tokens: int) -> int:
+        """Tokens reserved for conversation history."""
+        return int(max_context_tokens * self.history_ratio)
+
+    def count_message_tokens(self, messages: Optional[List[Dict[str, str]]]) -> int:
+        """Prompt tokens of chat messages (content + role overhead)."""
+        return sum(
+            self.count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+            for message in messages or []
+        )
+
+    def pack_history(
+        self, messages: List[Dict[str, Any]], budget: int
+    ) -> List[Dict[str, str]]:
+        """
+        Most recent messages that fit in the history budget.
+
+        Args:
+            messages: Conversation messages, oldest first
+            budget: Token budget
+
+        Returns:
+            {"role", "content"} messages, oldest first, starting with a user
+            message
+        """
+        packed: List[Dict[str, str]] = []
+        used = 0
+        for message in reversed(messages):
+            tokens = self.count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+            if used + tokens > budget:
+                break
+            packed.append({"role": message["role"], "content": message["content"]})
+            used += tokens
+
+        packed.reverse()
+        # An answer without its question only confuses the model
+        while packed and packed[0]["role"] != "user":
+            packed.pop(0)
+        return packed
+
+    def pack_sources(self, retrieved_docs: List, budget: int) -> PackedContext:
+        """
+        Merge chunks per document và fill the source budget in rank order.
+
+        Args:
+            retrieved_docs: Ranked RetrievedDocument list (already cut to
+                max_context_docs)
+            budget: Token budget
+
+        Returns:
+            PackedContext (sources in the same shape as before packing, plus
+            the chunk_ids merged into each source)
+        """
+        # document_id -> ranked chunks (dict keeps first-rank order)
+        groups: Dict[str, List[Any]] = {}
+        for doc in retrieved_docs:
+            groups.setdefault(doc.document_id, []).append(doc)
+
+        blocks: List[Tuple[Any, List[str], str]] = []
+        included: List[str] = []
+        merged_chunks = dropped_chunks = 0
+
+        for docs in groups.values():
+            segments: List[str] = []
+            chunk_ids: List[str] = []
+            previous_index: Optional[int] = None
+            ordered = sorted(
+                docs,
+                key=lambda doc: (_chunk_index(doc) is None, _chunk_index(doc) or 0),
+            )
+            for doc in ordered:
+                text = _chunk_text(doc).strip()
+                # Padded so "máy" does not match inside "máy tính"
+                normalized = f" {normalize_text(text)} "
+                if not normalized.strip() or any(
+                    normalized in seen for seen in included
+                ):
+                    dropped_chunks += 1
+                    continue
+
+                chunk_index = _chunk_index(doc)
+                if (
+                    segments
+                    and chunk_index is not None
+                    and previous_index is not None
+                    and chunk_index - previous_index <= 1
+                ):
+                    segments[-1] = merge_overlapping(segments[-1], text)
+                    included[-1] = f" {normalize_text(segments[-1])} "
+                    merged_chunks += 1
+                else:
+                    segments.append(text)
+                    included.append(normalized)
+                chunk_ids.append(doc.chunk_id)
+                previous_index = chunk_index
+
+            if segments:
+                # Best-ranked chunk describes the source
+                blocks.append((docs[0], chunk_ids, GAP_SEPARATOR.join(segments)))
+
+        sources: List[Dict[str, Any]] = []
+        context_text_parts: List[str] = []
+        used = 0
+        for doc, chunk_ids, text in blocks:
+            block = f"[{doc.topic}] {text}"
+            tokens = self.count_tokens(block)
+            if used + tokens > budget:
+                remaining = budget - used
+                if context_text_parts or remaining < MIN_TRUNCATED_TOKENS:
+                    # A smaller lower-ranked source may still fit
+                    dropped_chunks += len(chunk_ids)
+                    continue
+                block = self._truncate(block, remaining)
+                tokens = self.count_tokens(block)
+
+            sources.append(
+                {
+                    "document_id": doc.document_id,
+                    "topic": doc.topic,
+                    "category": doc.category,
+                    "similarity_score": doc.similarity_score,
+                    "chunk_text": (
+                        text[:SOURCE_PREVIEW_CHARS] + "..."
+                        if len(text) > SOURCE_PREVIEW_CHARS
+                        else text
+                    ),
+                    "chunk_ids": chunk_ids,
+                }
+            )
+            context_text_parts.append(block)
+            used += tokens
+
+        return PackedContext(
+            context_text=(
+                "\n\n".join(context_text_parts) if context_text_parts else None
+            ),
+            sources=sources,
+            tokens=used,
+            merged_chunks=merged_chunks,
+            dropped_chunks=dropped_chunks,
+        )
+
+    def _truncate(self, text: str, budget: int) -> str:
+        """Longest word prefix of text within budget tokens."""
+        words = text.split()
+        low, high = 0, len(words)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.count_tokens(" ".join(words[:middle]) + " …") <= budget:
+                low = middle
+            else:
+                high = middle - 1
+        return " ".join(words[:low]) + " …"
+
+
+__all__ = [
+    "ContextPacker",
+    "PackedContext",
+    "merge_overlapping",
+    "GAP_SEPARATOR",
+]
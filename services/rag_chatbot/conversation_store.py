@@ -0,0 +1,779 @@
+"""
+Persistent conversation store cho RAGChatEngine.
+
+ConversationStore giữ một LRU hot cache (RAG_CONVERSATION_CACHE_SIZE
+conversations) trước một durable backend, nên memory bounded và history
+được share giữa uvicorn workers / giữ lại sau restart:
+
+    SQLiteConversationBackend - local file (RAG_CONVERSATION_DB)
+    MongoConversationBackend  - collections conversations + conversation_messages
+
+Backends lưu một header (created_at, updated_at, message_count, rolling
+summary) mỗi conversation, indexed theo updated_at cho paginated listing, và
+messages
+append-only theo sequence number: append không rewrite history cũ, và cache
+chỉ đọc messages mới khi worker khác đã append. Conversations idle lâu hơn
+RAG_CONVERSATION_TTL seconds được xoá định kỳ (mỗi
+RAG_CONVERSATION_SWEEP_INTERVAL seconds, khi có writes).
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from schemas import ConversationHistory
+
+logger = logging.getLogger(__name__)
+
+# Conversation header: conversation_id, created_at, updated_at, message_count,
+# summary, summarized_message_count
+ConversationHeader = Dict[str, Any]
+
+_HEADER_COLUMNS = (
+    "conversation_id, created_at, updated_at, message_count, "
+    "summary, summarized_message_count"
+)
+
+
+def _now() -> str:
+    """Timestamp format shared by headers và messages (sortable as text)."""
+    return datetime.now().isoformat(timespec="microseconds")
+
+
+def encode_cursor(header: ConversationHeader) -> str:
+    """Pagination cursor pointing after a listed conversation."""
+    return f"{header['updated_at']}|{header['conversation_id']}"
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Cursor -> (updated_at, conversation_id)."""
+    updated_at, _, conversation_id = cursor.partition("|")
+    return updated_at, conversation_id
+
+
+class ConversationBackend(ABC):
+    """Durable conversation storage used behind ConversationStore's hot cache."""
+
+    @abstractmethod
+    def get_header(self, conversation_id: str) -> Optional[ConversationHeader]:
+        """Get a conversation header (None if missing)."""
+
+    @abstractmethod
+    def get_messages(
+        self, conversation_id: str, start: int = 0
+    ) -> List[Dict[str, Any]]:
+        """Get messages from sequence number start, in order."""
+
+    @abstractmethod
+    def append_messages(
+        self, conversation_id: str, messages: List[Dict[str, Any]], timestamp: str
+    ) -> ConversationHeader:
+        """
+        Append messages, creating the conversation if needed.
+
+        Returns:
+            Updated header (message_count includes the appended messages)
+        """
+
+    @abstractmethod
+    def set_summary(
+        self, conversation_id: str, summary: str, summarized_message_count: int
+    ) -> bool:
+        """
+        Store a rolling summary of the first summarized_message_count messages.
+
+        Returns:
+            False if the conversation is missing or already has a summary
+            covering as many messages (written by another worker)
+        """
+
+    @abstractmethod
+    def list_headers(
+        self, limit: int, cursor: Optional[str] = None
+    ) -> List[ConversationHeader]:
+        """Headers ordered by updated_at (newest first), after cursor."""
+
+    @abstractmethod
+    def delete(self, conversation_id: str) -> bool:
+        """Delete a conversation và its messages."""
+
+    @abstractmethod
+    def delete_idle(self, cutoff: str) -> int:
+        """Delete conversations not updated since cutoff; returns count."""
+
+    @abstractmethod
+    def get_counts(self) -> Dict[str, int]:
+        """Total conversations và messages."""
+
+    def close(self) -> None:
+        """Release backend resources."""
+
+
+class SQLiteConversationBackend(ConversationBackend):
+    """SQLite backend (WAL, shared by worker processes on one host)."""
+
+    def __init__(self, path: str):
+        """
+        Initialize SQLite backend.
+
+        Args:
+            path: SQLite database file (created if missing)
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None, timeout=30
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS conversations (
+                conversation_id TEXT PRIMARY KEY,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                message_count INTEGER NOT NULL DEFAULT 0,
+                summary TEXT,
+                summarized_message_count INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS conversations_updated_at
+                ON conversations (updated_at, conversation_id);
+            CREATE TABLE IF NOT EXISTS messages (
+                conversation_id TEXT NOT NULL
+                    REFERENCES conversations (conversation_id) ON DELETE CASCADE,
+                seq INTEGER NOT NULL,
+                message TEXT NOT NULL,
+                PRIMARY KEY (conversation_id, seq)
+            ) WITHOUT ROWID;
+            """
+        )
+        self._migrate()
+        self._lock = threading.Lock()
+
+    def _migrate(self) -> None:
+        """Add summary columns to databases created before rolling summaries."""
+        columns = {
+            row[1]
+            for row in self._conn.execute("PRAGMA table_info(conversations)")
+        }
+        if "summary" not in columns:
+            self._conn.execute("ALTER TABLE conversations ADD COLUMN summary TEXT")
+        if "summarized_message_count" not in columns:
+            self._conn.execute(
+                "ALTER TABLE conversations ADD COLUMN "
+                "summarized_message_count INTEGER NOT NULL DEFAULT 0"
+            )
+
+    @staticmethod
+    def _header(row: Tuple) -> ConversationHeader:
+        return {
+            "conversation_id": row[0],
+            "created_at": row[1],
+            "updated_at": row[2],
+            "message_count": row[3],
+            "summary": row[4],
+            "summarized_message_count": row[5],
+        }
+
+    def get_header(self, conversation_id: str) -> Optional[ConversationHeader]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_HEADER_COLUMNS} FROM conversations "
+                "WHERE conversation_id = ?",
+                (conversation_id,),
+            ).fetchone()
+        return self._header(row) if row else None
+
+    def get_messages(
+        self, conversation_id: str, start: int = 0
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT message FROM messages "
+                "WHERE conversation_id = ? AND seq >= ? ORDER BY seq",
+                (conversation_id, start),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def append_messages(
+        self, conversation_id: str, messages: List[Dict[str, Any]], timestamp: str
+    ) -> ConversationHeader:
+        with self._lock:
+            # IMMEDIATE: sequence numbers are reserved under the write lock
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO conversations "
+                    "(conversation_id, created_at, updated_at, message_count) "
+                    "VALUES (?, ?, ?, 0)",
+                    (conversation_id, timestamp, timestamp),
+                )
+                self._conn.execute(
+                    "UPDATE conversations "
+                    "SET message_count = message_count + ?, updated_at = ? "
+                    "WHERE conversation_id = ?",
+                    (len(messages), timestamp, conversation_id),
+                )
+                row = self._conn.execute(
+                    f"SELECT {_HEADER_COLUMNS} FROM conversations "
+                    "WHERE conversation_id = ?",
+                    (conversation_id,),
+                ).fetchone()
+                start = row[3] - len(messages)
+                self._conn.executemany(
+                    "INSERT INTO messages (conversation_id, seq, message) "
+                    "VALUES (?, ?, ?)",
+                    [
+                        (
+                            conversation_id,
+                            start + i,
+                            json.dumps(message, ensure_ascii=False),
+                        )
+                        for i, message in enumerate(messages)
+                    ],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self._header(row)
+
+    def set_summary(
+        self, conversation_id: str, summary: str, summarized_message_count: int
+    ) -> bool:
+        with self._lock:
+            updated = self._conn.execute(
+                "UPDATE conversations "
+                "SET summary = ?, summarized_message_count = ? "
+                "WHERE conversation_id = ? AND summarized_message_count < ?",
+                (
+                    summary,
+                    summarized_message_count,
+                    conversation_id,
+                    summarized_message_count,
+                ),
+            ).rowcount
+        return updated > 0
+
+    def list_headers(
+        self, limit: int, cursor: Optional[str] = None
+    ) -> List[ConversationHeader]:
+        query = f"SELECT {_HEADER_COLUMNS} FROM conversations"
+        params: List[Any] = []
+        if cursor:
+            updated_at, conversation_id = decode_cursor(cursor)
+            query += (
+                " WHERE updated_at < ? OR (updated_at = ? AND conversation_id < ?)"
+            )
+            params.extend([updated_at, updated_at, conversation_id])
+        query += " ORDER BY updated_at DESC, conversation_id DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._header(row) for row in rows]
+
+    def delete(self, conversation_id: str) -> bool:
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM conversations WHERE conversation_id = ?",
+                (conversation_id,),
+            ).rowcount
+        return deleted > 0
+
+    def delete_idle(self, cutoff: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "DELETE FROM conversations WHERE updated_at < ?", (cutoff,)
+            ).rowcount
+
+    def get_counts(self) -> Dict[str, int]:
+        with self._lock:
+            conversations, messages = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(message_count), 0) FROM conversations"
+            ).fetchone()
+        return {"conversations": conversations, "messages": messages}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class MongoConversationBackend(ConversationBackend):
+    """MongoDB backend: header documents + one document per message."""
+
+    def __init__(self, database, collection_name: str = "conversations"):
+        """
+        Initialize MongoDB backend.
+
+        Args:
+            database: Sync pymongo database
+            collection_name: Header collection (messages go to
+                <collection_name>_messages)
+        """
+        self.collection_name = collection_name
+        self.conversations = database[collection_name]
+        self.messages = database[f"{collection_name}_messages"]
+
+    def create_indexes(self) -> None:
+        """Listing index on updated_at và message sequence index."""
+        self.conversations.create_index([("updated_at", -1), ("_id", -1)])
+        self.messages.create_index(
+            [("conversation_id", 1), ("seq", 1)], unique=True
+        )
+
+    @staticmethod
+    def _header(doc: Dict[str, Any]) -> ConversationHeader:
+        return {
+            "conversation_id": doc["_id"],
+            "created_at": doc["created_at"],
+            "updated_at": doc["updated_at"],
+            "message_count": doc["message_count"],
+            "summary": doc.get("summary"),
+            "summarized_message_count": doc.get("summarized_message_count", 0),
+        }
+
+    def get_header(self, conversation_id: str) -> Optional[ConversationHeader]:
+        doc = self.conversations.find_one({"_id": conversation_id})
+        return self._header(doc) if doc else None
+
+    def get_messages(
+        self, conversation_id: str, start: int = 0
+    ) -> List[Dict[str, Any]]:
+        cursor = self.messages.find(
+            {"conversation_id": conversation_id, "seq": {"$gte": start}},
+            {"_id": 0, "message": 1},
+        ).sort("seq", 1)
+        return [doc["message"] for doc in cursor]
+
+    def append_messages(
+        self, conversation_id: str, messages: List[Dict[str, Any]], timestamp: str
+    ) -> ConversationHeader:
+        from pymongo import ReturnDocument
+
+        # $inc reserves the sequence range atomically across workers
+        doc = self.conversations.find_one_and_update(
+            {"_id": conversation_id},
+            {
+                "$inc": {"message_count": len(messages)},
+                "$set": {"updated_at": timestamp},
+                "$setOnInsert": {"created_at": timestamp},
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        start = doc["message_count"] - len(messages)
+        self.messages.insert_many(
+            [
+                {
+                    "conversation_id": conversation_id,
+                    "seq": start + i,
+                    "message": message,
+                }
+                for i, message in enumerate(messages)
+            ],
+            ordered=True,
+        )
+        return self._header(doc)
+
+    def set_summary(
+        self, conversation_id: str, summary: str, summarized_message_count: int
+    ) -> bool:
+        result = self.conversations.update_one(
+            {
+                "_id": conversation_id,
+                # Missing field = no summary yet
+                "summarized_message_count": {
+                    "$not": {"$gte": summarized_message_count}
+                },
+            },
+            {
+                "$set": {
+                    "summary": summary,
+                    "summarized_message_count": summarized_message_count,
+                }
+            },
+        )
+        return result.modified_count > 0
+
+    def list_headers(
+        self, limit: int, cursor: Optional[str] = None
+    ) -> List[ConversationHeader]:
+        query: Dict[str, Any] = {}
+        if cursor:
+            updated_at, conversation_id = decode_cursor(cursor)
+            query = {
+                "$or": [
+                    {"updated_at": {"$lt": updated_at}},
+                    {"updated_at": updated_at, "_id": {"$lt": conversation_id}},
+                ]
+            }
+        docs = (
+            self.conversations.find(query)
+            .sort([("updated_at", -1), ("_id", -1)])
+            .limit(limit)
+        )
+        return [self._header(doc) for doc in docs]
+
+    def delete(self, conversation_id: str) -> bool:
+        deleted = self.conversations.delete_one({"_id": conversation_id}).deleted_count
+        self.messages.delete_many({"conversation_id": conversation_id})
+        return deleted > 0
+
+    def delete_idle(self, cutoff: str) -> int:
+        idle_ids = [
+            doc["_id"]
+            for doc in self.conversations.find(
+                {"updated_at": {"$lt": cutoff}}, {"_id": 1}
+            )
+        ]
+        if not idle_ids:
+            return 0
+        self.conversations.delete_many({"_id": {"$in": idle_ids}})
+        self.messages.delete_many({"conversation_id": {"$in": idle_ids}})
+        return len(idle_ids)
+
+    def get_counts(self) -> Dict[str, int]:
+        totals = list(
+            self.conversations.aggregate(
+                [
+                    {
+                        "$group": {
+                            "_id": None,
+                            "conversations": {"$sum": 1},
+                            "messages": {"$sum": "$message_count"},
+                        }
+                    }
+                ]
+            )
+        )
+        if not totals:
+            return {"conversations": 0, "messages": 0}
+        return {
+            "conversations": totals[0]["conversations"],
+            "messages": totals[0]["messages"],
+        }
+
+
+class ConversationStore:
+    """LRU hot cache of conversations in front of a ConversationBackend."""
+
+    def __init__(
+        self,
+        backend: ConversationBackend,
+        cache_size: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        sweep_interval: Optional[float] = None,
+    ):
+        """
+        Initialize conversation store.
+
+        Args:
+            backend: Durable storage
+            cache_size: Max conversations kept in memory
+                (default: RAG_CONVERSATION_CACHE_SIZE env or 256)
+            ttl_seconds: Idle time before a conversation is deleted, 0 keeps
+                conversations forever (default: RAG_CONVERSATION_TTL env or
+                30 days)
+            sweep_interval: Min seconds between idle sweeps
+                (default: RAG_CONVERSATION_SWEEP_INTERVAL env or 600)
+        """
+        self.backend = backend
+        self.cache_size = (
+            cache_size
+            if cache_size is not None
+            else int(os.getenv("RAG_CONVERSATION_CACHE_SIZE", "256"))
+        )
+        self.ttl_seconds = (
+            ttl_seconds
+            if ttl_seconds is not None
+            else float(os.getenv("RAG_CONVERSATION_TTL", str(30 * 24 * 3600)))
+        )
+        self.sweep_interval = (
+            sweep_interval
+            if sweep_interval is not None
+            else float(os.getenv("RAG_CONVERSATION_SWEEP_INTERVAL", "600"))
+        )
+
+        self._cache: "OrderedDict[str, ConversationHistory]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self.stats = {"hits": 0, "partial_hits": 0, "misses": 0, "evicted_idle": 0}
+
+    def _cache_get(self, conversation_id: str) -> Optional[ConversationHistory]:
+        with self._lock:
+            conversation = self._cache.get(conversation_id)
+            if conversation is not None:
+                self._cache.move_to_end(conversation_id)
+            return conversation
+
+    def _cache_put(self, conversation: ConversationHistory) -> None:
+        if self.cache_size <= 0:
+            return
+        with self._lock:
+            self._cache[conversation.conversation_id] = conversation
+            self._cache.move_to_end(conversation.conversation_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _cache_pop(self, conversation_id: str) -> None:
+        with self._lock:
+            self._cache.pop(conversation_id, None)
+
+    def get(self, conversation_id: str) -> Optional[ConversationHistory]:
+        """
+        Get a conversation, reading only messages the cached copy is missing.
+
+        The backend header is checked on every call, so appends by other
+        workers are picked up.
+        """
+        header = self.backend.get_header(conversation_id)
+        if header is None:
+            self._cache_pop(conversation_id)
+            return None
+        return self._load(header)
+
+    def _load(self, header: ConversationHeader) -> ConversationHistory:
+        """Conversation for a header, reusing the cached copy when current."""
+        conversation_id = header["conversation_id"]
+        cached = self._cache_get(conversation_id)
+        cached_count = len(cached.messages) if cached is not None else 0
+
+        if cached is not None and cached_count == header["message_count"]:
+            self.stats["hits"] += 1
+            if cached.summarized_message_count == header["summarized_message_count"]:
+                return cached
+            # Summary refreshed by another worker: messages are still current
+            conversation = cached.model_copy(
+                update={
+                    "summary": header["summary"],
+                    "summarized_message_count": header["summarized_message_count"],
+                }
+            )
+            self._cache_put(conversation)
+            return conversation
+
+        if cached is not None and cached_count < header["message_count"]:
+            # Append-only history: fetch just the new messages
+            self.stats["partial_hits"] += 1
+            messages = cached.messages + self.backend.get_messages(
+                conversation_id, start=cached_count
+            )
+        else:
+            self.stats["misses"] += 1
+            messages = self.backend.get_messages(conversation_id)
+
+        conversation = ConversationHistory(
+            conversation_id=conversation_id,
+            created_at=header["created_at"],
+            updated_at=header["updated_at"],
+            messages=messages,
+            summary=header["summary"],
+            summarized_message_count=header["summarized_message_count"],
+            message_count=header["message_count"],
+        )
+        self._cache_put(conversation)
+        return conversation
+
+    def get_recent_messages(
+        self, conversation_id: str, limit: int
+    ) -> List[Dict[str, Any]]:
+        """Last limit messages of a conversation (empty if missing)."""
+        conversation = self.get(conversation_id)
+        return conversation.messages[-limit:] if conversation else []
+
+    def append_messages(
+        self, conversation_id: str, messages: List[Dict[str, Any]]
+    ) -> None:
+        """Append messages (the conversation is created on first append)."""
+        cached = self._cache_get(conversation_id)
+        header = self.backend.append_messages(conversation_id, messages, _now())
+
+        # Extend the cached copy only if no other worker appended in between
+        if cached is not None and (
+            len(cached.messages) + len(messages) == header["message_count"]
+        ):
+            self._cache_put(
+                ConversationHistory(
+                    conversation_id=conversation_id,
+                    created_at=header["created_at"],
+                    updated_at=header["updated_at"],
+                    messages=cached.messages + messages,
+                    summary=header["summary"],
+                    summarized_message_count=header["summarized_message_count"],
+                    message_count=header["message_count"],
+                )
+            )
+        elif cached is not None:
+            self._cache_pop(conversation_id)
+
+        self._maybe_evict_idle()
+
+    def set_summary(
+        self, conversation_id: str, summary: str, summarized_message_count: int
+    ) -> bool:
+        """
+        Store the rolling summary of a conversation's first messages.
+
+        Returns:
+            False if a summary covering as many messages already exists
+        """
+        updated = self.backend.set_summary(
+            conversation_id, summary, summarized_message_count
+        )
+        if updated:
+            cached = self._cache_get(conversation_id)
+            if cached is not None:
+                self._cache_put(
+                    cached.model_copy(
+                        update={
+                            "summary": summary,
+                            "summarized_message_count": summarized_message_count,
+                        }
+                    )
+                )
+        return updated
+
+    def list_conversations(
+        self, limit: int = 50, cursor: Optional[str] = None
+    ) -> Tuple[List[ConversationHistory], Optional[str]]:
+        """
+        List conversations by last update (newest first).
+
+        Conversations are returned without messages (message_count is set);
+        get() loads one conversation's messages.
+
+        Args:
+            limit: Page size
+            cursor: next_cursor of the previous page
+
+        Returns:
+            (conversations, next_cursor or None on the last page)
+        """
+        headers = self.backend.list_headers(limit + 1, cursor)
+        next_cursor = (
+            encode_cursor(headers[limit - 1]) if len(headers) > limit else None
+        )
+        # Headers only: no message fetch per conversation, hot cache untouched
+        return [
+            ConversationHistory(
+                conversation_id=header["conversation_id"],
+                created_at=header["created_at"],
+                updated_at=header["updated_at"],
+                summary=header["summary"],
+                summarized_message_count=header["summarized_message_count"],
+                message_count=header["message_count"],
+            )
+            for header in headers[:limit]
+        ], next_cursor
+
+    def delete(self, conversation_id: str) -> bool:
+        """Delete a conversation."""
+        self._cache_pop(conversation_id)
+        return self.backend.delete(conversation_id)
+
+    def evict_idle(self) -> int:
+        """Delete conversations idle longer than ttl_seconds."""
+        if self.ttl_seconds <= 0:
+            return 0
+
+        cutoff = (datetime.now() - timedelta(seconds=self.ttl_seconds)).isoformat(
+            timespec="microseconds"
+        )
+        with self._lock:
+            for conversation_id in [
+                conversation_id
+                for conversation_id, conversation in self._cache.items()
+                if conversation.updated_at < cutoff
+            ]:
+                del self._cache[conversation_id]
+
+        evicted = self.backend.delete_idle(cutoff)
+        self.stats["evicted_idle"] += evicted
+        if evicted:
+            logger.info(f"🧹 Evicted {evicted} idle conversations")
+        return evicted
+
+    def _maybe_evict_idle(self) -> None:
+        """Run evict_idle at most once per sweep_interval."""
+        now = time.monotonic()
+        if now - self._last_sweep < self.sweep_interval:
+            return
+        self._last_sweep = now
+        try:
+            self.evict_idle()
+        except Exception as e:
+            logger.warning(f"Idle conversation sweep failed: {e}")
+
+    def close(self) -> None:
+        """Close the backend."""
+        self.backend.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics."""
+        with self._lock:
+            cached = len(self._cache)
+        counts = self.backend.get_counts()
+        return {
+            "backend": type(self.backend).__name__,
+            "total_conversations": counts["conversations"],
+            "total_messages": counts["messages"],
+            "cached_conversations": cached,
+            "cache_size": self.cache_size,
+            "ttl_seconds": self.ttl_seconds,
+            **self.stats,
+        }
+
+
+def create_conversation_store() -> ConversationStore:
+    """
+    Conversation store configured từ env.
+
+    RAG_CONVERSATION_BACKEND=sqlite (default, file RAG_CONVERSATION_DB) or
+    mongodb (database của MongoDBAdapter, collection
+    RAG_CONVERSATION_COLLECTION).
+    """
+    backend_name = os.getenv("RAG_CONVERSATION_BACKEND", "sqlite").lower()
+
+    if backend_name == "mongodb":
+        from mongodb_adapter import get_mongodb_adapter
+
+        adapter = get_mongodb_adapter()
+        adapter.connect_sync()
+        backend = MongoConversationBackend(
+            adapter.sync_db,
+            os.getenv("RAG_CONVERSATION_COLLECTION", "conversations"),
+        )
+        adapter.registry.ensure_indexes(
+            adapter.connection_string,
+            adapter.sync_db,
+            backend.collection_name,
+            backend.create_indexes,
+        )
+    elif backend_name == "sqlite":
+        backend = SQLiteConversationBackend(
+            os.getenv("RAG_CONVERSATION_DB", "rag_conversations.sqlite")
+        )
+    else:
+        raise ValueError(f"Unknown conversation backend: {backend_name}")
+
+    logger.info(f"💬 Conversation store: {type(backend).__name__}")
+    return ConversationStore(backend)
+
+
+__all__ = [
+    "ConversationStore",
+    "ConversationBackend",
+    "SQLiteConversationBackend",
+    "MongoConversationBackend",
+    "create_conversation_store",
+]
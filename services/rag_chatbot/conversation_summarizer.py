@@ -0,0 +1,238 @@
+"""
+Rolling conversation summaries cho RAGChatEngine.
+
+Sau mỗi lượt chat, khi phần history chưa được tóm tắt vượt
+RAG_SUMMARY_TRIGGER_MESSAGES messages hoặc RAG_SUMMARY_TRIGGER_TOKENS tokens,
+một background thread gộp các messages cũ (trừ RAG_SUMMARY_KEEP_RECENT messages
+gần nhất) vào summary của conversation bằng LLM và lưu vào ConversationStore.
+Prompt dùng summary thay cho các messages đã tóm tắt, nên kích thước prompt mỗi
+lượt không tăng theo độ dài conversation.
+"""
+
+import os
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from chunking import TokenCounter, approximate_tokens
+from schemas import ChatConfig, ConversationHistory
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_SYSTEM_PROMPT = """Bạn tóm tắt cuộc hội thoại giữa người dùng và trợ lý học tập.
+
+YÊU CẦU:
+- Giữ lại các chủ đề đã hỏi, thông tin và kết luận quan trọng trong câu trả lời
+- Giữ lại yêu cầu, mục tiêu và sở thích mà người dùng đã nêu
+- Bỏ lời chào hỏi và chi tiết lặp lại
+- Viết ngắn gọn bằng tiếng Việt, không quá {max_words} từ"""
+
+_ROLE_LABELS = {"user": "Người dùng", "assistant": "Trợ lý"}
+
+
+def summary_message(summary: str) -> Dict[str, str]:
+    """Prompt message replacing the summarized part of a conversation."""
+    return {
+        "role": "system",
+        "content": f"Tóm tắt cuộc hội thoại trước đó:\n{summary}",
+    }
+
+
+class ConversationSummarizer:
+    """Background rolling summarization of long conversations."""
+
+    def __init__(
+        self,
+        llm_adapter,
+        token_counter: Optional[TokenCounter] = None,
+        trigger_messages: Optional[int] = None,
+        trigger_tokens: Optional[int] = None,
+        keep_recent: Optional[int] = None,
+        max_summary_tokens: Optional[int] = None,
+    ):
+        """
+        Initialize conversation summarizer.
+
+        Args:
+            llm_adapter: LLM adapter used to write summaries
+            token_counter: Text -> token count (default: approximate_tokens)
+            trigger_messages: Unsummarized messages that trigger a summary
+                (default: RAG_SUMMARY_TRIGGER_MESSAGES env or 8)
+            trigger_tokens: Unsummarized tokens that trigger a summary
+                (default: RAG_SUMMARY_TRIGGER_TOKENS env or 600)
+            keep_recent: Latest messages kept verbatim
+                (default: RAG_SUMMARY_KEEP_RECENT env or 4)
+            max_summary_tokens: Summary length limit
+                (default: RAG_SUMMARY_MAX_TOKENS env or 300)
+        """
+        self.llm_adapter = llm_adapter
+        self.count_tokens = token_counter or approximate_tokens
+        self.trigger_messages = trigger_messages or int(
+            os.getenv("RAG_SUMMARY_TRIGGER_MESSAGES", "8")
+        )
+        self.trigger_tokens = trigger_tokens or int(
+            os.getenv("RAG_SUMMARY_TRIGGER_TOKENS", "600")
+        )
+        self.keep_recent = (
+            keep_recent
+            if keep_recent is not None
+            else int(os.getenv("RAG_SUMMARY_KEEP_RECENT", "4"))
+        )
+        self.max_summary_tokens = max_summary_tokens or int(
+            os.getenv("RAG_SUMMARY_MAX_TOKENS", "300")
+        )
+
+        # One summary at a time: summaries are never on the request path
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="rag-summary"
+        )
+        self._pending: Set[str] = set()
+        self._lock = threading.Lock()
+        self.stats = {"summaries": 0, "failures": 0, "skipped": 0}
+
+    def needs_summary(self, conversation: ConversationHistory) -> bool:
+        """Whether the unsummarized part of a conversation exceeds a trigger."""
+        unsummarized = conversation.messages[conversation.summarized_message_count :]
+        if len(unsummarized) <= self.keep_recent:
+            return False
+        return len(unsummarized) > self.trigger_messages or (
+            sum(self.count_tokens(message["content"]) for message in unsummarized)
+            > self.trigger_tokens
+        )
+
+    def _summary_end(self, conversation: ConversationHistory) -> int:
+        """Messages covered by the next summary (cut before a user message)."""
+        end = len(conversation.messages) - self.keep_recent
+        while (
+            end > conversation.summarized_message_count
+            and end < len(conversation.messages)
+            and conversation.messages[end]["role"] != "user"
+        ):
+            end -= 1
+        return end
+
+    def summarize(self, conversation: ConversationHistory) -> Optional[Tuple[str, int]]:
+        """
+        Fold older messages into the conversation summary.
+
+        Returns:
+            (summary, summarized_message_count), or None if nothing to fold
+        """
+        start = conversation.summarized_message_count
+        end = self._summary_end(conversation)
+        if end <= start:
+            return None
+
+        transcript = "\n\n".join(
+            f"[{_ROLE_LABELS.get(message['role'], message['role'])}]\n"
+            f"{message['content']}"
+            for message in conversation.messages[start:end]
+        )
+        prompt_parts = []
+        if conversation.summary:
+            prompt_parts.extend(["=== TÓM TẮT HIỆN CÓ ===", conversation.summary, ""])
+        prompt_parts.extend(
+            [
+                "=== TIN NHẮN MỚI ===",
+                transcript,
+                "",
+                "Viết bản tóm tắt cập nhật của toàn bộ cuộc hội thoại.",
+            ]
+        )
+
+        messages: List[Dict[str, str]] = [
+            {
+                "role": "system",
+                "content": SUMMARY_SYSTEM_PROMPT.format(
+                    max_words=int(self.max_summary_tokens * 0.75)
+                ),
+            },
+            {"role": "user", "content": "\n".join(prompt_parts)},
+        ]
+        # Raises instead of returning canned / apology text, which would
+        # replace the summarized messages for good
+        summary = self.llm_adapter.generate_response(
+            messages,
+            ChatConfig(temperature=0.2, max_tokens=self.max_summary_tokens),
+            raise_on_failure=True,
+        ).strip()
+        return summary, end
+
+    def schedule(self, store, conversation_id: str) -> Optional[Future]:
+        """
+        Summarize a conversation in the background if it needs it.
+
+        Args:
+            store: ConversationStore holding the conversation
+            conversation_id: Conversation that just got new messages
+
+        Returns:
+            Future of the background run (None if one is already pending or
+            the adapter only serves canned responses)
+        """
+        if getattr(self.llm_adapter, "use_canned_responses", False):
+            return None
+
+        with self._lock:
+            if conversation_id in self._pending:
+                return None
+            self._pending.add(conversation_id)
+
+        future = self._executor.submit(self._run, store, conversation_id)
+        future.add_done_callback(lambda _: self._done(conversation_id))
+        return future
+
+    def _done(self, conversation_id: str) -> None:
+        with self._lock:
+            self._pending.discard(conversation_id)
+
+    def _run(self, store, conversation_id: str) -> bool:
+        """Summarize and store; errors only cost the summary."""
+        try:
+            conversation = store.get(conversation_id)
+            if conversation is None or not self.needs_summary(conversation):
+                return False
+
+            result = self.summarize(conversation)
+            if result is None or not result[0]:
+                self.stats["skipped"] += 1
+                return False
+
+            summary, summarized_message_count = result
+            if not store.set_summary(
+                conversation_id, summary, summarized_message_count
+            ):
+                # Another worker summarized at least as far
+                self.stats["skipped"] += 1
+                return False
+
+            self.stats["summaries"] += 1
+            logger.info(
+                f"📝 Summarized {summarized_message_count} messages of "
+                f"conversation {conversation_id}"
+            )
+            return True
+        except Exception as e:
+            self.stats["failures"] += 1
+            logger.warning(f"Conversation summary failed ({conversation_id}): {e}")
+            return False
+
+    def close(self) -> None:
+        """Finish pending summaries and stop the worker thread."""
+        self._executor.shutdown(wait=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get summarizer statistics."""
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "trigger_messages": self.trigger_messages,
+            "trigger_tokens": self.trigger_tokens,
+            "keep_recent": self.keep_recent,
+            "pending": pending,
+            **self.stats,
+        }
+
+
+__all__ = ["ConversationSummarizer", "summary_message"]
@@ -0,0 +1,358 @@
+"""
+Near-duplicate chunk detection cho indexing pipeline.
+
+Flashcards của mỗi bộ thẻ và summaries được copy giữa users tạo ra nhiều
+chunks gần như giống hệt nhau; index chỉ giữ một canonical chunk cho mỗi
+nhóm duplicates (vector store ghi owners/sources của cả nhóm vào metadata).
+
+Detection (RAG_DEDUP_MODE):
+    exact - sha1 của normalized text (NFC, lowercase, bỏ dấu câu, gộp
+            whitespace)
+    near  - exact + MinHash (word 3-shingles) với LSH banding; candidates
+            được xác nhận khi estimated Jaccard >= RAG_DEDUP_THRESHOLD
+    off   - không dedup
+"""
+
+import os
+import re
+import zlib
+import hashlib
+import logging
+import unicodedata
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEDUP_INDEX_FILENAME = "dedup_index.npz"
+DEDUP_MODES = ("off", "exact", "near")
+
+_WORD_RE = re.compile(r"\w+")
+# Mersenne prime for universal hashing of 32-bit shingle hashes
+_PRIME = (1 << 31) - 1
+
+
+def normalize_text(text: str) -> str:
+    """Normalize chunk text for duplicate detection ("Học  Máy!" -> "học máy")."""
+    text = unicodedata.normalize("NFC", text).lower()
+    return " ".join(_WORD_RE.findall(text))
+
+
+class ChunkFingerprint(NamedTuple):
+    """Exact digest và MinHash signature (None in exact mode) of a chunk."""
+
+    digest: str
+    signature: Optional[np.ndarray]
+
+
+class ChunkDeduplicator:
+    """
+    Exact + MinHash/LSH index over canonical chunk texts.
+
+    Only canonical chunks are registered; callers map duplicate chunk ids to
+    the canonical id returned by find().
+    """
+
+    def __init__(
+        self,
+        mode: str = "near",
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 3,
+        seed: int = 1,
+    ):
+        """
+        Initialize deduplicator.
+
+        Args:
+            mode: "near", "exact" or "off"
+            threshold: Minimum estimated Jaccard similarity (near mode)
+            num_perm: MinHash signature length
+            bands: LSH bands (num_perm / bands rows each)
+            shingle_size: Words per shingle
+            seed: Seed of the MinHash permutations
+        """
+        if mode not in DEDUP_MODES:
+            raise ValueError(f"Unknown dedup mode: {mode} (expected {DEDUP_MODES})")
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+
+        self.mode = mode
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.seed = seed
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _PRIME, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, _PRIME, size=num_perm).astype(np.uint64)
+
+        # canonical chunk id -> digest / signature
+        self._digests: Dict[str, str] = {}
+        self._signatures: Dict[str, np.ndarray] = {}
+        # digest -> canonical chunk id
+        self._exact: Dict[str, str] = {}
+        # (band, band bytes) -> canonical chunk ids
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self._digests
+
+    def fingerprint(self, text: str) -> ChunkFingerprint:
+        """Compute the digest (và MinHash signature in near mode) of a chunk text."""
+        normalized = normalize_text(text)
+        digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+        signature = self._minhash(normalized) if self.mode == "near" else None
+        return ChunkFingerprint(digest, signature)
+
+    def _minhash(self, normalized: str) -> np.ndarray:
+        """MinHash signature over word shingles of normalized text."""
+        words = normalized.split()
+        size = self.shingle_size
+        shingles = (
+            {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+            if len(words) > size
+            else {normalized}
+        )
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        rows = self.rows
+        return [
+            (band, signature[band * rows : (band + 1) * rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def find(
+        self, fingerprint: ChunkFingerprint, exclude: Optional[Set[str]] = None
+    ) -> Optional[str]:
+        """
+        Find the canonical chunk a chunk duplicates.
+
+        Args:
+            fingerprint: Fingerprint of the chunk
+            exclude: Canonical ids to ignore (pending removals)
+
+        Returns:
+            Canonical chunk id, or None if the chunk is new
+        """
+        if not self.enabled:
+            return None
+
+        exclude = exclude or set()
+        canonical_id = self._exact.get(fingerprint.digest)
+        if canonical_id in exclude:
+            canonical_id = None
+        if canonical_id is not None or fingerprint.signature is None:
+            return canonical_id
+
+        candidates: Set[str] = set()
+        for key in self._band_keys(fingerprint.signature):
+            candidates.update(self._buckets.get(key, ()))
+        candidates -= exclude
+
+        best_id, best_similarity = None, self.threshold
+        for candidate_id in candidates:
+            similarity = float(
+                np.mean(self._signatures[candidate_id] == fingerprint.signature)
+            )
+            if similarity >= best_similarity:
+                best_id, best_similarity = candidate_id, similarity
+        return best_id
+
+    def add(self, chunk_id: str, fingerprint: ChunkFingerprint) -> None:
+        """Register a canonical chunk."""
+        if not self.enabled:
+            return
+
+        self._digests[chunk_id] = fingerprint.digest
+        self._exact.setdefault(fingerprint.digest, chunk_id)
+        if fingerprint.signature is not None:
+            self._signatures[chunk_id] = fingerprint.signature
+            for key in self._band_keys(fingerprint.signature):
+                self._buckets.setdefault(key, set()).add(chunk_id)
+
+    def remove(self, chunk_id: str) -> Optional[ChunkFingerprint]:
+        """Unregister a canonical chunk (returns its fingerprint, if registered)."""
+        digest = self._digests.pop(chunk_id, None)
+        if digest is None:
+            return None
+
+        if self._exact.get(digest) == chunk_id:
+            del self._exact[digest]
+        signature = self._signatures.pop(chunk_id, None)
+        if signature is not None:
+            for key in self._band_keys(signature):
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(chunk_id)
+                    if not bucket:
+                        del self._buckets[key]
+        return ChunkFingerprint(digest, signature)
+
+    def rename(self, old_id: str, new_id: str) -> None:
+        """Re-register a canonical chunk under another chunk id (promotion)."""
+        fingerprint = self.remove(old_id)
+        if fingerprint is not None:
+            self.add(new_id, fingerprint)
+
+    def empty_copy(self) -> "ChunkDeduplicator":
+        """New deduplicator with the same settings and no registered chunks."""
+        return ChunkDeduplicator(
+            mode=self.mode,
+            threshold=self.threshold,
+            num_perm=self.num_perm,
+            bands=self.bands,
+            shingle_size=self.shingle_size,
+            seed=self.seed,
+        )
+
+    def _parameters(self) -> np.ndarray:
+        return np.asarray(
+            [self.num_perm, self.bands, self.shingle_size, self.seed], dtype=np.int64
+        )
+
+    def save(self, directory: str) -> None:
+        """Persist registered chunks atomically (ids, digests, signatures)."""
+        path = os.path.join(directory, DEDUP_INDEX_FILENAME)
+        temp_path = path + ".tmp"
+
+        chunk_ids = list(self._digests)
+        signatures = (
+            np.stack([self._signatures[chunk_id] for chunk_id in chunk_ids])
+            if self._signatures and len(self._signatures) == len(chunk_ids)
+            else np.empty((0, self.num_perm), dtype=np.uint32)
+        )
+        with open(temp_path, "wb") as f:
+            np.savez(
+                f,
+                chunk_ids=np.asarray(chunk_ids, dtype=str),
+                digests=np.asarray(
+                    [self._digests[chunk_id] for chunk_id in chunk_ids], dtype=str
+                ),
+                signatures=signatures,
+                parameters=self._parameters(),
+            )
+        os.replace(temp_path, path)
+
+    def load(self, directory: str) -> bool:
+        """
+        Load persisted state into this (empty) deduplicator.
+
+        Returns:
+            False if the file is missing or was written with other settings
+            (caller re-registers chunks from their texts)
+        """
+        path = os.path.join(directory, DEDUP_INDEX_FILENAME)
+        if not self.enabled or not os.path.exists(path):
+            return False
+
+        with np.load(path, allow_pickle=False) as data:
+            if not np.array_equal(data["parameters"], self._parameters()):
+                return False
+            chunk_ids = data["chunk_ids"].tolist()
+            digests = data["digests"].tolist()
+            signatures = data["signatures"]
+
+        if self.mode == "near" and len(signatures) != len(chunk_ids):
+            return False
+
+        for i, (chunk_id, digest) in enumerate(zip(chunk_ids, digests)):
+            signature = signatures[i] if self.mode == "near" else None
+            self.add(chunk_id, ChunkFingerprint(digest, signature))
+        return True
+
+    def get_stats(self) -> Dict[str, object]:
+        """Get deduplicator statistics."""
+        return {
+            "mode": self.mode,
+            "threshold": self.threshold,
+            "canonical_chunks": len(self._digests),
+            "lsh_buckets": len(self._buckets),
+        }
+
+
+class StagedDeduplicator:
+    """
+    Pending registrations/removals on top of a ChunkDeduplicator.
+
+    find() sees the pending state, the base deduplicator is only changed by
+    commit(): incremental updates commit once their chunks are indexed, so
+    a failed embedding leaves no canonical id without a vector.
+    """
+
+    def __init__(self, base: ChunkDeduplicator):
+        self.base = base
+        self._added = base.empty_copy()
+        self._removed: Set[str] = set()
+        self._renamed: Dict[str, str] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.base.enabled
+
+    def fingerprint(self, text: str) -> ChunkFingerprint:
+        return self.base.fingerprint(text)
+
+    def find(self, fingerprint: ChunkFingerprint) -> Optional[str]:
+        """Find the canonical chunk a chunk duplicates (pending state)."""
+        canonical_id = self.base.find(fingerprint, exclude=self._removed)
+        if canonical_id is not None:
+            return self._renamed.get(canonical_id, canonical_id)
+        return self._added.find(fingerprint)
+
+    def add(self, chunk_id: str, fingerprint: ChunkFingerprint) -> None:
+        self._added.add(chunk_id, fingerprint)
+
+    def remove(self, chunk_id: str) -> None:
+        if self._added.remove(chunk_id) is None:
+            self._removed.add(chunk_id)
+
+    def rename(self, old_id: str, new_id: str) -> None:
+        self._renamed[old_id] = new_id
+
+    def commit(self) -> None:
+        """Apply the pending changes to the base deduplicator."""
+        for old_id, new_id in self._renamed.items():
+            self.base.rename(old_id, new_id)
+        for chunk_id in self._removed:
+            self.base.remove(chunk_id)
+        for chunk_id in list(self._added._digests):
+            self.base.add(chunk_id, self._added.remove(chunk_id))
+        self._renamed.clear()
+        self._removed.clear()
+
+
+def get_deduplicator() -> ChunkDeduplicator:
+    """Deduplicator configured từ RAG_DEDUP_MODE / RAG_DEDUP_THRESHOLD env."""
+    return ChunkDeduplicator(
+        mode=os.getenv("RAG_DEDUP_MODE", "near").lower(),
+        threshold=float(os.getenv("RAG_DEDUP_THRESHOLD", "0.8")),
+    )
+
+
+__all__ = [
+    "ChunkDeduplicator",
+    "ChunkFingerprint",
+    "StagedDeduplicator",
+    "get_deduplicator",
+    "normalize_text",
+    "DEDUP_INDEX_FILENAME",
+]
@@ -0,0 +1,260 @@
+"""
+Embedding caches cho RAG vector store.
+
+QueryEmbeddingCache: bounded LRU (size + TTL) query → vector, tránh chạy lại
+encoder cho các câu hỏi lặp lại (ví dụ "Python là gì?").
+
+PersistentEmbeddingCache: content-addressed SQLite cache (model, sha256 của
+chunk text) → float32 vector, để full rebuilds chỉ encode chunks mới/đã đổi.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# SQLite host parameter limit per IN (...) lookup
+_LOOKUP_BATCH = 500
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Normalize query text: Unicode NFC, case-folded, collapsed whitespace."""
+    normalized = unicodedata.normalize("NFC", query).casefold()
+    return _WHITESPACE_RE.sub(" ", normalized).strip()
+
+
+class QueryEmbeddingCache:
+    """Thread-safe LRU cache of query embeddings với TTL."""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: Optional[float] = 3600):
+        """
+        Initialize query embedding cache.
+
+        Args:
+            max_size: Maximum cached queries (0 disables the cache)
+            ttl_seconds: Entry lifetime in seconds (None = no expiry)
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, np.ndarray]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(
+        self, model_name: str, query: str, embed: Callable[[str], Any]
+    ) -> np.ndarray:
+        """
+        Get cached embedding or compute it from the normalized query.
+
+        Args:
+            model_name: Embedding model name (part of the cache key)
+            query: Raw query text
+            embed: Function embedding a single text
+
+        Returns:
+            Read-only float32 query vector
+        """
+        normalized = normalize_query(query)
+        key = (model_name, normalized)
+
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+
+        vector = np.asarray(embed(normalized), dtype=np.float32)
+        vector.flags.writeable = False
+        self._put(key, vector)
+        return vector
+
+    def _get(self, key: Tuple[str, str]) -> Optional[np.ndarray]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            created_at, vector = entry
+            if self.ttl_seconds is not None and (
+                time.monotonic() - created_at > self.ttl_seconds
+            ):
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def _put(self, key: Tuple[str, str], vector: np.ndarray) -> None:
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic(), vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached embeddings."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+class PersistentEmbeddingCache:
+    """On-disk embedding cache keyed by (model name, sha256 of chunk text)."""
+
+    def __init__(self, path: str):
+        """
+        Initialize persistent embedding cache.
+
+        Args:
+            path: SQLite database file (created if missing)
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        """Content hash của chunk text."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, model_name: str, texts: List[str]) -> Dict[int, np.ndarray]:
+        """
+        Look up cached embeddings.
+
+        Args:
+            model_name: Embedding model name
+            texts: Chunk texts
+
+        Returns:
+            Mapping text position -> float32 vector (cache hits only)
+        """
+        positions: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            positions.setdefault(self.hash_text(text), []).append(i)
+
+        found: Dict[int, np.ndarray] = {}
+        hashes = list(positions)
+
+        with self._lock:
+            for start in range(0, len(hashes), _LOOKUP_BATCH):
+                batch = hashes[start : start + _LOOKUP_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model_name, *batch],
+                )
+                for text_hash, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    for i in positions[text_hash]:
+                        found[i] = vector
+
+            self.hits += len(found)
+            self.misses += len(texts) - len(found)
+
+        return found
+
+    def put_many(
+        self, model_name: str, texts: List[str], vectors: np.ndarray
+    ) -> None:
+        """Store embeddings for chunk texts."""
+        rows = [
+            (
+                model_name,
+                self.hash_text(text),
+                len(vector),
+                np.asarray(vector, dtype=np.float32).tobytes(),
+            )
+            for text, vector in zip(texts, vectors)
+        ]
+        if not rows:
+            return
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, dim, vector) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def clear(self, model_name: Optional[str] = None) -> None:
+        """Remove cached embeddings (all models or one model)."""
+        with self._lock:
+            if model_name:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE model = ?", (model_name,)
+                )
+            else:
+                self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close SQLite connection."""
+        with self._lock:
+            self._conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics."""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            total = self.hits + self.misses
+            return {
+                "path": self.path,
+                "size": size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+__all__ = ["QueryEmbeddingCache", "PersistentEmbeddingCache", "normalize_query"]
@@ -0,0 +1,286 @@
+"""
+Batched embedding pipeline cho FAISS index builds.
+
+Chia chunk texts thành batches cố định và embed tuần tự (in-process) hoặc
+song song trên N worker processes - mỗi process có model copy riêng và
+torch thread budget riêng để tránh oversubscription. Với PersistentEmbeddingCache,
+chỉ các chunk chưa có trong cache được encode.
+"""
+
+import os
+import time
+import logging
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from embedding_cache import PersistentEmbeddingCache
+
+logger = logging.getLogger(__name__)
+
+# Per-process model (initialized by _init_worker)
+_WORKER_MODEL = None
+_WORKER_NORMALIZE = True
+
+
+def _init_worker(model_name: str, device: str, threads: int, normalize: bool) -> None:
+    """Load embedding model once per worker process với torch thread budget."""
+    global _WORKER_MODEL, _WORKER_NORMALIZE
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    torch.set_num_threads(threads)
+    _WORKER_MODEL = SentenceTransformer(model_name, device=device)
+    _WORKER_NORMALIZE = normalize
+
+
+def _encode_batch(texts: List[str]) -> np.ndarray:
+    """Encode one batch trong worker process."""
+    return _WORKER_MODEL.encode(
+        texts,
+        batch_size=len(texts),
+        normalize_embeddings=_WORKER_NORMALIZE,
+        convert_to_numpy=True,
+        show_progress_bar=False,
+    ).astype(np.float32)
+
+
+class EmbeddingPipeline:
+    """Embed chunk texts theo batches, optional fan-out sang worker processes."""
+
+    def __init__(
+        self,
+        model_name: str,
+        embed_documents: Optional[Callable[[List[str]], List[List[float]]]] = None,
+        batch_size: Optional[int] = None,
+        num_workers: Optional[int] = None,
+        device: Optional[str] = None,
+        threads_per_worker: Optional[int] = None,
+        normalize: bool = True,
+        log_every: int = 10,
+        cache: Optional[PersistentEmbeddingCache] = None,
+    ):
+        """
+        Initialize embedding pipeline.
+
+        Args:
+            model_name: SentenceTransformer model name
+            embed_documents: In-process embed function (reuses the already loaded
+                model when num_workers <= 1)
+            batch_size: Texts per batch (default: EMBEDDING_BATCH_SIZE env or 64)
+            num_workers: Worker processes (default: EMBEDDING_WORKERS env or 1)
+            device: Torch device (default: EMBEDDING_DEVICE env or "cpu")
+            threads_per_worker: Torch threads per worker
+                (default: EMBEDDING_THREADS_PER_WORKER env or cpu_count // workers)
+            normalize: L2-normalize embeddings
+            log_every: Log progress every N batches
+            cache: Persistent embedding cache (only misses are encoded)
+        """
+        self.model_name = model_name
+        self.embed_documents = embed_documents
+        self.batch_size = batch_size or int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+        self.num_workers = num_workers or int(os.getenv("EMBEDDING_WORKERS", "1"))
+        self.device = device or get_embedding_device()
+        self.threads_per_worker = threads_per_worker or int(
+            os.getenv(
+                "EMBEDDING_THREADS_PER_WORKER",
+                str(max(1, (os.cpu_count() or 1) // self.num_workers)),
+            )
+        )
+        self.normalize = normalize
+        self.log_every = log_every
+        self.cache = cache
+
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    def embed(
+        self,
+        texts: List[str],
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ) -> np.ndarray:
+        """
+        Embed texts theo batches.
+
+        Args:
+            texts: Chunk texts
+            progress_callback: Called with (embedded_count, total) after each batch
+
+        Returns:
+            float32 matrix (len(texts), dim), same order as texts
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        cached = self.cache.get_many(self.model_name, texts) if self.cache else {}
+        if cached:
+            logger.info(f"♻️ Embedding cache: {len(cached)}/{len(texts)} chunks cached")
+            if len(cached) == len(texts):
+                self.last_run = {"chunks": len(texts), "cached": len(cached)}
+                return np.vstack([cached[i] for i in range(len(texts))])
+
+        missing = [i for i in range(len(texts)) if i not in cached]
+        encoded = self._encode(
+            [texts[i] for i in missing], progress_callback, cached=len(cached)
+        )
+
+        if self.cache:
+            self.cache.put_many(self.model_name, [texts[i] for i in missing], encoded)
+        if not cached:
+            return encoded
+
+        vectors = np.empty((len(texts), encoded.shape[1]), dtype=np.float32)
+        for i, vector in cached.items():
+            vectors[i] = vector
+        vectors[missing] = encoded
+        return vectors
+
+    def _encode(
+        self,
+        texts: List[str],
+        progress_callback: Optional[Callable[[int, int], None]],
+        cached: int = 0,
+    ) -> np.ndarray:
+        """Encode texts theo batches (in-process hoặc worker pool)."""
+        batches = [
+            texts[i : i + self.batch_size]
+            for i in range(0, len(texts), self.batch_size)
+        ]
+        # Worker startup (model load per process) only pays off for large builds
+        use_workers = self.num_workers > 1 and len(batches) > self.num_workers
+
+        logger.info(
+            f"🧮 Embedding {len(texts)} chunks in {len(batches)} batches "
+            f"(batch_size={self.batch_size}, "
+            f"workers={self.num_workers if use_workers else 1}, device={self.device})"
+        )
+
+        start = time.perf_counter()
+        progress = _ProgressReporter(len(texts), start, self.log_every, progress_callback)
+
+        if use_workers:
+            results = self._embed_with_workers(batches, progress)
+        else:
+            results = self._embed_in_process(batches, progress)
+
+        vectors = np.vstack(results).astype(np.float32, copy=False)
+        elapsed = time.perf_counter() - start
+
+        self.last_run = {
+            "chunks": len(texts) + cached,
+            "cached": cached,
+            "batches": len(batches),
+            "workers": self.num_workers if use_workers else 1,
+            "seconds": round(elapsed, 3),
+            "docs_per_sec": round(len(texts) / elapsed, 1) if elapsed else None,
+        }
+        logger.info(
+            f"✅ Embedded {len(texts)} chunks in {elapsed:.1f}s "
+            f"({self.last_run['docs_per_sec']} docs/sec)"
+        )
+        return vectors
+
+    def _embed_in_process(
+        self, batches: List[List[str]], progress: "_ProgressReporter"
+    ) -> List[np.ndarray]:
+        """Embed batches sequentially với in-process model."""
+        if self.embed_documents is None:
+            _init_worker(
+                self.model_name, self.device, self.threads_per_worker, self.normalize
+            )
+            self.embed_documents = lambda batch: _encode_batch(batch)
+
+        results = []
+        for batch in batches:
+            results.append(np.asarray(self.embed_documents(batch), dtype=np.float32))
+            progress.update(len(batch))
+        return results
+
+    def _embed_with_workers(
+        self, batches: List[List[str]], progress: "_ProgressReporter"
+    ) -> List[np.ndarray]:
+        """Embed batches trên process pool, giữ tối đa 2 batches/worker in flight."""
+        results: List[Optional[np.ndarray]] = [None] * len(batches)
+        max_in_flight = self.num_workers * 2
+
+        with ProcessPoolExecutor(
+            max_workers=self.num_workers,
+            # spawn: torch không fork-safe sau khi đã load model trong parent
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                self.model_name,
+                self.device,
+                self.threads_per_worker,
+                self.normalize,
+            ),
+        ) as pool:
+            pending = {}
+            next_batch = 0
+
+            while next_batch < len(batches) or pending:
+                while next_batch < len(batches) and len(pending) < max_in_flight:
+                    future = pool.submit(_encode_batch, batches[next_batch])
+                    pending[future] = next_batch
+                    next_batch += 1
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch_index = pending.pop(future)
+                    results[batch_index] = future.result()
+                    progress.update(len(batches[batch_index]))
+
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pipeline configuration và last run statistics."""
+        return {
+            "batch_size": self.batch_size,
+            "num_workers": self.num_workers,
+            "threads_per_worker": self.threads_per_worker,
+            "device": self.device,
+            "last_run": self.last_run,
+            "cache": self.cache.get_stats() if self.cache else None,
+        }
+
+
+class _ProgressReporter:
+    """Log embedding progress và throughput."""
+
+    def __init__(
+        self,
+        total: int,
+        start: float,
+        log_every: int,
+        callback: Optional[Callable[[int, int], None]],
+    ):
+        self.total = total
+        self.start = start
+        self.log_every = log_every
+        self.callback = callback
+        self.done = 0
+        self.batches = 0
+
+    def update(self, count: int) -> None:
+        self.done += count
+        self.batches += 1
+
+        if self.callback:
+            self.callback(self.done, self.total)
+
+        if self.batches % self.log_every == 0 or self.done == self.total:
+            elapsed = time.perf_counter() - self.start
+            rate = self.done / elapsed if elapsed else 0.0
+            logger.info(
+                f"📈 Embedded {self.done}/{self.total} chunks ({rate:.1f} docs/sec)"
+            )
+
+
+def get_embedding_device() -> str:
+    """Embedding device từ EMBEDDING_DEVICE env (cpu, cuda, cuda:0, mps...)."""
+    return os.getenv("EMBEDDING_DEVICE", "cpu")
+
+
+__all__ = ["EmbeddingPipeline", "get_embedding_device"]
@@ -0,0 +1,244 @@
+"""
+Configurable FAISS index factory cho LangChainVectorStore.
+
+Index types (FAISS_INDEX_TYPE env, mặc định "flat"):
+    flat   - IndexFlatL2, exact search (baseline)
+    hnsw   - IndexHNSWFlat, graph search, không cần training
+    ivf    - IndexIVFFlat, k-means centroids trained trên sample
+    ivfpq  - IndexIVFPQ, IVF + product quantization (RAM nhỏ nhất)
+    sq8    - IndexScalarQuantizer 8-bit (RAM ~1/4 của flat)
+
+Tất cả dùng L2 metric nên similarity = 1 / (1 + distance) vẫn đúng. Index
+được persist qua FAISS.save_local / load_local như flat index.
+
+LangChain FAISS.delete giả định remove_ids renumber ids (chỉ đúng với flat-code
+indexes: flat, sq8). HNSW không remove được và IVF giữ nguyên ids, nên các
+index đó được compact bằng cách re-add các vectors còn lại vào một clone rỗng
+(giữ nguyên trained centroids).
+"""
+
+import os
+import logging
+from typing import List, Tuple
+
+import faiss
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ("flat", "hnsw", "ivf", "ivfpq", "sq8")
+
+# Minimum training vectors for PQ codebooks (2^8 centroids per sub-quantizer)
+_MIN_PQ_TRAINING = 256
+
+
+def get_index_type() -> str:
+    """Index type từ FAISS_INDEX_TYPE env (flat, hnsw, ivf, ivfpq, sq8)."""
+    index_type = os.getenv("FAISS_INDEX_TYPE", "flat").lower()
+    if index_type not in INDEX_TYPES:
+        raise ValueError(
+            f"Unsupported FAISS_INDEX_TYPE: {index_type} "
+            f"(expected one of {', '.join(INDEX_TYPES)})"
+        )
+    return index_type
+
+
+def create_index(index_type: str, training_vectors: np.ndarray) -> faiss.Index:
+    """
+    Create an empty (trained) index.
+
+    Args:
+        index_type: One of INDEX_TYPES
+        training_vectors: float32 matrix (n, dim); a sample of at most
+            FAISS_TRAIN_SAMPLE rows (default 50000) is used for training
+
+    Returns:
+        Trained, empty FAISS index với search parameters applied
+    """
+    n, dim = training_vectors.shape
+    sample = _training_sample(training_vectors)
+
+    if index_type == "ivfpq" and n < _MIN_PQ_TRAINING:
+        logger.warning(
+            f"Only {n} vectors, not enough to train PQ codebooks - using sq8"
+        )
+        index_type = "sq8"
+
+    if index_type == "flat":
+        index = faiss.IndexFlatL2(dim)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, int(os.getenv("FAISS_HNSW_M", "32")))
+        index.hnsw.efConstruction = int(
+            os.getenv("FAISS_HNSW_EF_CONSTRUCTION", "80")
+        )
+    elif index_type == "sq8":
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit)
+    elif index_type in ("ivf", "ivfpq"):
+        nlist = _get_nlist(n)
+        quantizer = faiss.IndexFlatL2(dim)
+        if index_type == "ivf":
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist)
+        else:
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist, _get_pq_m(dim), 8)
+        # Array direct map: reconstruct() for hybrid scoring và compaction
+        index.set_direct_map_type(faiss.DirectMap.Array)
+    else:
+        raise ValueError(f"Unsupported index type: {index_type}")
+
+    if not index.is_trained:
+        logger.info(f"Training {index_type} index on {len(sample)} vectors...")
+        index.train(sample)
+
+    configure_search(index)
+    return index
+
+
+def _training_sample(vectors: np.ndarray) -> np.ndarray:
+    """Random training sample (FAISS_TRAIN_SAMPLE rows max)."""
+    limit = int(os.getenv("FAISS_TRAIN_SAMPLE", "50000"))
+    if len(vectors) <= limit:
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+
+    rows = np.random.default_rng(0).choice(len(vectors), limit, replace=False)
+    return np.ascontiguousarray(vectors[np.sort(rows)], dtype=np.float32)
+
+
+def _get_nlist(n: int) -> int:
+    """IVF list count: FAISS_NLIST env hoặc ~4*sqrt(n), >= 39 vectors per list."""
+    nlist = int(os.getenv("FAISS_NLIST", "0")) or int(4 * np.sqrt(n))
+    return max(1, min(nlist, n // 39))
+
+
+def _get_pq_m(dim: int) -> int:
+    """PQ sub-quantizers (FAISS_PQ_M env, default dim / 8), must divide dim."""
+    m = int(os.getenv("FAISS_PQ_M", "0")) or max(1, dim // 8)
+    while dim % m:
+        m -= 1
+    return m
+
+
+def read_index_mmapped(path: str) -> faiss.Index:
+    """
+    Read a persisted index read-only, vectors mapped from the page cache.
+
+    IO_FLAG_MMAP only maps IVF inverted lists (flat, sq8 and HNSW storage are
+    still copied to the heap); IndexFlatCodes storage needs IO_FLAG_MMAP_IFC,
+    which cannot be combined with IVF lists. The fourcc picks the flag.
+    """
+    with open(path, "rb") as f:
+        fourcc = f.read(4)
+
+    # IVF fourccs: "IwFl", "IwPQ", "IwSq", ... (legacy "IvFl", "IvPQ")
+    if fourcc[:2] in (b"Iw", b"Iv"):
+        flags = faiss.IO_FLAG_MMAP
+    else:
+        flags = faiss.IO_FLAG_MMAP_IFC
+    return faiss.read_index(path, flags | faiss.IO_FLAG_READ_ONLY)
+
+
+def configure_search(index: faiss.Index) -> None:
+    """Apply search-time parameters (FAISS_NPROBE, FAISS_HNSW_EF_SEARCH)."""
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexIVF):
+        index.nprobe = min(int(os.getenv("FAISS_NPROBE", "16")), index.nlist)
+    elif isinstance(index, faiss.IndexHNSW):
+        index.hnsw.efSearch = int(os.getenv("FAISS_HNSW_EF_SEARCH", "64"))
+
+
+def describe_index(index: faiss.Index) -> str:
+    """Index type name of an index (built or loaded from disk)."""
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexIVFPQ):
+        return "ivfpq"
+    if isinstance(index, faiss.IndexIVF):
+        return "ivf"
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(index, faiss.IndexScalarQuantizer):
+        return "sq8"
+    if isinstance(index, faiss.IndexFlat):
+        return "flat"
+    return type(index).__name__
+
+
+def is_exact(index: faiss.Index) -> bool:
+    """True for exhaustive flat indexes (IDSelector search is exact)."""
+    return isinstance(faiss.downcast_index(index), faiss.IndexFlat)
+
+
+def supports_remove_ids(index: faiss.Index) -> bool:
+    """True when remove_ids renumbers ids the way LangChain FAISS.delete expects."""
+    return isinstance(faiss.downcast_index(index), faiss.IndexFlatCodes)
+
+
+def compact_index(index: faiss.Index, keep_ids: np.ndarray) -> faiss.Index:
+    """
+    Rebuild an index keeping only keep_ids (renumbered 0..len-1 in order).
+
+    Used for HNSW/IVF indexes, where remove_ids is unsupported or keeps
+    ids. The trained quantizer/centroids are reused; IVF-PQ vectors are
+    re-added from their decoded approximation.
+    """
+    vectors = reconstruct_vectors(index, keep_ids)
+    compacted = faiss.clone_index(faiss.downcast_index(index))
+    compacted.reset()
+    if len(vectors):
+        compacted.add(vectors)
+    configure_search(compacted)
+    return compacted
+
+
+def reconstruct_vectors(index: faiss.Index, ids: np.ndarray) -> np.ndarray:
+    """Stored (or decoded) vectors for the given ids."""
+    ids = np.asarray(ids, dtype=np.int64)
+    if len(ids) == 0:
+        return np.empty((0, index.d), dtype=np.float32)
+    return index.reconstruct_batch(ids)
+
+
+def search_subset(
+    index: faiss.Index, query_vector: np.ndarray, ids: np.ndarray, k: int
+) -> List[Tuple[int, float]]:
+    """
+    Exact L2 search restricted to ids (filtered search on approximate indexes).
+
+    IVF/HNSW searches với IDSelector only see the probed lists / visited
+    graph nodes, so selective filters could return too few hits.
+
+    Returns:
+        List of (id, squared L2 distance) ordered by distance
+    """
+    vectors = reconstruct_vectors(index, ids)
+    distances = np.sum((vectors - query_vector[0]) ** 2, axis=1)
+    k = min(k, len(ids))
+    top = np.argpartition(distances, k - 1)[:k] if k < len(ids) else np.arange(k)
+    top = top[np.argsort(distances[top])]
+    return [(int(ids[i]), float(distances[i])) for i in top]
+
+
+def search_parameters(
+    index: faiss.Index, selector: faiss.IDSelector
+) -> faiss.SearchParameters:
+    """IDSelector search parameters matching the index type."""
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexIVF):
+        return faiss.SearchParametersIVF(sel=selector, nprobe=index.nprobe)
+    if isinstance(index, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+    return faiss.SearchParameters(sel=selector)
+
+
+__all__ = [
+    "INDEX_TYPES",
+    "get_index_type",
+    "create_index",
+    "configure_search",
+    "read_index_mmapped",
+    "describe_index",
+    "is_exact",
+    "supports_remove_ids",
+    "compact_index",
+    "reconstruct_vectors",
+    "search_subset",
+    "search_parameters",
+]
@@ -0,0 +1,272 @@
+"""
+Local BM25 lexical index cho hybrid retrieval.
+
+MiniLM embeddings yếu với Vietnamese keywords và code identifiers, nên chunks
+cũng được index bằng BM25 (inverted index in-memory, persist cạnh FAISS index)
+và kết hợp với vector results qua Reciprocal Rank Fusion.
+
+Tokenization:
+    - Unicode word tokens (NFC), lowercase
+    - Vietnamese syllable bigrams ("học máy" -> "học_máy") vì từ ghép tiếng
+      Việt thường gồm hai âm tiết
+    - Code identifiers được tách thêm thành parts
+      ("get_all_documents" -> get, all, documents; "loadIndex" -> load, index)
+    - Optional diacritic folding ("học" -> "hoc", "đ" -> "d") để queries gõ
+      không dấu vẫn match
+"""
+
+import os
+import re
+import json
+import math
+import heapq
+import logging
+import unicodedata
+from collections import Counter
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+LEXICAL_INDEX_FILENAME = "lexical_index.json"
+
+_WORD_RE = re.compile(r"\w+")
+_CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def fold_diacritics(text: str) -> str:
+    """Remove Vietnamese diacritics ("Đường học" -> "Duong hoc")."""
+    text = text.replace("đ", "d").replace("Đ", "D")
+    decomposed = unicodedata.normalize("NFD", text)
+    return "".join(ch for ch in decomposed if unicodedata.category(ch) != "Mn")
+
+
+def tokenize(text: str, fold: bool = True, bigrams: bool = True) -> List[str]:
+    """
+    Tokenize text cho BM25.
+
+    Args:
+        text: Input text
+        fold: Fold diacritics
+        bigrams: Add adjacent word bigrams
+
+    Returns:
+        List of terms (unigrams, identifier parts, bigrams)
+    """
+    text = unicodedata.normalize("NFC", text)
+    if fold:
+        text = fold_diacritics(text)
+
+    words = _WORD_RE.findall(text)
+    terms: List[str] = []
+    for word in words:
+        lowered = word.lower()
+        terms.append(lowered)
+
+        # Split code identifiers (snake_case / camelCase) into parts
+        if "_" in word or (not word.islower() and not word.isupper()):
+            parts = [
+                part.lower()
+                for piece in word.split("_")
+                for part in _CAMEL_RE.findall(piece)
+            ]
+            if len(parts) > 1:
+                terms.extend(parts)
+
+    if bigrams:
+        lowered_words = [word.lower() for word in words]
+        terms.extend(
+            f"{first}_{second}"
+            for first, second in zip(lowered_words, lowered_words[1:])
+        )
+
+    return terms
+
+
+class BM25Index:
+    """Incremental BM25 (Okapi) inverted index keyed by chunk id."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, fold: bool = True):
+        """
+        Initialize BM25 index.
+
+        Args:
+            k1: Term frequency saturation
+            b: Length normalization
+            fold: Fold diacritics khi tokenize documents và queries
+        """
+        self.k1 = k1
+        self.b = b
+        self.fold = fold
+
+        # term -> {chunk_id: term frequency}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        # chunk_id -> document length (terms)
+        self._doc_lengths: Dict[str, int] = {}
+        # chunk_id -> distinct terms (for removal)
+        self._doc_terms: Dict[str, List[str]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def analyze(self, text: str) -> Dict[str, int]:
+        """Term frequencies of a chunk text (computed outside index locks)."""
+        return Counter(tokenize(text, fold=self.fold))
+
+    def add(self, chunk_id: str, text: str) -> None:
+        """Index (or re-index) one chunk."""
+        self.add_terms(chunk_id, self.analyze(text))
+
+    def add_terms(self, chunk_id: str, term_counts: Dict[str, int]) -> None:
+        """Index one chunk from precomputed term frequencies."""
+        if chunk_id in self._doc_lengths:
+            self.remove(chunk_id)
+
+        for term, count in term_counts.items():
+            self._postings.setdefault(term, {})[chunk_id] = count
+
+        length = sum(term_counts.values())
+        self._doc_lengths[chunk_id] = length
+        self._doc_terms[chunk_id] = list(term_counts)
+        self._total_length += length
+
+    def remove(self, chunk_id: str) -> None:
+        """Remove one chunk (no-op if absent)."""
+        terms = self._doc_terms.pop(chunk_id, None)
+        if terms is None:
+            return
+
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(chunk_id, None)
+            if not postings:
+                del self._postings[term]
+
+        self._total_length -= self._doc_lengths.pop(chunk_id)
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        allowed_ids: Optional[Set[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Rank chunks by BM25 score.
+
+        Args:
+            query: Search query
+            top_k: Number of results
+            allowed_ids: Restrict results to these chunk ids (filters)
+
+        Returns:
+            List of (chunk_id, score) ordered by score
+        """
+        if not self._doc_lengths:
+            return []
+
+        doc_count = len(self._doc_lengths)
+        avg_length = self._total_length / doc_count
+        scores: Dict[str, float] = {}
+
+        for term in set(tokenize(query, fold=self.fold)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+
+            df = len(postings)
+            idf = math.log(1.0 + (doc_count - df + 0.5) / (df + 0.5))
+            for chunk_id, tf in postings.items():
+                if allowed_ids is not None and chunk_id not in allowed_ids:
+                    continue
+                norm = self.k1 * (
+                    1.0 - self.b + self.b * self._doc_lengths[chunk_id] / avg_length
+                )
+                score = idf * tf * (self.k1 + 1.0) / (tf + norm)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + score
+
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+    def save(self, directory: str) -> None:
+        """Persist index atomically (per-chunk term frequencies)."""
+        path = os.path.join(directory, LEXICAL_INDEX_FILENAME)
+        temp_path = path + ".tmp"
+
+        chunks: Dict[str, Dict[str, int]] = {
+            chunk_id: {} for chunk_id in self._doc_terms
+        }
+        for term, postings in self._postings.items():
+            for chunk_id, count in postings.items():
+                chunks[chunk_id][term] = count
+
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"k1": self.k1, "b": self.b, "fold": self.fold, "chunks": chunks},
+                f,
+                ensure_ascii=False,
+                separators=(",", ":"),
+            )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["BM25Index"]:
+        """Load persisted index (None if missing)."""
+        path = os.path.join(directory, LEXICAL_INDEX_FILENAME)
+        if not os.path.exists(path):
+            return None
+
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        index = cls(k1=data["k1"], b=data["b"], fold=data["fold"])
+        for chunk_id, term_counts in data["chunks"].items():
+            index.add_terms(chunk_id, term_counts)
+        return index
+
+    def get_stats(self) -> Dict[str, object]:
+        """Get index statistics."""
+        return {
+            "chunks": len(self._doc_lengths),
+            "terms": len(self._postings),
+            "avg_chunk_terms": (
+                round(self._total_length / len(self._doc_lengths), 1)
+                if self._doc_lengths
+                else 0
+            ),
+            "fold_diacritics": self.fold,
+        }
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Iterable[Hashable]],
+    k: int = 60,
+    weights: Optional[Sequence[float]] = None,
+) -> List[Tuple[Hashable, float]]:
+    """
+    Fuse ranked lists với Reciprocal Rank Fusion: score = sum(w / (k + rank)).
+
+    Args:
+        rankings: Ranked lists of keys (best first)
+        k: RRF constant (dampens the weight of top ranks)
+        weights: Optional weight per ranking
+
+    Returns:
+        List of (key, fused score) ordered by score
+    """
+    weights = weights or [1.0] * len(rankings)
+    scores: Dict[Hashable, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + weight / (k + rank)
+
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+__all__ = [
+    "BM25Index",
+    "tokenize",
+    "fold_diacritics",
+    "reciprocal_rank_fusion",
+    "LEXICAL_INDEX_FILENAME",
+]
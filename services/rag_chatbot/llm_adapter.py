@@ -1,10 +1,20 @@
 import os
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+from collections import OrderedDict
+from typing import AsyncIterator, Iterator, List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
 import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
-import time
+from google.api_core import exceptions as google_exceptions
+from google.generativeai.types import (
+    BlockedPromptException,
+    HarmBlockThreshold,
+    HarmCategory,
+    StopCandidateException,
+)
+import re
+from circuit_breaker import CircuitBreaker
 from schemas import ChatConfig
 
 # Load environment variables from parent directory
@@ -12,6 +22,36 @@ load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "..", ".env"))
 
 logger = logging.getLogger(__name__)
 
+# Word-level chunks (kèm whitespace) cho canned streaming
+_CHUNK_RE = re.compile(r"\S+\s*|\s+")
+
+FAILURE_MESSAGE = (
+    "Xin lỗi, tôi không thể trả lời câu hỏi này lúc này. Vui lòng thử lại sau."
+)
+
+
+class LLMUnavailableError(RuntimeError):
+    """No real model answer (canned mode, or every model failed / circuit open)."""
+
+
+# Errors caused by one prompt (safety block, invalid request): the model is
+# healthy, so they are not counted against its breaker. Blocked responses
+# raise ValueError from response.text / chunk.text
+_REQUEST_ERRORS = (
+    ValueError,
+    BlockedPromptException,
+    StopCandidateException,
+    google_exceptions.InvalidArgument,
+)
+
+
+def _is_rate_limit(error: Exception) -> bool:
+    """Quota / rate limit errors (HTTP 429) open a model's breaker immediately."""
+    return (
+        isinstance(error, google_exceptions.ResourceExhausted)
+        or getattr(error, "code", None) == 429
+    )
+
 
 class GeminiChatAdapter:
     """Gemini LLM adapter tối ưu cho RAG chatbot conversations."""
@@ -37,6 +77,23 @@ class GeminiChatAdapter:
 
         self.current_model = self.default_model
 
+        # Model instances reused per (model, generation config), LRU-bounded
+        self.model_cache_size = int(os.getenv("GEMINI_MODEL_CACHE_SIZE", "32"))
+        self._models: "OrderedDict[Tuple, genai.GenerativeModel]" = OrderedDict()
+        self._models_lock = threading.Lock()
+
+        # Failing models are skipped until a half-open probe succeeds
+        self.breakers = {
+            model_name: CircuitBreaker(
+                model_name,
+                failure_threshold=int(os.getenv("GEMINI_BREAKER_FAILURES", "3")),
+                recovery_timeout=float(
+                    os.getenv("GEMINI_BREAKER_RECOVERY_SECONDS", "30")
+                ),
+            )
+            for model_name in self.model_fallback
+        }
+
         if not self.use_canned_responses:
             if not self.api_key:
                 raise ValueError("GEMINI_API_KEY không được cung cấp trong .env file")
@@ -48,7 +105,10 @@ class GeminiChatAdapter:
             logger.info("Using canned responses for chat (development mode)")
 
     def generate_response(
-        self, messages: List[Dict[str, str]], config: ChatConfig
+        self,
+        messages: List[Dict[str, str]],
+        config: ChatConfig,
+        raise_on_failure: bool = False,
     ) -> str:
         """
         Generate chat response từ conversation messages.
@@ -56,50 +116,228 @@ class GeminiChatAdapter:
         Args:
             messages: List of messages [{"role": "system/user/assistant", "content": "..."}]
             config: Chat configuration
+            raise_on_failure: Raise LLMUnavailableError instead of returning
+                the canned / apology text (callers that persist the output)
 
         Returns:
             Generated response text
         """
         if self.use_canned_responses:
+            if raise_on_failure:
+                raise LLMUnavailableError("Canned responses enabled (USE_CANNED_LLM)")
             logger.info(
                 f"Using canned responses (use_canned={self.use_canned_responses})"
             )
             return self._get_canned_response(messages)
 
-        return self._generate_with_retry(messages, config)
+        response = self._generate_with_retry(messages, config)
+        if response is None:
+            if raise_on_failure:
+                raise LLMUnavailableError("All Gemini models failed")
+            return FAILURE_MESSAGE
+        return response
+
+    async def agenerate_response(
+        self,
+        messages: List[Dict[str, str]],
+        config: ChatConfig,
+        raise_on_failure: bool = False,
+    ) -> str:
+        """
+        Async version of generate_response (non-blocking Gemini I/O).
+
+        Args:
+            messages: List of messages [{"role": "system/user/assistant", "content": "..."}]
+            config: Chat configuration
+            raise_on_failure: Raise LLMUnavailableError instead of returning
+                the canned / apology text (callers that persist the output)
+
+        Returns:
+            Generated response text
+        """
+        if self.use_canned_responses:
+            if raise_on_failure:
+                raise LLMUnavailableError("Canned responses enabled (USE_CANNED_LLM)")
+            return self._get_canned_response(messages)
+
+        response = await self._agenerate_with_retry(messages, config)
+        if response is None:
+            if raise_on_failure:
+                raise LLMUnavailableError("All Gemini models failed")
+            return FAILURE_MESSAGE
+        return response
+
+    async def astream_response(
+        self,
+        messages: List[Dict[str, str]],
+        config: ChatConfig,
+        raise_on_failure: bool = False,
+    ) -> AsyncIterator[str]:
+        """
+        Stream response text chunks từ Gemini streaming API.
+
+        Canned mode cũng stream (theo từng từ) để test offline.
+
+        Args:
+            messages: List of messages [{"role": "system/user/assistant", "content": "..."}]
+            config: Chat configuration
+            raise_on_failure: Raise LLMUnavailableError instead of streaming
+                the canned / apology text
+
+        Yields:
+            Response text chunks
+        """
+        if self.use_canned_responses:
+            if raise_on_failure:
+                raise LLMUnavailableError("Canned responses enabled (USE_CANNED_LLM)")
+            for chunk in _CHUNK_RE.findall(self._get_canned_response(messages)):
+                yield chunk
+                await asyncio.sleep(0)
+            return
+
+        formatted_messages = self._format_messages_for_gemini(messages)
+
+        for model_name in self._available_models():
+            emitted = False
+            try:
+                self.current_model = model_name
+                logger.info(f"Trying streaming chat generation với model: {model_name}")
+
+                model = self._get_model(model_name, config)
+                response = await model.generate_content_async(
+                    formatted_messages, stream=True
+                )
+                async for chunk in response:
+                    if chunk.text:
+                        emitted = True
+                        yield chunk.text
+
+                self.breakers[model_name].record_success()
+                if emitted:
+                    logger.info(f"Chat response streamed successfully với {model_name}")
+                    return
+                logger.warning(f"Empty response từ model {model_name}")
+
+            except Exception as e:
+                self._record_failure(model_name, e)
+                # Không thể fallback khi đã gửi một phần câu trả lời cho client
+                if emitted:
+                    raise
+
+        # All models failed
+        logger.error("All Gemini models failed for chat generation")
+        if raise_on_failure:
+            raise LLMUnavailableError("All Gemini models failed")
+        yield FAILURE_MESSAGE
+
+    def _get_model(self, model_name: str, config: ChatConfig):
+        """Cached model instance for a (model, generation config) pair."""
+        key = (model_name, config.temperature, config.top_p, config.max_tokens)
+        with self._models_lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                return model
+
+        model = self._create_model(model_name, config)
+        with self._models_lock:
+            self._models[key] = model
+            while len(self._models) > self.model_cache_size:
+                self._models.popitem(last=False)
+        return model
+
+    def _available_models(self) -> Iterator[str]:
+        """
+        Fallback models whose circuit breaker admits a request.
+
+        Checked lazily, so a half-open probe is only claimed when the model
+        is actually tried.
+        """
+        for model_name in self.model_fallback:
+            breaker = self.breakers[model_name]
+            if breaker.allow_request():
+                yield model_name
+            else:
+                logger.info(f"⏭️ Skipping {model_name} (circuit {breaker.state})")
+
+    def _record_failure(self, model_name: str, error: Exception) -> None:
+        """Log a model failure và count it against the model's breaker."""
+        if isinstance(error, _REQUEST_ERRORS):
+            logger.warning(f"Model {model_name} rejected the request: {str(error)}")
+            self.breakers[model_name].record_ignored()
+            return
+
+        logger.warning(f"Model {model_name} failed: {str(error)}")
+        self.breakers[model_name].record_failure(trip=_is_rate_limit(error))
+
+    def _create_model(self, model_name: str, config: ChatConfig):
+        """Create Gemini model instance với generation config."""
+        return genai.GenerativeModel(
+            model_name=model_name,
+            generation_config={
+                "temperature": config.temperature,
+                "top_p": config.top_p,
+                "max_output_tokens": config.max_tokens,
+                "candidate_count": 1,
+            },
+            safety_settings={
+                HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
+                HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
+                HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
+                HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+            },
+        )
+
+    async def _agenerate_with_retry(
+        self, messages: List[Dict[str, str]], config: ChatConfig
+    ) -> Optional[str]:
+        """Async generate với retry logic across models (None if all fail)."""
+        formatted_messages = self._format_messages_for_gemini(messages)
+
+        for model_name in self._available_models():
+            try:
+                self.current_model = model_name
+                logger.info(f"Trying async chat generation với model: {model_name}")
+
+                model = self._get_model(model_name, config)
+                response = await model.generate_content_async(formatted_messages)
+                self.breakers[model_name].record_success()
+
+                if response.text:
+                    logger.info(
+                        f"Chat response generated successfully với {model_name}"
+                    )
+                    return response.text.strip()
+                else:
+                    logger.warning(f"Empty response từ model {model_name}")
+                    continue
+
+            except Exception as e:
+                self._record_failure(model_name, e)
+                continue
+
+        # All models failed (or their circuits are open)
+        logger.error("All Gemini models failed for chat generation")
+        return None
 
     def _generate_with_retry(
         self, messages: List[Dict[str, str]], config: ChatConfig
-    ) -> str:
-        """Generate response với retry logic across models."""
+    ) -> Optional[str]:
+        """Generate response với retry logic across models (None if all fail)."""
+        # Convert messages to Gemini format
+        formatted_messages = self._format_messages_for_gemini(messages)
 
-        for model_name in self.model_fallback:
+        for model_name in self._available_models():
             try:
                 self.current_model = model_name
                 logger.info(f"Trying chat generation với model: {model_name}")
 
-                # Create model instance
-                model = genai.GenerativeModel(
-                    model_name=model_name,
-                    generation_config={
-                        "temperature": config.temperature,
-                        "top_p": config.top_p,
-                        "max_output_tokens": config.max_tokens,
-                        "candidate_count": 1,
-                    },
-                    safety_settings={
-                        HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-                        HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-                        HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-                        HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-                    },
-                )
-
-                # Convert messages to Gemini format
-                formatted_messages = self._format_messages_for_gemini(messages)
+                # Reuse cached model instance
+                model = self._get_model(model_name, config)
 
                 # Generate response
                 response = model.generate_content(formatted_messages)
+                self.breakers[model_name].record_success()
 
                 if response.text:
                     logger.info(
@@ -111,16 +349,12 @@ class GeminiChatAdapter:
                     continue
 
             except Exception as e:
-                logger.warning(f"Model {model_name} failed: {str(e)}")
-                if "quota" in str(e).lower() or "limit" in str(e).lower():
-                    time.sleep(2)  # Rate limit backoff
+                self._record_failure(model_name, e)
                 continue
 
-        # All models failed
+        # All models failed (or their circuits are open)
         logger.error("All Gemini models failed for chat generation")
-        return (
-            "Xin lỗi, tôi không thể trả lời câu hỏi này lúc này. Vui lòng thử lại sau."
-        )
+        return None
 
     def _format_messages_for_gemini(self, messages: List[Dict[str, str]]) -> str:
         """
@@ -246,7 +480,12 @@ Bạn có thể đặt câu hỏi cụ thể hơn về một chủ đề để t
             "available_models": self.model_fallback,
             "using_canned": self.use_canned_responses,
             "api_configured": bool(self.api_key) and not self.use_canned_responses,
+            "cached_models": len(self._models),
+            "circuit_breakers": {
+                model_name: breaker.get_state()
+                for model_name, breaker in self.breakers.items()
+            },
         }
 
 
-__all__ = ["GeminiChatAdapter"]
+__all__ = ["GeminiChatAdapter", "LLMUnavailableError"]
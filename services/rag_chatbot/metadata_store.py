@@ -0,0 +1,224 @@
+"""
+Compact binary chunk metadata store cho LangChainVectorStore.
+
+Thay thế documents_metadata.json: mỗi parent document content chỉ được lưu
+một lần, chunks tham chiếu content qua (offset, length). File được ghi atomic
+(temp file + os.replace) và đọc qua mmap - startup chỉ parse index nhỏ,
+content được decode lazily khi search trả về chunk.
+
+File layout (documents_metadata.bin):
+    header   : MAGIC (8 bytes) + index_offset (u64) + index_length (u64)
+    contents : UTF-8 parent contents, concatenated
+    index    : compact JSON {"chunks": {chunk_id: [document_id, offset, length]}}
+"""
+
+import os
+import mmap
+import json
+import struct
+import logging
+import threading
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+METADATA_FILENAME = "documents_metadata.bin"
+LEGACY_METADATA_FILENAME = "documents_metadata.json"
+
+_MAGIC = b"RAGMETA1"
+_HEADER = struct.Struct("<8sQQ")
+
+# chunk_id -> (document_id, content offset, content length)
+ChunkRef = Tuple[str, int, int]
+
+
+class ChunkMetadataStore(MutableMapping):
+    """
+    chunk_id -> {"document_id", "content"} mapping backed by a binary file.
+
+    Persisted entries are read lazily from the mmapped file; entries added
+    since the last save are kept in memory until save() is called.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._mm: Optional[mmap.mmap] = None
+        self._refs: Dict[str, ChunkRef] = {}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def load(cls, directory: str) -> "ChunkMetadataStore":
+        """
+        Load store from a persist directory.
+
+        Falls back to the legacy documents_metadata.json (converted on the
+        next save).
+        """
+        store = cls()
+        path = os.path.join(directory, METADATA_FILENAME)
+        legacy_path = os.path.join(directory, LEGACY_METADATA_FILENAME)
+
+        if os.path.exists(path):
+            store._open(path)
+            logger.info(f"Loaded metadata index for {len(store)} chunks")
+        elif os.path.exists(legacy_path):
+            logger.info("Loading legacy documents_metadata.json")
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                store.update(json.load(f))
+        else:
+            logger.warning("No document metadata found")
+
+        return store
+
+    def save(self, directory: str) -> None:
+        """Write all entries to the binary file atomically, then remap it."""
+        path = os.path.join(directory, METADATA_FILENAME)
+        temp_path = path + ".tmp"
+
+        with self._lock:
+            mm = self._mm
+            refs = dict(self._refs)
+            pending = dict(self._pending)
+
+        new_refs: Dict[str, ChunkRef] = {}
+        # Parent content is stored once: chunks of one document share a span
+        spans: Dict[Any, Tuple[int, int]] = {}
+        offset = _HEADER.size
+
+        with open(temp_path, "wb") as f:
+            f.write(b"\0" * _HEADER.size)
+
+            def write_content(key: Any, data: bytes) -> Tuple[int, int]:
+                nonlocal offset
+                span = spans.get(key)
+                if span is None:
+                    f.write(data)
+                    span = spans[key] = (offset, len(data))
+                    offset += len(data)
+                return span
+
+            for chunk_id, (document_id, start, length) in refs.items():
+                span = write_content(
+                    ("file", document_id, start, length), mm[start : start + length]
+                )
+                new_refs[chunk_id] = (document_id, *span)
+
+            for chunk_id, entry in pending.items():
+                document_id = entry["document_id"]
+                content = entry["content"]
+                span = write_content(
+                    ("new", document_id, content), content.encode("utf-8")
+                )
+                new_refs[chunk_id] = (document_id, *span)
+
+            index = json.dumps(
+                {"chunks": new_refs}, ensure_ascii=False, separators=(",", ":")
+            ).encode("utf-8")
+            f.write(index)
+
+            f.seek(0)
+            f.write(_HEADER.pack(_MAGIC, offset, len(index)))
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(temp_path, path)
+
+        with self._lock:
+            # Keep entries changed while the file was being written
+            for chunk_id in set(pending) - set(self._pending):
+                new_refs.pop(chunk_id, None)
+            for chunk_id in set(refs) - set(self._refs):
+                new_refs.pop(chunk_id, None)
+            for chunk_id, entry in pending.items():
+                if self._pending.get(chunk_id) is entry:
+                    del self._pending[chunk_id]
+            self._open(path, new_refs)
+
+        logger.info(f"Saved metadata for {len(new_refs)} chunks ({offset} bytes content)")
+
+    def _open(self, path: str, refs: Optional[Dict[str, ChunkRef]] = None) -> None:
+        """Map the binary file (and parse its index unless refs are given)."""
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError(f"Empty metadata file: {path}")
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, index_offset, index_length = _HEADER.unpack_from(mm, 0)
+        if magic != _MAGIC:
+            mm.close()
+            raise ValueError(f"Invalid metadata file: {path}")
+
+        if refs is None:
+            index = json.loads(mm[index_offset : index_offset + index_length])
+            refs = {
+                chunk_id: tuple(ref) for chunk_id, ref in index["chunks"].items()
+            }
+
+        old_mm = self._mm
+        self._mm = mm
+        self._refs = {
+            chunk_id: ref for chunk_id, ref in refs.items()
+            if chunk_id not in self._pending
+        }
+        if old_mm is not None:
+            old_mm.close()
+
+    def close(self) -> None:
+        """Unmap the backing file."""
+        with self._lock:
+            if self._mm is not None:
+                self._mm.close()
+                self._mm = None
+            self._refs = {}
+
+    def __getitem__(self, chunk_id: str) -> Dict[str, Any]:
+        with self._lock:
+            entry = self._pending.get(chunk_id)
+            if entry is not None:
+                return dict(entry)
+
+            document_id, start, length = self._refs[chunk_id]
+            content = self._mm[start : start + length].decode("utf-8")
+            return {"document_id": document_id, "content": content}
+
+    def __setitem__(self, chunk_id: str, entry: Any) -> None:
+        """Store an entry (dict or pydantic model); only document_id + content are kept."""
+        if hasattr(entry, "model_dump"):
+            entry = entry.model_dump()
+
+        metadata = entry.get("metadata") or {}
+        document_id = (
+            entry.get("document_id")
+            or metadata.get("document_id")
+            or entry.get("id")
+            or chunk_id
+        )
+
+        with self._lock:
+            self._refs.pop(chunk_id, None)
+            self._pending[chunk_id] = {
+                "document_id": str(document_id),
+                "content": str(entry.get("content") or ""),
+            }
+
+    def __delitem__(self, chunk_id: str) -> None:
+        with self._lock:
+            if chunk_id in self._pending:
+                del self._pending[chunk_id]
+            else:
+                del self._refs[chunk_id]
+
+    def __contains__(self, chunk_id: object) -> bool:
+        return chunk_id in self._pending or chunk_id in self._refs
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            chunk_ids = list(self._refs) + list(self._pending)
+        return iter(chunk_ids)
+
+    def __len__(self) -> int:
+        return len(self._refs) + len(self._pending)
+
+
+__all__ = ["ChunkMetadataStore", "METADATA_FILENAME", "LEGACY_METADATA_FILENAME"]
@@ -7,7 +7,17 @@ Connect MongoDB và query documents để xây dựng vector database.
 
 import os
 import logging
-from typing import List, Dict, Any, Optional
+import re
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 from datetime import datetime
 import asyncio
 
@@ -17,9 +27,82 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from bson import ObjectId
 
 from schemas import SummaryDocument
+from mongodb_client_registry import MongoClientRegistry, get_client_registry
 
 logger = logging.getLogger(__name__)
 
+# Collections that feed the RAG vector store
+SOURCE_COLLECTIONS = ["users", "WH_Note", "flash_cards"]
+
+# Document ID prefix per source collection (see MongoDBAdapter extractors)
+_SOURCE_ID_PREFIXES = {
+    "users": "user_summary_{}_",
+    "WH_Note": "note_{}",
+    "flash_cards": "flashcard_{}_",
+}
+# Collections whose records map to exactly one document (ID = formatted prefix)
+_SINGLE_DOCUMENT_SOURCES = {"WH_Note"}
+
+
+# Fixed topics of extracted documents
+USER_SUMMARY_TOPIC = "Network Layered Model"
+FLASHCARD_TOPIC = "Study Cards"
+
+
+def source_document_prefix(collection_name: str, source_id: Any) -> str:
+    """Get the document ID prefix shared by all documents of one source record."""
+    return _SOURCE_ID_PREFIXES[collection_name].format(source_id)
+
+
+def is_source_document(
+    collection_name: str, source_id: Any, document_id: str
+) -> bool:
+    """
+    Whether an indexed document belongs to one source record.
+
+    "note_1" is not a prefix match for "note_10": single-document sources
+    compare the exact ID.
+    """
+    prefix = source_document_prefix(collection_name, source_id)
+    if collection_name in _SINGLE_DOCUMENT_SOURCES:
+        return document_id == prefix
+    return document_id.startswith(prefix)
+
+
+def _matches(value_filter: Optional[str], value: str) -> bool:
+    """Case-insensitive substring filter on a fixed value."""
+    return not value_filter or value_filter.lower() in value.lower()
+
+
+def _substring_match(
+    field: str, value_filter: Optional[str], fallback: str
+) -> Dict[str, Any]:
+    """
+    $match condition for a case-insensitive substring filter.
+
+    Records without the field get the fallback value during extraction, so
+    they match when the fallback does.
+    """
+    if not value_filter:
+        return {}
+
+    condition = {field: {"$regex": re.escape(value_filter), "$options": "i"}}
+    if _matches(value_filter, fallback):
+        return {"$or": [condition, {field: {"$in": [None, ""]}}]}
+    return condition
+
+
+def _match_all(*conditions: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Combine $match conditions with $and.
+
+    Merging them as dict keys would let one "$or" overwrite another.
+    """
+    conditions = [condition for condition in conditions if condition]
+    if len(conditions) > 1:
+        return {"$and": list(conditions)}
+    return conditions[0] if conditions else {}
+
 
 class MongoDBAdapter:
     """MongoDB adapter cho RAG system."""
@@ -29,6 +112,7 @@ class MongoDBAdapter:
         connection_string: Optional[str] = None,
         database_name: Optional[str] = None,
         collection_name: Optional[str] = None,
+        registry: Optional[MongoClientRegistry] = None,
     ):
         """
         Initialize MongoDB adapter.
@@ -37,6 +121,7 @@ class MongoDBAdapter:
             connection_string: MongoDB connection string
             database_name: Database name
             collection_name: Collection name for documents
+            registry: Shared client registry (default: process-wide registry)
         """
         # Load environment variables if not already loaded
         try:
@@ -98,6 +183,8 @@ class MongoDBAdapter:
             "MONGODB_COLLECTION_NAME", "quiz_data"
         )
 
+        self.registry = registry or get_client_registry()
+
         # Sync client for initialization
         self.sync_client: Optional[MongoClient] = None
         self.sync_db = None
@@ -170,33 +257,32 @@ class MongoDBAdapter:
             return "***masked***"
 
     def connect_sync(self) -> None:
-        """Connect to MongoDB using sync client."""
+        """Connect to MongoDB using the shared sync client."""
         try:
-            self.sync_client = MongoClient(self.connection_string)
-
-            # Test connection
-            self.sync_client.admin.command("ping")
-            logger.info("✅ MongoDB sync connection successful")
+            self.sync_client = self.registry.get_sync_client(self.connection_string)
 
             # Setup database and collection
             self.sync_db = self.sync_client[self.database_name]
             self.sync_collection = self.sync_db[self.collection_name]
 
-            # Create indexes for better performance
-            self._create_indexes_sync()
+            # Create indexes once per schema version
+            self.registry.ensure_indexes(
+                self.connection_string,
+                self.sync_db,
+                self.collection_name,
+                self._create_indexes_sync,
+            )
 
         except Exception as e:
             logger.error(f"❌ MongoDB sync connection failed: {e}")
             raise
 
     async def connect_async(self) -> None:
-        """Connect to MongoDB using async client."""
+        """Connect to MongoDB using the shared async client (lazy, no round trip)."""
         try:
-            self.async_client = AsyncIOMotorClient(self.connection_string)
-
-            # Test connection
-            await self.async_client.admin.command("ping")
-            logger.info("✅ MongoDB async connection successful")
+            self.async_client = self.registry.get_async_client(
+                self.connection_string
+            )
 
             # Setup database and collection
             self.async_db = self.async_client[self.database_name]
@@ -206,28 +292,34 @@ class MongoDBAdapter:
             logger.error(f"❌ MongoDB async connection failed: {e}")
             raise
 
+    def _ensure_connected(self) -> None:
+        """Connect lazily on first use."""
+        if self.sync_client is None:
+            self.connect_sync()
+
     def _create_indexes_sync(self) -> None:
-        """Create indexes for better query performance."""
-        try:
-            # Index on topic for filtering
-            self.sync_collection.create_index("topic")
+        """
+        Create indexes for better query performance.
 
-            # Index on category for filtering
-            self.sync_collection.create_index("category")
+        Errors propagate so ensure_indexes does not mark a failed
+        provisioning as done.
+        """
+        # Index on topic for filtering
+        self.sync_collection.create_index("topic")
 
-            # Index on user_id for user filtering
-            self.sync_collection.create_index("user_id")
+        # Index on category for filtering
+        self.sync_collection.create_index("category")
 
-            # Text search index on content
-            self.sync_collection.create_index([("content", "text"), ("topic", "text")])
+        # Index on user_id for user filtering
+        self.sync_collection.create_index("user_id")
 
-            # Compound index for common queries
-            self.sync_collection.create_index([("topic", 1), ("category", 1)])
+        # Text search index on content
+        self.sync_collection.create_index([("content", "text"), ("topic", "text")])
 
-            logger.info("✅ MongoDB indexes created successfully")
+        # Compound index for common queries
+        self.sync_collection.create_index([("topic", 1), ("category", 1)])
 
-        except Exception as e:
-            logger.warning(f"⚠️ Index creation warning: {e}")
+        logger.info("✅ MongoDB indexes created successfully")
 
     def get_all_documents(
         self,
@@ -249,148 +341,299 @@ class MongoDBAdapter:
         Returns:
             List of processed documents for RAG
         """
-        if self.sync_client is None:
-            raise RuntimeError("MongoDB not connected. Call connect_sync() first.")
+        documents = list(
+            self.iter_documents(
+                topic_filter=topic_filter,
+                category_filter=category_filter,
+                user_filter=user_filter,
+                limit=limit,
+            )
+        )
+        logger.info(f"📊 Retrieved {len(documents)} processed documents from MongoDB")
+        return documents
+
+    def iter_documents(
+        self,
+        topic_filter: Optional[str] = None,
+        category_filter: Optional[str] = None,
+        user_filter: Optional[str] = None,
+        limit: Optional[int] = None,
+        batch_size: int = 500,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream RAG documents from the source collections.
+
+        Filters, projection, array unwinding and limit are pushed into
+        MongoDB aggregation pipelines; records are read with batched cursors
+        and yielded lazily, so memory stays flat regardless of collection size.
+
+        Args:
+            topic_filter: Filter by topic (case-insensitive substring)
+            category_filter: Filter by category (case-insensitive substring)
+            user_filter: Filter by user email (case-insensitive substring)
+            limit: Maximum number of documents
+            batch_size: Cursor batch size
+
+        Yields:
+            Processed documents for RAG
+        """
+        self._ensure_connected()
+
+        remaining = limit
+        counts = {}
 
         try:
-            documents = []
+            for collection_name, pipeline, build in self._source_pipelines(
+                topic_filter, category_filter, user_filter
+            ):
+                if remaining is not None:
+                    if remaining <= 0:
+                        break
+                    pipeline.append({"$limit": remaining})
+
+                logger.info(f"📥 Streaming documents from {collection_name}...")
+                cursor = self.sync_db[collection_name].aggregate(
+                    pipeline, batchSize=batch_size, allowDiskUse=True
+                )
 
-            # 1. Get summaries from users collection
-            logger.info("📝 Extracting summaries from users collection...")
-            users_collection = self.sync_db["users"]
-            users_with_summaries = users_collection.find(
-                {"summaries": {"$exists": True, "$ne": []}}
-            )
+                count = 0
+                with cursor:
+                    for record in cursor:
+                        doc = build(record)
+                        if doc is None:
+                            continue
+                        count += 1
+                        yield doc
 
-            for user in users_with_summaries:
-                summaries = user.get("summaries", [])
-                user_email = user.get("email", "unknown")
-
-                for i, summary in enumerate(summaries):
-                    if isinstance(summary, str) and summary.strip():
-                        doc = {
-                            "_id": f"user_summary_{user['_id']}_{i}",
-                            "content": summary.strip(),
-                            "title": f"Summary by {user_email}",
-                            "topic": "Network Layered Model",  # Based on content analysis
-                            "category": "summary",
-                            "source": "users",
-                            "user_email": user_email,
-                            "metadata": {
-                                "type": "user_summary",
-                                "user_id": str(user["_id"]),
-                                "summary_index": i,
-                            },
-                        }
-                        documents.append(doc)
-
-            # 2. Get content from WH_Note collection
-            logger.info("📚 Extracting content from WH_Note collection...")
-            notes_collection = self.sync_db["WH_Note"]
-            notes = notes_collection.find({})
-
-            for note in notes:
-                title = note.get("title", "")
-                content = note.get("content", "")
-
-                if content and isinstance(content, str) and len(content.strip()) > 10:
-                    doc = {
-                        "_id": f"note_{note['_id']}",
-                        "content": content.strip(),
-                        "title": title or "Note",
-                        "topic": title or "General Note",
-                        "category": "note",
-                        "source": "WH_Note",
-                        "user_email": note.get("email", "unknown"),
-                        "metadata": {
-                            "type": "note",
-                            "created_at": note.get("createdAt"),
-                            "note_id": str(note["_id"]),
+                counts[collection_name] = count
+                if remaining is not None:
+                    remaining -= count
+
+            logger.info(f"📊 Streamed documents per collection: {counts}")
+
+        except Exception as e:
+            logger.error(f"❌ Error querying MongoDB: {e}")
+            raise
+
+    def _source_pipelines(
+        self,
+        topic_filter: Optional[str],
+        category_filter: Optional[str],
+        user_filter: Optional[str],
+    ) -> List[Tuple[str, List[Dict[str, Any]], Callable]]:
+        """
+        Build (collection, aggregation pipeline, row builder) per source.
+
+        Collections whose fixed topic/category cannot match the filters are
+        skipped entirely.
+        """
+        email_match = _substring_match("email", user_filter, "unknown")
+        sources = []
+
+        # 1. users.summaries (one row per summary)
+        if _matches(category_filter, "summary") and _matches(
+            topic_filter, USER_SUMMARY_TOPIC
+        ):
+            sources.append(
+                (
+                    "users",
+                    [
+                        {
+                            "$match": {
+                                "summaries": {"$exists": True, "$ne": []},
+                                **email_match,
+                            }
                         },
-                    }
-                    documents.append(doc)
-
-            # 3. Get content from flash_cards collection
-            logger.info("🎯 Extracting content from flash_cards collection...")
-            cards_collection = self.sync_db["flash_cards"]
-            flash_card_sets = cards_collection.find({})
-
-            for card_set in flash_card_sets:
-                cards = card_set.get("cards", [])
-                user_email = card_set.get("email", "unknown")
-
-                for i, card in enumerate(cards):
-                    if isinstance(card, dict):
-                        front = card.get("front", "").strip()
-                        back = card.get("back", "").strip()
-
-                        if front and back:
-                            content = f"Q: {front}\nA: {back}"
-                            doc = {
-                                "_id": f"flashcard_{card_set['_id']}_{i}",
-                                "content": content,
-                                "title": f"Flashcard: {front[:50]}...",
-                                "topic": "Study Cards",
-                                "category": "flashcard",
-                                "source": "flash_cards",
-                                "user_email": user_email,
-                                "metadata": {
-                                    "type": "flashcard",
-                                    "card_index": i,
-                                    "set_id": str(card_set["_id"]),
-                                },
+                        {"$project": {"email": 1, "summaries": 1}},
+                        {
+                            "$unwind": {
+                                "path": "$summaries",
+                                "includeArrayIndex": "summary_index",
                             }
-                            documents.append(doc)
-
-            # Apply filters if provided
-            if topic_filter:
-                documents = [
-                    doc
-                    for doc in documents
-                    if topic_filter.lower() in doc.get("topic", "").lower()
-                ]
-
-            if category_filter:
-                documents = [
-                    doc
-                    for doc in documents
-                    if category_filter.lower() in doc.get("category", "").lower()
-                ]
-
-            if user_filter:
-                documents = [
-                    doc
-                    for doc in documents
-                    if user_filter.lower() in doc.get("user_email", "").lower()
-                ]
-
-            # Apply limit
-            if limit:
-                documents = documents[:limit]
-
-            logger.info(
-                f"📊 Retrieved {len(documents)} processed documents from MongoDB"
-            )
-            logger.info(
-                f"   - Summaries: {len([d for d in documents if d['category'] == 'summary'])}"
+                        },
+                        {"$match": {"summaries": {"$type": "string", "$regex": r"\S"}}},
+                    ],
+                    lambda row: self._build_user_summary(
+                        row["_id"], row.get("email"), row["summary_index"], row["summaries"]
+                    ),
+                )
             )
-            logger.info(
-                f"   - Notes: {len([d for d in documents if d['category'] == 'note'])}"
+
+        # 2. WH_Note (one row per note)
+        if _matches(category_filter, "note"):
+            sources.append(
+                (
+                    "WH_Note",
+                    [
+                        {
+                            "$match": {
+                                # Stripped content longer than 10 characters
+                                "content": {"$type": "string", "$regex": r"\S[\s\S]{9,}\S"},
+                                **_match_all(
+                                    _substring_match(
+                                        "title", topic_filter, "General Note"
+                                    ),
+                                    email_match,
+                                ),
+                            }
+                        },
+                        {"$project": {"title": 1, "content": 1, "email": 1, "createdAt": 1}},
+                    ],
+                    lambda row: next(iter(self._extract_note(row)), None),
+                )
             )
-            logger.info(
-                f"   - Flashcards: {len([d for d in documents if d['category'] == 'flashcard'])}"
+
+        # 3. flash_cards.cards (one row per card)
+        if _matches(category_filter, "flashcard") and _matches(
+            topic_filter, FLASHCARD_TOPIC
+        ):
+            sources.append(
+                (
+                    "flash_cards",
+                    [
+                        {"$match": {"cards": {"$exists": True, "$ne": []}, **email_match}},
+                        {"$project": {"email": 1, "cards": 1}},
+                        {"$unwind": {"path": "$cards", "includeArrayIndex": "card_index"}},
+                        {
+                            "$match": {
+                                "cards.front": {"$type": "string", "$regex": r"\S"},
+                                "cards.back": {"$type": "string", "$regex": r"\S"},
+                            }
+                        },
+                    ],
+                    lambda row: self._build_flash_card(
+                        row["_id"], row.get("email"), row["card_index"], row["cards"]
+                    ),
+                )
             )
 
-            return documents
+        return sources
+
+    def _extract_user_summaries(self, user: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Extract summary documents from one users record."""
+        documents = []
+        for i, summary in enumerate(user.get("summaries", [])):
+            doc = self._build_user_summary(user["_id"], user.get("email"), i, summary)
+            if doc:
+                documents.append(doc)
+        return documents
+
+    def _build_user_summary(
+        self, user_id: Any, email: Optional[str], index: int, summary: Any
+    ) -> Optional[Dict[str, Any]]:
+        """Build one summary document (None if the summary is empty)."""
+        if not (isinstance(summary, str) and summary.strip()):
+            return None
 
-        except Exception as e:
-            logger.error(f"❌ Error querying MongoDB: {e}")
-            raise
+        user_email = email or "unknown"
+        return {
+            "_id": f"user_summary_{user_id}_{index}",
+            "content": summary.strip(),
+            "title": f"Summary by {user_email}",
+            "topic": USER_SUMMARY_TOPIC,  # Based on content analysis
+            "category": "summary",
+            "source": "users",
+            "user_email": user_email,
+            "metadata": {
+                "type": "user_summary",
+                "user_id": str(user_id),
+                "summary_index": index,
+            },
+        }
+
+    def _extract_note(self, note: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Extract note document from one WH_Note record."""
+        title = note.get("title", "")
+        content = note.get("content", "")
+
+        if not (content and isinstance(content, str) and len(content.strip()) > 10):
+            return []
+
+        return [
+            {
+                "_id": f"note_{note['_id']}",
+                "content": content.strip(),
+                "title": title or "Note",
+                "topic": title or "General Note",
+                "category": "note",
+                "source": "WH_Note",
+                "user_email": note.get("email", "unknown"),
+                "metadata": {
+                    "type": "note",
+                    "created_at": note.get("createdAt"),
+                    "note_id": str(note["_id"]),
+                },
+            }
+        ]
+
+    def _extract_flash_cards(self, card_set: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Extract flashcard documents from one flash_cards record."""
+        documents = []
+        for i, card in enumerate(card_set.get("cards", [])):
+            doc = self._build_flash_card(card_set["_id"], card_set.get("email"), i, card)
+            if doc:
+                documents.append(doc)
+        return documents
+
+    def _build_flash_card(
+        self, set_id: Any, email: Optional[str], index: int, card: Any
+    ) -> Optional[Dict[str, Any]]:
+        """Build one flashcard document (None if front/back is missing)."""
+        if not isinstance(card, dict):
+            return None
+
+        front = (card.get("front") or "").strip()
+        back = (card.get("back") or "").strip()
+        if not (front and back):
+            return None
+
+        return {
+            "_id": f"flashcard_{set_id}_{index}",
+            "content": f"Q: {front}\nA: {back}",
+            "title": f"Flashcard: {front[:50]}...",
+            "topic": FLASHCARD_TOPIC,
+            "category": "flashcard",
+            "source": "flash_cards",
+            "user_email": email or "unknown",
+            "metadata": {
+                "type": "flashcard",
+                "card_index": index,
+                "set_id": str(set_id),
+            },
+        }
+
+    def get_documents_for_source(
+        self, collection_name: str, source_id: Any
+    ) -> List[Dict[str, Any]]:
+        """
+        Re-extract RAG documents for a single source record.
+
+        Args:
+            collection_name: Source collection (users, WH_Note, flash_cards)
+            source_id: _id of the source record
+
+        Returns:
+            Documents extracted from the record (empty if it was deleted)
+        """
+        self._ensure_connected()
+
+        extractor = {
+            "users": self._extract_user_summaries,
+            "WH_Note": self._extract_note,
+            "flash_cards": self._extract_flash_cards,
+        }.get(collection_name)
+        if extractor is None:
+            raise ValueError(f"Unsupported source collection: {collection_name}")
+
+        record = self.sync_db[collection_name].find_one({"_id": source_id})
+        if record is None:
+            return []
+
+        return extractor(record)
 
     def get_document_by_id(self, document_id: str) -> Optional[Dict[str, Any]]:
         """Get single document by ID."""
-        if self.sync_collection is None:
-            raise RuntimeError("MongoDB not connected")
+        self._ensure_connected()
 
         try:
             # Try ObjectId first, then string ID
@@ -411,14 +654,33 @@ class MongoDBAdapter:
             logger.error(f"❌ Error getting document {document_id}: {e}")
             return None
 
+    def estimated_document_count(self, collection_name: Optional[str] = None) -> int:
+        """
+        Document count from collection metadata (no collection scan).
+
+        Args:
+            collection_name: Collection name (default: main collection)
+
+        Returns:
+            Estimated number of documents
+        """
+        self._ensure_connected()
+        return self.sync_db[
+            collection_name or self.collection_name
+        ].estimated_document_count()
+
+    def get_distinct_values(self, field: str) -> List[Any]:
+        """Get distinct non-empty values of a field in the main collection."""
+        self._ensure_connected()
+        return [value for value in self.sync_collection.distinct(field) if value]
+
     def get_collection_stats(self) -> Dict[str, Any]:
-        """Get collection statistics."""
-        if self.sync_collection is None:
-            raise RuntimeError("MongoDB not connected")
+        """Get collection statistics (full scan - prefer CollectionStatsService)."""
+        self._ensure_connected()
 
         try:
             stats = {
-                "total_documents": self.sync_collection.count_documents({}),
+                "total_documents": self.estimated_document_count(),
                 "database_name": self.database_name,
                 "collection_name": self.collection_name,
                 "connection_string": (
@@ -452,49 +714,115 @@ class MongoDBAdapter:
             return {"error": str(e)}
 
     def close_connections(self) -> None:
-        """Close all MongoDB connections."""
-        try:
-            if self.sync_client:
-                self.sync_client.close()
-                logger.info("🔒 MongoDB sync connection closed")
+        """
+        Release this adapter's MongoDB handles.
 
-            if self.async_client:
-                self.async_client.close()
-                logger.info("🔒 MongoDB async connection closed")
+        Clients are shared through the registry and stay open for other
+        adapters; use get_client_registry().close_all() at process shutdown.
+        """
+        self.sync_client = None
+        self.sync_db = None
+        self.sync_collection = None
 
-        except Exception as e:
-            logger.warning(f"⚠️ Error closing MongoDB connections: {e}")
+        self.async_client = None
+        self.async_db = None
+        self.async_collection = None
+        logger.info("🔒 MongoDB adapter connections released")
 
-    # Async methods for future use
-    async def get_all_documents_async(
-        self, topic_filter: Optional[str] = None, limit: Optional[int] = None
-    ) -> List[Dict[str, Any]]:
-        """Async version of get_all_documents."""
-        if self.async_collection is None:
-            await self.connect_async()
+    # Async methods
+    async def aiter_documents(
+        self,
+        topic_filter: Optional[str] = None,
+        category_filter: Optional[str] = None,
+        user_filter: Optional[str] = None,
+        limit: Optional[int] = None,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async version of iter_documents.
 
-        try:
-            query_filter = {}
-            if topic_filter:
-                query_filter["topic"] = {"$regex": topic_filter, "$options": "i"}
+        All source collections are read concurrently (one Motor cursor per
+        collection) and merged into a single stream, so load time is close
+        to the slowest collection instead of the sum.
 
-            cursor = self.async_collection.find(query_filter)
+        Args:
+            topic_filter: Filter by topic (case-insensitive substring)
+            category_filter: Filter by category (case-insensitive substring)
+            user_filter: Filter by user email (case-insensitive substring)
+            limit: Maximum number of documents
+            batch_size: Cursor batch size
 
-            if limit:
-                cursor = cursor.limit(limit)
+        Yields:
+            Processed documents for RAG
+        """
+        if self.async_db is None:
+            await self.connect_async()
 
-            documents = await cursor.to_list(length=limit)
+        sources = self._source_pipelines(topic_filter, category_filter, user_filter)
+        if not sources:
+            return
 
-            # Convert ObjectId to string
-            for doc in documents:
-                if "_id" in doc:
-                    doc["_id"] = str(doc["_id"])
+        queue: asyncio.Queue = asyncio.Queue(maxsize=batch_size)
+        done = object()
 
-            return documents
+        async def produce(collection_name, pipeline, build) -> None:
+            try:
+                if limit is not None:
+                    pipeline.append({"$limit": limit})
+                cursor = self.async_db[collection_name].aggregate(
+                    pipeline, batchSize=batch_size, allowDiskUse=True
+                )
+                async for record in cursor:
+                    doc = build(record)
+                    if doc is not None:
+                        await queue.put(doc)
+                await queue.put(done)
+            except Exception as e:
+                await queue.put(e)
+
+        producers = [asyncio.create_task(produce(*source)) for source in sources]
+        remaining_producers = len(producers)
+        yielded = 0
 
-        except Exception as e:
-            logger.error(f"❌ Error in async query: {e}")
-            raise
+        try:
+            while remaining_producers:
+                item = await queue.get()
+                if item is done:
+                    remaining_producers -= 1
+                    continue
+                if isinstance(item, Exception):
+                    logger.error(f"❌ Error in async query: {item}")
+                    raise item
+
+                yield item
+                yielded += 1
+                if limit is not None and yielded >= limit:
+                    break
+
+            logger.info(f"📊 Streamed {yielded} documents (async, concurrent)")
+
+        finally:
+            for producer in producers:
+                producer.cancel()
+            await asyncio.gather(*producers, return_exceptions=True)
+
+    async def get_all_documents_async(
+        self,
+        topic_filter: Optional[str] = None,
+        category_filter: Optional[str] = None,
+        user_filter: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Async version of get_all_documents."""
+        return [
+            doc
+            async for doc in self.aiter_documents(
+                topic_filter=topic_filter,
+                category_filter=category_filter,
+                user_filter=user_filter,
+                limit=limit,
+            )
+        ]
 
 
 def get_mongodb_adapter() -> MongoDBAdapter:
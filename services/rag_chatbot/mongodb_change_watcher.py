@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+MongoDB Change Watcher for Live Indexing
+
+Theo dõi thay đổi trong các source collections (users, WH_Note, flash_cards)
+và áp dụng vào FAISS vector store ở background, ngoài request path.
+
+- Replica set / Atlas: dùng MongoDB change streams (resumable qua resume token)
+- Standalone server: fallback sang poller dựa trên `updatedAt` checkpoint
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from mongodb_adapter import SOURCE_COLLECTIONS
+
+logger = logging.getLogger(__name__)
+
+# (collection_name, source _id) của một record đã thay đổi
+SourceChange = Tuple[str, Any]
+
+# Error codes khi server không hỗ trợ change streams
+_CHANGE_STREAM_UNSUPPORTED_CODES = {
+    40573,  # The $changeStream stage is only supported on replica sets
+    136,  # CappedPositionLost / oplog not available
+}
+
+
+class MongoDBChangeWatcher:
+    """
+    Background watcher gom các thay đổi MongoDB thành batch cho vector store.
+
+    Mỗi batch là danh sách (collection, _id) duy nhất; callback sẽ re-extract
+    các record này và upsert/delete documents tương ứng trong index.
+    """
+
+    def __init__(
+        self,
+        database,
+        on_changes: Callable[[List[SourceChange]], None],
+        collections: Optional[List[str]] = None,
+        state_path: Optional[str] = None,
+        batch_size: int = 100,
+        batch_interval: float = 2.0,
+        poll_interval: float = 10.0,
+        reconcile_every: int = 6,
+        timestamp_field: str = "updatedAt",
+    ):
+        """
+        Initialize change watcher.
+
+        Args:
+            database: pymongo Database chứa source collections
+            on_changes: Callback nhận batch các source records đã thay đổi
+            collections: Collections cần theo dõi
+            state_path: File lưu resume token / poll checkpoints
+            batch_size: Flush batch khi đạt số thay đổi này
+            batch_interval: Flush batch sau khoảng thời gian này (seconds)
+            poll_interval: Chu kỳ poll khi không có change streams (seconds)
+            reconcile_every: Poller so sánh tập _id sau mỗi N lần poll (để phát hiện deletes)
+            timestamp_field: Field timestamp dùng cho poller
+        """
+        self.database = database
+        self.on_changes = on_changes
+        self.collections = collections or list(SOURCE_COLLECTIONS)
+        self.state_path = state_path
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.poll_interval = poll_interval
+        self.reconcile_every = reconcile_every
+        self.timestamp_field = timestamp_field
+
+        self.mode: Optional[str] = None
+        self._state: Dict[str, Any] = self._load_state()
+        self._state_dirty = False
+        self._known_ids: Dict[str, Set[Any]] = {}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._pending: Dict[SourceChange, None] = {}
+        self._pending_since: Optional[float] = None
+
+        self.stats = {
+            "changes_seen": 0,
+            "batches_applied": 0,
+            "last_batch_at": None,
+            "errors": 0,
+        }
+
+    def start(self) -> None:
+        """Start watcher thread."""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="mongodb-change-watcher", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"👀 MongoDB change watcher started for {self.collections}")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop watcher thread và flush pending changes."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        self._flush(force=True)
+        logger.info("🛑 MongoDB change watcher stopped")
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get watcher statistics."""
+        return {
+            "mode": self.mode,
+            "running": self.is_running,
+            "pending_changes": len(self._pending),
+            **self.stats,
+        }
+
+    def _supports_change_streams(self) -> bool:
+        """Change streams need a replica set or sharded cluster (Atlas)."""
+        try:
+            hello = self.database.client.admin.command("hello")
+        except Exception:
+            return False
+        return bool(hello.get("setName")) or hello.get("msg") == "isdbgrid"
+
+    def _run(self) -> None:
+        """Thread entry point: change streams first, poller fallback."""
+        try:
+            if self._supports_change_streams():
+                self.mode = "change_stream"
+                try:
+                    self._watch_change_stream()
+                    return
+                except OperationFailure as e:
+                    if e.code not in _CHANGE_STREAM_UNSUPPORTED_CODES:
+                        logger.warning(f"⚠️ Change stream failed ({e.code}): {e}")
+
+            logger.info("🔁 Change streams unavailable - using updatedAt poller")
+            self.mode = "poller"
+            self._poll_loop()
+
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"❌ Change watcher crashed: {e}")
+
+    def _watch_change_stream(self) -> None:
+        """Consume database-level change stream filtered to source collections."""
+        pipeline = [
+            {"$match": {"ns.coll": {"$in": self.collections}}},
+            {"$project": {"ns": 1, "documentKey": 1, "operationType": 1}},
+        ]
+
+        while not self._stop_event.is_set():
+            try:
+                with self.database.watch(
+                    pipeline,
+                    resume_after=self._state.get("resume_token"),
+                    max_await_time_ms=int(self.batch_interval * 1000),
+                ) as stream:
+                    while not self._stop_event.is_set() and stream.alive:
+                        change = stream.try_next()
+                        if change is not None:
+                            self._add_change(
+                                change["ns"]["coll"], change["documentKey"]["_id"]
+                            )
+                        # Resume token advances even without matching events
+                        if stream.resume_token is not None:
+                            self._state["resume_token"] = stream.resume_token
+                            self._state_dirty = True
+                        self._flush()
+
+            except OperationFailure:
+                raise
+            except PyMongoError as e:
+                # Transient network errors: resume from last token
+                self.stats["errors"] += 1
+                logger.warning(f"⚠️ Change stream interrupted, resuming: {e}")
+                self._stop_event.wait(self.batch_interval)
+
+    def _poll_loop(self) -> None:
+        """Poll source collections using per-collection timestamp checkpoints."""
+        polls = 0
+        while not self._stop_event.is_set():
+            try:
+                for collection_name in self.collections:
+                    self._poll_collection(collection_name)
+
+                if polls % self.reconcile_every == 0:
+                    for collection_name in self.collections:
+                        self._reconcile_collection(collection_name)
+
+                polls += 1
+                self._flush(force=True)
+
+            except PyMongoError as e:
+                self.stats["errors"] += 1
+                logger.warning(f"⚠️ Poll failed: {e}")
+
+            self._stop_event.wait(self.poll_interval)
+
+    def _poll_collection(self, collection_name: str) -> None:
+        """Queue records whose timestamp moved past the checkpoint."""
+        checkpoints = self._state.setdefault("checkpoints", {})
+        checkpoint = checkpoints.get(collection_name)
+
+        query: Dict[str, Any] = {self.timestamp_field: {"$exists": True}}
+        if checkpoint is not None:
+            query[self.timestamp_field] = {"$gt": _parse_checkpoint(checkpoint)}
+
+        cursor = (
+            self.database[collection_name]
+            .find(query, {self.timestamp_field: 1})
+            .sort(self.timestamp_field, 1)
+        )
+
+        latest = None
+        for record in cursor:
+            # First poll only establishes the checkpoint (index is already built)
+            if checkpoint is not None:
+                self._add_change(collection_name, record["_id"])
+            latest = record.get(self.timestamp_field)
+
+        if latest is not None:
+            checkpoints[collection_name] = _format_checkpoint(latest)
+            self._state_dirty = True
+
+    def _reconcile_collection(self, collection_name: str) -> None:
+        """Detect inserts without timestamps and deletes by diffing _id sets."""
+        current_ids = set(self.database[collection_name].distinct("_id"))
+        known_ids = self._known_ids.get(collection_name)
+
+        if known_ids is not None:
+            for source_id in current_ids.symmetric_difference(known_ids):
+                self._add_change(collection_name, source_id)
+
+        self._known_ids[collection_name] = current_ids
+
+    def _add_change(self, collection_name: str, source_id: Any) -> None:
+        """Queue a changed source record (deduplicated within the batch)."""
+        self._pending[(collection_name, source_id)] = None
+        self.stats["changes_seen"] += 1
+        if self._pending_since is None:
+            self._pending_since = time.monotonic()
+
+    def _flush(self, force: bool = False) -> None:
+        """Apply pending changes when the batch is full or old enough."""
+        if not self._pending:
+            self._save_state()
+            return
+
+        batch_age = time.monotonic() - (self._pending_since or time.monotonic())
+        if (
+            not force
+            and len(self._pending) < self.batch_size
+            and batch_age < self.batch_interval
+        ):
+            return
+
+        batch = list(self._pending)
+        self._pending = {}
+        self._pending_since = None
+
+        try:
+            self.on_changes(batch)
+            self.stats["batches_applied"] += 1
+            self.stats["last_batch_at"] = datetime.now().isoformat()
+            logger.info(f"📥 Applied {len(batch)} MongoDB changes to vector store")
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"❌ Failed to apply change batch: {e}")
+            # Keep changes for the next flush
+            for change in batch:
+                self._pending.setdefault(change, None)
+            self._pending_since = time.monotonic()
+            return
+
+        self._save_state()
+
+    def _load_state(self) -> Dict[str, Any]:
+        """Load resume token / checkpoints from disk."""
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("resume_token"):
+                from bson import json_util
+
+                state["resume_token"] = json_util.loads(state["resume_token"])
+            return state
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to load watcher state: {e}")
+            return {}
+
+    def _save_state(self) -> None:
+        """Persist resume token / checkpoints so restarts do not miss changes."""
+        if not self.state_path or not self._state_dirty:
+            return
+
+        try:
+            from bson import json_util
+
+            state = dict(self._state)
+            if state.get("resume_token") is not None:
+                state["resume_token"] = json_util.dumps(state["resume_token"])
+
+            os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+            temp_path = self.state_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(temp_path, self.state_path)
+            self._state_dirty = False
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to save watcher state: {e}")
+
+
+def _format_checkpoint(value: Any) -> Any:
+    """Serialize a timestamp checkpoint for the state file."""
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    return value
+
+
+def _parse_checkpoint(value: Any) -> Any:
+    """Deserialize a timestamp checkpoint from the state file."""
+    if isinstance(value, dict) and "$date" in value:
+        return datetime.fromisoformat(value["$date"])
+    return value
+
+
+__all__ = ["MongoDBChangeWatcher", "SourceChange"]
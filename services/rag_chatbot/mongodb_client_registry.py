@@ -0,0 +1,212 @@
+"""
+Process-wide MongoDB client registry.
+
+MongoClient / AsyncIOMotorClient đã có connection pool riêng, nên mỗi process
+chỉ cần một client cho mỗi connection string. Registry share clients giữa
+adapters, loaders và services, dùng chung pool options cho sync và Motor
+clients, và chỉ provision indexes một lần (đánh dấu bằng schema-version
+marker trong database).
+"""
+
+import os
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
+
+logger = logging.getLogger(__name__)
+
+# Bump when the indexes created by MongoDBAdapter change
+INDEX_SCHEMA_VERSION = 1
+
+# Collection holding schema-version markers ({_id: "indexes:<collection>", version})
+SCHEMA_MARKER_COLLECTION = "_rag_schema"
+
+
+def get_client_options() -> Dict[str, Any]:
+    """Pool options shared by sync và Motor clients (MONGODB_* env)."""
+    return {
+        "maxPoolSize": int(os.getenv("MONGODB_MAX_POOL_SIZE", "20")),
+        "minPoolSize": int(os.getenv("MONGODB_MIN_POOL_SIZE", "0")),
+        "maxIdleTimeMS": int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "300000")),
+        "serverSelectionTimeoutMS": int(
+            os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "10000")
+        ),
+        "appname": os.getenv("MONGODB_APP_NAME", "rag-chatbot"),
+    }
+
+
+class MongoClientRegistry:
+    """Shared MongoDB clients keyed by connection string."""
+
+    def __init__(self, client_options: Optional[Dict[str, Any]] = None):
+        """
+        Initialize registry.
+
+        Args:
+            client_options: Pool options (default: get_client_options())
+        """
+        self.client_options = client_options or get_client_options()
+
+        self._lock = threading.Lock()
+        self._sync_clients: Dict[str, MongoClient] = {}
+        # Motor clients are bound to the event loop they are first used on
+        self._async_clients: "weakref.WeakKeyDictionary[Any, Dict[str, AsyncIOMotorClient]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._provisioned: Set[Tuple[str, str, str]] = set()
+
+        self.stats = {"sync_created": 0, "async_created": 0, "reused": 0}
+
+    def get_sync_client(self, connection_string: str) -> MongoClient:
+        """
+        Get (or lazily create) the shared sync client.
+
+        The first call pings the server so connection errors surface early;
+        later calls reuse the pooled client without a round trip.
+        """
+        with self._lock:
+            client = self._sync_clients.get(connection_string)
+            if client is not None:
+                self.stats["reused"] += 1
+                return client
+
+            client = MongoClient(connection_string, **self.client_options)
+            try:
+                client.admin.command("ping")
+            except Exception:
+                client.close()
+                raise
+
+            self._sync_clients[connection_string] = client
+            self.stats["sync_created"] += 1
+            logger.info(
+                f"✅ MongoDB sync client created "
+                f"(maxPoolSize={self.client_options.get('maxPoolSize')})"
+            )
+            return client
+
+    def get_async_client(self, connection_string: str) -> AsyncIOMotorClient:
+        """Get (or lazily create) the shared Motor client for the running event loop."""
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            clients = self._async_clients.setdefault(loop, {})
+            client = clients.get(connection_string)
+            if client is not None:
+                self.stats["reused"] += 1
+                return client
+
+            # Motor connects lazily on first operation
+            client = AsyncIOMotorClient(connection_string, **self.client_options)
+            clients[connection_string] = client
+            self.stats["async_created"] += 1
+            logger.info("✅ MongoDB async client created")
+            return client
+
+    def ensure_indexes(
+        self,
+        connection_string: str,
+        database,
+        collection_name: str,
+        create_indexes: Callable[[], None],
+        version: int = INDEX_SCHEMA_VERSION,
+    ) -> bool:
+        """
+        Run index provisioning once per collection and schema version.
+
+        Args:
+            connection_string: Connection string of the client owning database
+            database: Sync database handle
+            collection_name: Collection the indexes belong to
+            create_indexes: Callable issuing the create_index calls (raises
+                on failure)
+            version: Index schema version
+
+        Returns:
+            True nếu indexes được (re)created, False nếu đã up to date hoặc
+            provisioning failed (no marker is written, so it is retried on
+            the next connect)
+        """
+        key = (connection_string, database.name, collection_name)
+        if key in self._provisioned:
+            return False
+
+        marker_id = f"indexes:{collection_name}"
+        markers = database[SCHEMA_MARKER_COLLECTION]
+
+        try:
+            marker = markers.find_one({"_id": marker_id})
+            if marker and marker.get("version", 0) >= version:
+                self._provisioned.add(key)
+                return False
+        except Exception as e:
+            logger.warning(f"⚠️ Could not read index schema marker: {e}")
+
+        try:
+            create_indexes()
+        except Exception as e:
+            logger.warning(f"⚠️ Index creation failed for {collection_name}: {e}")
+            return False
+
+        try:
+            markers.update_one(
+                {"_id": marker_id}, {"$set": {"version": version}}, upsert=True
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Could not write index schema marker: {e}")
+
+        self._provisioned.add(key)
+        logger.info(f"✅ Index schema v{version} provisioned for {collection_name}")
+        return True
+
+    def close_all(self) -> None:
+        """Close all shared clients (process shutdown)."""
+        with self._lock:
+            for client in self._sync_clients.values():
+                client.close()
+            for clients in self._async_clients.values():
+                for client in clients.values():
+                    client.close()
+
+            self._sync_clients.clear()
+            self._async_clients.clear()
+            self._provisioned.clear()
+
+        logger.info("🔒 MongoDB shared clients closed")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get registry statistics."""
+        with self._lock:
+            async_clients = sum(len(c) for c in self._async_clients.values())
+            return {
+                "sync_clients": len(self._sync_clients),
+                "async_clients": async_clients,
+                "max_pool_size": self.client_options.get("maxPoolSize"),
+                **self.stats,
+            }
+
+
+_registry: Optional[MongoClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_client_registry() -> MongoClientRegistry:
+    """Get the process-wide client registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MongoClientRegistry()
+        return _registry
+
+
+__all__ = [
+    "MongoClientRegistry",
+    "get_client_registry",
+    "get_client_options",
+    "INDEX_SCHEMA_VERSION",
+]
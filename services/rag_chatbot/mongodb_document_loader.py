@@ -7,10 +7,11 @@ Load documents từ MongoDB và prepare cho FAISS vectorization.
 
 import os
 import logging
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, Iterator, List, Dict, Any, Optional
 from datetime import datetime
 
 from mongodb_adapter import MongoDBAdapter, get_mongodb_adapter
+from collection_stats import CollectionStatsService
 from schemas import SummaryDocument, DocumentChunk
 
 logger = logging.getLogger(__name__)
@@ -19,14 +20,22 @@ logger = logging.getLogger(__name__)
 class MongoDBDocumentLoader:
     """Load documents từ MongoDB cho vector database."""
 
-    def __init__(self, mongodb_adapter: Optional[MongoDBAdapter] = None):
+    def __init__(
+        self,
+        mongodb_adapter: Optional[MongoDBAdapter] = None,
+        stats_service: Optional[CollectionStatsService] = None,
+    ):
         """
         Initialize document loader.
 
         Args:
             mongodb_adapter: MongoDB adapter instance
+            stats_service: Cached collection statistics
         """
         self.mongodb_adapter = mongodb_adapter or get_mongodb_adapter()
+        self.stats_service = stats_service or CollectionStatsService(
+            self.mongodb_adapter
+        )
         self.is_connected = False
 
     def initialize(self) -> None:
@@ -37,8 +46,8 @@ class MongoDBDocumentLoader:
             logger.info("✅ MongoDB Document Loader initialized")
 
             # Log collection stats
-            stats = self.mongodb_adapter.get_collection_stats()
-            logger.info(f"📊 MongoDB Stats: {stats}")
+            document_count = self.stats_service.get_document_count()
+            logger.info(f"📊 MongoDB Stats: ~{document_count} documents")
 
         except Exception as e:
             logger.error(f"❌ Failed to initialize MongoDB loader: {e}")
@@ -61,25 +70,70 @@ class MongoDBDocumentLoader:
         Returns:
             List of processed documents
         """
+        processed_docs = list(
+            self.iter_documents(
+                topic_filter=topic_filter, category_filter=category_filter, limit=limit
+            )
+        )
+        logger.info(f"📄 Loaded {len(processed_docs)} documents from MongoDB")
+        return processed_docs
+
+    def iter_documents(
+        self,
+        topic_filter: Optional[str] = None,
+        category_filter: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream processed documents từ MongoDB (filters/limit applied server-side).
+
+        Args:
+            topic_filter: Filter by topic
+            category_filter: Filter by category
+            limit: Maximum documents to load
+
+        Yields:
+            Processed documents
+        """
         if not self.is_connected:
             self.initialize()
 
         try:
-            # Get documents from MongoDB
-            raw_docs = self.mongodb_adapter.get_all_documents(
+            for raw_doc in self.mongodb_adapter.iter_documents(
                 topic_filter=topic_filter, category_filter=category_filter, limit=limit
-            )
+            ):
+                processed_doc = self._process_document(raw_doc)
+                if processed_doc:
+                    yield processed_doc
 
-            # Process documents for vector store
-            processed_docs = []
+        except Exception as e:
+            logger.error(f"❌ Error loading documents: {e}")
+            raise
+
+    async def aiter_documents(
+        self,
+        topic_filter: Optional[str] = None,
+        category_filter: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async stream of processed documents (collections read concurrently via Motor).
 
-            for raw_doc in raw_docs:
+        Args:
+            topic_filter: Filter by topic
+            category_filter: Filter by category
+            limit: Maximum documents to load
+
+        Yields:
+            Processed documents
+        """
+        try:
+            async for raw_doc in self.mongodb_adapter.aiter_documents(
+                topic_filter=topic_filter, category_filter=category_filter, limit=limit
+            ):
                 processed_doc = self._process_document(raw_doc)
                 if processed_doc:
-                    processed_docs.append(processed_doc)
-
-            logger.info(f"📄 Loaded {len(processed_docs)} documents from MongoDB")
-            return processed_docs
+                    yield processed_doc
 
         except Exception as e:
             logger.error(f"❌ Error loading documents: {e}")
@@ -155,8 +209,7 @@ class MongoDBDocumentLoader:
             self.initialize()
 
         try:
-            stats = self.mongodb_adapter.get_collection_stats()
-            return stats.get("topics", [])
+            return self.stats_service.get_topics()
         except Exception as e:
             logger.error(f"❌ Error getting topics: {e}")
             return []
@@ -167,8 +220,7 @@ class MongoDBDocumentLoader:
             self.initialize()
 
         try:
-            stats = self.mongodb_adapter.get_collection_stats()
-            return stats.get("categories", [])
+            return self.stats_service.get_categories()
         except Exception as e:
             logger.error(f"❌ Error getting categories: {e}")
             return []
@@ -179,14 +231,19 @@ class MongoDBDocumentLoader:
             self.initialize()
 
         try:
-            mongodb_stats = self.mongodb_adapter.get_collection_stats()
+            facets = self.stats_service.get_facets()
 
             loader_stats = {
                 "loader_status": "connected" if self.is_connected else "disconnected",
-                "mongodb_stats": mongodb_stats,
-                "available_topics": len(mongodb_stats.get("topics", [])),
-                "available_categories": len(mongodb_stats.get("categories", [])),
-                "total_documents": mongodb_stats.get("total_documents", 0),
+                "mongodb_stats": {
+                    "database_name": self.mongodb_adapter.database_name,
+                    "collection_name": self.mongodb_adapter.collection_name,
+                    **facets,
+                },
+                "available_topics": len(facets["topics"]),
+                "available_categories": len(facets["categories"]),
+                "total_documents": self.stats_service.get_document_count(),
+                "stats_cache": self.stats_service.get_stats(),
             }
 
             return loader_stats
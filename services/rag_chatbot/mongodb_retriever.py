@@ -6,12 +6,17 @@ Enhanced retriever sử dụng MongoDB làm data source cho vector database.
 """
 
 import os
+import asyncio
 import logging
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Optional
 
 from vector_store_langchain import LangChainVectorStore
+from partitioned_store import PartitionedVectorStore, PARTITION_MANIFEST_FILENAME
 from schemas import RetrievalConfig, RetrievedDocument
 from mongodb_document_loader import MongoDBDocumentLoader, get_mongodb_document_loader
+from mongodb_adapter import is_source_document, source_document_prefix
+from mongodb_change_watcher import MongoDBChangeWatcher, SourceChange
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +29,7 @@ class MongoDBDocumentRetriever:
     - Load documents từ MongoDB thay vì mock JSON
     - Persistent FAISS vector store
     - Flexible filtering by topic/category
-    - Auto-refresh when MongoDB data changes
+    - Live indexing of MongoDB changes (background change watcher)
     """
 
     def __init__(
@@ -33,6 +38,9 @@ class MongoDBDocumentRetriever:
         persist_directory: Optional[str] = None,
         embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2",
         auto_refresh: bool = False,
+        max_workers: Optional[int] = None,
+        read_only: Optional[bool] = None,
+        partition_by_owner: Optional[bool] = None,
     ):
         """
         Initialize MongoDB document retriever.
@@ -41,24 +49,52 @@ class MongoDBDocumentRetriever:
             mongodb_loader: MongoDB document loader instance
             persist_directory: Directory to persist FAISS index
             embedding_model: HuggingFace embedding model name
-            auto_refresh: Auto refresh vector store when MongoDB changes
+            auto_refresh: Watch MongoDB changes và apply them to the vector store
+                in the background
+            max_workers: Threads for async retrieval (embedding + FAISS search)
+                (default: env RAG_RETRIEVAL_WORKERS or 4)
+            read_only: Serve the persisted index mmapped, without rebuilds,
+                refreshes or change watcher (default: env RAG_READ_ONLY_INDEX)
+            partition_by_owner: One index partition per owner + a public
+                partition; user_filter queries only search the caller's
+                partition (default: env RAG_PARTITION_BY_OWNER or false)
         """
+        self.partition_by_owner = (
+            partition_by_owner
+            if partition_by_owner is not None
+            else os.getenv("RAG_PARTITION_BY_OWNER", "false").lower() == "true"
+        )
         self.mongodb_loader = mongodb_loader or get_mongodb_document_loader()
         self.persist_directory = persist_directory or self._get_default_persist_dir()
         self.embedding_model = embedding_model
         self.auto_refresh = auto_refresh
 
-        # LangChain vector store instance
-        self.vector_store = LangChainVectorStore(
-            embedding_model=embedding_model, persist_directory=self.persist_directory
+        # LangChain vector store instance (single index or per-owner partitions)
+        vector_store_class = (
+            PartitionedVectorStore if self.partition_by_owner else LangChainVectorStore
+        )
+        self.vector_store = vector_store_class(
+            embedding_model=embedding_model,
+            persist_directory=self.persist_directory,
+            read_only=read_only,
         )
+        self.read_only = self.vector_store.read_only
 
         self.is_initialized = False
         self._last_document_count = 0
+        self.change_watcher: Optional[MongoDBChangeWatcher] = None
+
+        # Bounded executor cho CPU-bound embedding/search trong async path
+        self.max_workers = max_workers or int(os.getenv("RAG_RETRIEVAL_WORKERS", "4"))
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="rag-retrieval"
+        )
 
     def _get_default_persist_dir(self) -> str:
         """Get default persist directory."""
         current_dir = os.path.dirname(__file__)
+        if self.partition_by_owner:
+            return os.path.join(current_dir, "faiss_db_mongodb_partitions")
         return os.path.join(current_dir, "faiss_db_mongodb")
 
     def initialize(self, force_rebuild: bool = False) -> None:
@@ -74,18 +110,39 @@ class MongoDBDocumentRetriever:
             # Initialize MongoDB loader
             self.mongodb_loader.initialize()
 
-            # Check if need to rebuild
-            should_rebuild = force_rebuild or self._should_rebuild_index()
-
-            if should_rebuild:
+            if self.read_only:
+                # Index is built/updated by a writer process; workers only map it
+                if not self._index_exists():
+                    raise FileNotFoundError(
+                        "Read-only mode needs a persisted index in "
+                        f"{self.persist_directory}"
+                    )
+                logger.info("📁 Loading vector store (read-only, mmapped)...")
+                self.vector_store.load_from_disk()
+                self.is_initialized = True
+                logger.info(f"✅ MongoDB Retriever initialized - {self.get_stats()}")
+                return
+
+            if force_rebuild or not self._index_exists():
                 logger.info("🔄 Building vector store from MongoDB data...")
                 self._build_vector_store_from_mongodb()
             else:
                 logger.info("📁 Loading existing vector store...")
                 self._load_existing_vector_store()
 
+                if self.vector_store.needs_rechunk():
+                    # Chunk boundaries changed: every document must be re-chunked
+                    logger.info("✂️ Chunking config changed - rebuilding index...")
+                    self._build_vector_store_from_mongodb()
+                elif self._should_rebuild_index():
+                    # Bring the loaded index up to date (only changed docs re-embedded)
+                    self.refresh_index()
+
             self.is_initialized = True
 
+            if self.auto_refresh:
+                self.start_change_watcher()
+
             # Log stats
             stats = self.get_stats()
             logger.info(f"✅ MongoDB Retriever initialized - {stats}")
@@ -94,17 +151,23 @@ class MongoDBDocumentRetriever:
             logger.error(f"❌ Failed to initialize MongoDB retriever: {e}")
             raise
 
+    def _index_exists(self) -> bool:
+        """Check if a persisted FAISS index exists."""
+        index_file = (
+            PARTITION_MANIFEST_FILENAME if self.partition_by_owner else "index.faiss"
+        )
+        return os.path.exists(os.path.join(self.persist_directory, index_file))
+
     def _should_rebuild_index(self) -> bool:
-        """Check if should rebuild FAISS index."""
+        """Check if FAISS index is out of date với MongoDB."""
         try:
             # Check if persist directory exists
             if not os.path.exists(self.persist_directory):
                 logger.info("📁 Persist directory not found - will build new index")
                 return True
 
-            # Check MongoDB document count
-            loader_stats = self.mongodb_loader.get_loader_stats()
-            current_doc_count = loader_stats.get("total_documents", 0)
+            # Check MongoDB document count (estimated, cached)
+            current_doc_count = self.mongodb_loader.stats_service.get_document_count()
 
             # If document count changed significantly, rebuild
             if abs(current_doc_count - self._last_document_count) > 5:
@@ -119,55 +182,206 @@ class MongoDBDocumentRetriever:
             logger.warning(f"⚠️ Error checking rebuild need: {e}")
             return True
 
+    def _load_index_documents(self) -> Iterator[dict]:
+        """Stream documents từ MongoDB in vector store format."""
+        logger.info("📥 Streaming documents from MongoDB...")
+        count = 0
+        for doc in self._to_index_documents(self.mongodb_loader.iter_documents()):
+            count += 1
+            yield doc
+
+        # Raised before sync_documents deletes anything from the index
+        if not count:
+            raise ValueError("No documents loaded from MongoDB")
+
+        logger.info(f"📄 Processed {count} documents...")
+
+    def _to_index_documents(self, documents: Iterable[dict]) -> Iterator[dict]:
+        """Convert loader documents to LangChain vector store format."""
+        for doc in documents:
+            yield {
+                "content": doc["content"],
+                "metadata": {
+                    "id": doc["id"],
+                    "topic": doc["topic"],
+                    "category": doc["category"],
+                    **doc.get("metadata", {}),
+                },
+            }
+
     def _build_vector_store_from_mongodb(self) -> None:
         """Build vector store từ MongoDB documents."""
         try:
-            # Load documents from MongoDB
-            logger.info("📥 Loading documents from MongoDB...")
-            documents = self.mongodb_loader.load_all_documents()
-
-            if not documents:
-                raise ValueError("No documents loaded from MongoDB")
-
-            # Convert to LangChain format
-            langchain_docs = []
-            for doc in documents:
-                langchain_doc = {
-                    "content": doc["content"],
-                    "metadata": {
-                        "id": doc["id"],
-                        "topic": doc["topic"],
-                        "category": doc["category"],
-                        **doc.get("metadata", {}),
-                    },
-                }
-                langchain_docs.append(langchain_doc)
-
-            logger.info(f"📄 Processing {len(langchain_docs)} documents...")
-
-            # Build vector store
-            self.vector_store.build_from_documents(langchain_docs)
+            # Build vector store (documents streamed from MongoDB)
+            self.vector_store.build_from_documents(self._load_index_documents())
 
             # Save document count for future checks
-            self._last_document_count = len(documents)
+            self._last_document_count = self._get_source_document_count()
 
             logger.info(
-                f"✅ Vector store built from {len(documents)} MongoDB documents"
+                f"✅ Vector store built from {len(self.vector_store.document_chunks)} MongoDB documents"
             )
 
         except Exception as e:
             logger.error(f"❌ Error building vector store from MongoDB: {e}")
             raise
 
+    def refresh_index(self) -> dict:
+        """
+        Incrementally sync FAISS index với MongoDB.
+
+        Only new or changed documents are re-embedded; documents removed from
+        MongoDB are deleted from the index.
+
+        Returns:
+            Counters of added, updated, unchanged and deleted documents
+        """
+        if not self.vector_store.is_loaded:
+            self._build_vector_store_from_mongodb()
+            return {"rebuilt": True}
+
+        try:
+            logger.info("🔄 Incrementally refreshing vector store...")
+            langchain_docs = self._load_index_documents()
+            stats = self.vector_store.sync_documents(langchain_docs)
+            self._last_document_count = self._get_source_document_count()
+
+            logger.info(f"✅ Vector store refreshed: {stats}")
+            return stats
+
+        except Exception as e:
+            logger.error(f"❌ Error refreshing vector store from MongoDB: {e}")
+            raise
+
+    async def _aload_index_documents(self) -> List[dict]:
+        """Load documents từ MongoDB concurrently (Motor) in vector store format."""
+        logger.info("📥 Loading documents from MongoDB (async, concurrent)...")
+        documents = [
+            doc async for doc in self.mongodb_loader.aiter_documents()
+        ]
+
+        if not documents:
+            raise ValueError("No documents loaded from MongoDB")
+
+        logger.info(f"📄 Processing {len(documents)} documents...")
+        return list(self._to_index_documents(documents))
+
+    async def arebuild_index(self) -> None:
+        """
+        Async version of rebuild_index.
+
+        Source collections are loaded concurrently; embedding/indexing runs on
+        the retrieval executor so the event loop stays responsive.
+        """
+        logger.info("🔄 Force rebuilding index from MongoDB (async)...")
+        langchain_docs = await self._aload_index_documents()
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            self._executor, self.vector_store.build_from_documents, langchain_docs
+        )
+        self._last_document_count = await loop.run_in_executor(
+            self._executor, self._get_source_document_count
+        )
+        logger.info(
+            f"✅ Vector store built from {len(langchain_docs)} MongoDB documents"
+        )
+
+    async def arefresh_index(self) -> dict:
+        """Async version of refresh_index (concurrent load, incremental sync)."""
+        if not self.vector_store.is_loaded:
+            await self.arebuild_index()
+            return {"rebuilt": True}
+
+        logger.info("🔄 Incrementally refreshing vector store (async)...")
+        langchain_docs = await self._aload_index_documents()
+
+        loop = asyncio.get_running_loop()
+        stats = await loop.run_in_executor(
+            self._executor, self.vector_store.sync_documents, langchain_docs
+        )
+        self._last_document_count = await loop.run_in_executor(
+            self._executor, self._get_source_document_count
+        )
+        logger.info(f"✅ Vector store refreshed: {stats}")
+        return stats
+
+    def apply_source_changes(self, changes: List[SourceChange]) -> dict:
+        """
+        Apply changed MongoDB source records to the vector store.
+
+        Each record is re-extracted; its current documents are upserted and
+        documents it no longer produces (or all, if deleted) are removed.
+
+        Args:
+            changes: List of (collection_name, source _id)
+
+        Returns:
+            Counters of upserted and deleted documents
+        """
+        adapter = self.mongodb_loader.mongodb_adapter
+        self.mongodb_loader.stats_service.record_changes(
+            collection_name for collection_name, _ in changes
+        )
+        upsert_docs = []
+        stale_ids = []
+
+        for collection_name, source_id in changes:
+            raw_docs = adapter.get_documents_for_source(collection_name, source_id)
+            processed_docs = [
+                doc
+                for doc in (
+                    self.mongodb_loader._process_document(raw) for raw in raw_docs
+                )
+                if doc
+            ]
+            index_docs = list(self._to_index_documents(processed_docs))
+            current_ids = {doc["metadata"]["id"] for doc in index_docs}
+
+            prefix = source_document_prefix(collection_name, source_id)
+            stale_ids.extend(
+                doc_id
+                for doc_id in self.vector_store.get_document_ids(prefix)
+                if doc_id not in current_ids
+                and is_source_document(collection_name, source_id, doc_id)
+            )
+            upsert_docs.extend(index_docs)
+
+        deleted = self.vector_store.delete_documents(stale_ids) if stale_ids else 0
+        stats = self.vector_store.upsert_documents(upsert_docs) if upsert_docs else {}
+        stats["deleted"] = deleted
+
+        logger.info(f"📥 Applied {len(changes)} source changes: {stats}")
+        return stats
+
+    def start_change_watcher(self) -> None:
+        """Start background MongoDB change watcher for live indexing."""
+        if self.change_watcher and self.change_watcher.is_running:
+            return
+
+        self.change_watcher = MongoDBChangeWatcher(
+            database=self.mongodb_loader.mongodb_adapter.sync_db,
+            on_changes=self.apply_source_changes,
+            state_path=os.path.join(self.persist_directory, "watcher_state.json"),
+        )
+        self.change_watcher.start()
+
+    def stop_change_watcher(self) -> None:
+        """Stop background MongoDB change watcher."""
+        if self.change_watcher:
+            self.change_watcher.stop()
+            self.change_watcher = None
+
+    def _get_source_document_count(self) -> int:
+        """Get document count used by _should_rebuild_index (after a build/refresh)."""
+        stats_service = self.mongodb_loader.stats_service
+        stats_service.invalidate()
+        return stats_service.get_document_count()
+
     def _load_existing_vector_store(self) -> None:
         """Load existing vector store."""
         try:
             self.vector_store.load_from_disk()
-
-            # Update document count
-            loader_stats = self.mongodb_loader.get_loader_stats()
-            self._last_document_count = loader_stats.get("total_documents", 0)
-
             logger.info("✅ Loaded existing vector store")
 
         except Exception as e:
@@ -192,17 +406,16 @@ class MongoDBDocumentRetriever:
             self.initialize()
 
         try:
-            # Check for auto-refresh
-            if self.auto_refresh and self._should_rebuild_index():
-                logger.info("🔄 Auto-refreshing vector store...")
-                self._build_vector_store_from_mongodb()
-
             # Perform vector search
             results = self.vector_store.search_documents(
                 query=query,
                 top_k=config.top_k,
                 similarity_threshold=config.similarity_threshold,
                 topic_filter=config.topic_filter,
+                category_filter=config.category_filter,
+                user_filter=config.user_filter,
+                retrieval_mode=config.retrieval_mode,
+                rrf_k=config.rrf_k,
             )
 
             # Convert to RetrievedDocument format
@@ -210,12 +423,14 @@ class MongoDBDocumentRetriever:
             for result in results:
                 retrieved_doc = RetrievedDocument(
                     document_id=result.get("id", "unknown"),
-                    chunk_id=f"{result.get('id', 'unknown')}_chunk_{len(retrieved_docs)}",
+                    chunk_id=result.get("chunk_id")
+                    or f"{result.get('id', 'unknown')}_chunk_{len(retrieved_docs)}",
                     content=result.get("chunk_text", result.get("content", "")),
                     topic=result.get("topic", "Unknown"),
                     category=result.get("category", "Unknown"),
                     similarity_score=result.get("similarity_score", 0.0),
                     tags=result.get("tags", []),
+                    chunk_index=result.get("chunk_index"),
                 )
                 retrieved_docs.append(retrieved_doc)
 
@@ -228,6 +443,20 @@ class MongoDBDocumentRetriever:
             logger.error(f"❌ Error retrieving documents: {e}")
             return []
 
+    async def aretrieve_documents(
+        self, query: str, config: RetrievalConfig
+    ) -> List[RetrievedDocument]:
+        """
+        Async version of retrieve_documents.
+
+        Query embedding và FAISS search chạy trên bounded thread pool nên
+        không block event loop.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self.retrieve_documents, query, config
+        )
+
     def get_document_by_id(self, document_id: str) -> Optional[dict]:
         """Get document by ID từ MongoDB."""
         try:
@@ -244,6 +473,14 @@ class MongoDBDocumentRetriever:
             logger.error(f"❌ Error listing topics: {e}")
             return []
 
+    def get_filter_options(self) -> dict:
+        """Get cached topics và categories in one call."""
+        try:
+            return self.mongodb_loader.stats_service.get_facets()
+        except Exception as e:
+            logger.error(f"❌ Error getting filter options: {e}")
+            return {"topics": [], "categories": []}
+
     def list_all_categories(self) -> List[str]:
         """Get all available categories từ MongoDB."""
         try:
@@ -279,7 +516,16 @@ class MongoDBDocumentRetriever:
                 "persist_directory": self.persist_directory,
                 "embedding_model": self.embedding_model,
                 "auto_refresh": self.auto_refresh,
+                "read_only": self.read_only,
+                "partition_by_owner": self.partition_by_owner,
                 "last_document_count": self._last_document_count,
+                "retrieval_workers": self.max_workers,
+                "mongodb_clients": (
+                    self.mongodb_loader.mongodb_adapter.registry.get_stats()
+                ),
+                "change_watcher": (
+                    self.change_watcher.get_stats() if self.change_watcher else None
+                ),
             }
 
         except Exception as e:
@@ -288,6 +534,8 @@ class MongoDBDocumentRetriever:
     def close(self) -> None:
         """Close all connections."""
         try:
+            self.stop_change_watcher()
+            self._executor.shutdown(wait=False)
             self.mongodb_loader.close()
             # Vector store doesn't need explicit closing
             logger.info("🔒 MongoDB Document Retriever closed")
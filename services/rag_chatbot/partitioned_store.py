@@ -0,0 +1,628 @@
+"""
+Per-owner partitioned vector store.
+
+Mỗi owner (user_email, hoặc user_id khi email không có) có một
+LangChainVectorStore riêng trong persist_directory/<partition>/, documents
+không có owner nằm trong partition "public" dùng chung. Queries với
+user_filter chỉ search partition của user đó + public partition, nên cost
+mỗi query tỉ lệ với corpus của một user thay vì toàn trường.
+
+User partitions được load lazily và LRU-evicted (RAG_MAX_LOADED_PARTITIONS);
+public partition luôn được giữ trong memory. Embedding model, batched
+embedding pipeline và query embedding cache được share giữa các partitions.
+partitions.json (manifest) lưu document_id -> partition và owner aliases
+(email + user_id) để route updates/deletes mà không cần load partitions.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+from chunking import Chunker, get_chunking_config
+from dedup import normalize_text
+from embedding_pipeline import EmbeddingPipeline
+from index_factory import get_index_type
+from lexical_index import reciprocal_rank_fusion
+from vector_store_langchain import (
+    LangChainVectorStore,
+    create_embedding_cache,
+    create_embeddings,
+)
+
+logger = logging.getLogger(__name__)
+
+PUBLIC_PARTITION = "public"
+PARTITION_MANIFEST_FILENAME = "partitions.json"
+
+# Owner metadata keys, in routing priority
+_OWNER_KEYS = ("user_email", "user_id")
+
+
+def get_owner_aliases(metadata: Dict[str, Any]) -> List[str]:
+    """Normalized owner identifiers of a document (empty for public documents)."""
+    aliases = []
+    for key in _OWNER_KEYS:
+        owner = metadata.get(key)
+        if owner and str(owner).lower() != "unknown":
+            aliases.append(str(owner).lower())
+    return aliases
+
+
+def get_partition_key(metadata: Dict[str, Any]) -> str:
+    """Partition of a document: its owner, or the public partition."""
+    aliases = get_owner_aliases(metadata)
+    return aliases[0] if aliases else PUBLIC_PARTITION
+
+
+def _distinct_results(
+    results: List[Dict[str, Any]], top_k: int
+) -> List[Dict[str, Any]]:
+    """
+    Keep the first of results với identical chunk text.
+
+    Chunks are deduplicated within a partition at index time; the same text
+    can still be indexed in a user partition and the public partition.
+    """
+    seen = set()
+    distinct = []
+    for result in results:
+        text = normalize_text(result["chunk_text"])
+        if text in seen:
+            continue
+        seen.add(text)
+        distinct.append(result)
+        if len(distinct) == top_k:
+            break
+    return distinct
+
+
+class PartitionedVectorStore:
+    """LangChainVectorStore-compatible store partitioned by document owner."""
+
+    def __init__(
+        self,
+        embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2",
+        persist_directory: str = "faiss_db_partitions",
+        max_loaded_partitions: Optional[int] = None,
+        index_type: Optional[str] = None,
+        read_only: Optional[bool] = None,
+    ):
+        """
+        Initialize partitioned vector store.
+
+        Args:
+            embedding_model: HuggingFace embedding model name
+            persist_directory: Root directory (one sub-directory per partition)
+            max_loaded_partitions: User partitions kept in memory
+                (default: RAG_MAX_LOADED_PARTITIONS env or 32)
+            index_type: FAISS index type of each partition
+                (default: FAISS_INDEX_TYPE env or "flat")
+            read_only: Serve partitions mmapped without updates
+                (default: RAG_READ_ONLY_INDEX env or false)
+        """
+        self.embedding_model_name = embedding_model
+        self.persist_directory = persist_directory
+        self.index_type = index_type or get_index_type()
+        self.max_loaded_partitions = max_loaded_partitions or int(
+            os.getenv("RAG_MAX_LOADED_PARTITIONS", "32")
+        )
+        self.read_only = (
+            read_only
+            if read_only is not None
+            else os.getenv("RAG_READ_ONLY_INDEX", "false").lower() == "true"
+        )
+
+        # Shared by every partition store
+        self.embeddings = create_embeddings(embedding_model)
+        self.embedding_pipeline = EmbeddingPipeline(
+            model_name=embedding_model,
+            embed_documents=self.embeddings.embed_documents,
+            cache=create_embedding_cache(persist_directory),
+        )
+        self.chunker = Chunker(get_chunking_config(embedding_model))
+        self.index_chunking: Optional[Dict[str, Any]] = None
+
+        # Public partition is pinned; its query cache is shared
+        self.query_cache = None
+        self.public = self._new_partition_store(PUBLIC_PARTITION)
+        self.query_cache = self.public.query_cache
+
+        # Loaded user partitions, least recently used first
+        self._loaded: "OrderedDict[str, LangChainVectorStore]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._update_lock = threading.RLock()
+
+        # Manifest: document_id -> partition, owner alias -> partition,
+        # partition -> chunk count
+        self._documents: Dict[str, str] = {}
+        self._aliases: Dict[str, str] = {}
+        self._partition_chunks: Dict[str, int] = {}
+
+        self.is_loaded = False
+        self.index_version = 0
+        self.stats = {"hits": 0, "loads": 0, "evictions": 0}
+
+    @property
+    def document_chunks(self) -> Dict[str, str]:
+        """Indexed document_id -> partition (len() = indexed documents)."""
+        return self._documents
+
+    def _partition_directory(self, key: str) -> str:
+        """Directory of a partition (owner keys are hashed for safe names)."""
+        if key == PUBLIC_PARTITION:
+            name = PUBLIC_PARTITION
+        else:
+            name = "user_" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.persist_directory, name)
+
+    def _new_partition_store(self, key: str) -> LangChainVectorStore:
+        """Create (not load) the store of one partition."""
+        return LangChainVectorStore(
+            embedding_model=self.embedding_model_name,
+            persist_directory=self._partition_directory(key),
+            embedding_pipeline=self.embedding_pipeline,
+            index_type=self.index_type,
+            read_only=self.read_only,
+            embeddings=self.embeddings,
+            query_cache=self.query_cache,
+            chunker=self.chunker,
+        )
+
+    def _partition_exists(self, key: str) -> bool:
+        return os.path.exists(
+            os.path.join(self._partition_directory(key), "index.faiss")
+        )
+
+    def _get_partition(
+        self, key: str, create: bool = False
+    ) -> Optional[LangChainVectorStore]:
+        """
+        Get a partition store, loading it from disk on first use.
+
+        Args:
+            key: Partition key
+            create: Return an empty (unloaded) store for unknown partitions
+
+        Returns:
+            Partition store, or None if the partition does not exist
+        """
+        if key == PUBLIC_PARTITION:
+            return self.public
+
+        with self._lock:
+            store = self._loaded.get(key)
+            if store is not None:
+                self._loaded.move_to_end(key)
+                self.stats["hits"] += 1
+                return store
+
+        if self._partition_exists(key):
+            # Disk load outside the LRU lock; concurrent loads keep the first
+            store = self._new_partition_store(key)
+            store.load_from_disk()
+        elif create:
+            store = self._new_partition_store(key)
+        else:
+            return None
+
+        return self._cache_partition(key, store)
+
+    def _cache_partition(
+        self, key: str, store: LangChainVectorStore, replace: bool = False
+    ) -> LangChainVectorStore:
+        """Insert a store into the LRU (evicting the least recently used)."""
+        if key == PUBLIC_PARTITION:
+            return store
+
+        with self._lock:
+            existing = self._loaded.get(key)
+            if existing is not None and not replace:
+                self._loaded.move_to_end(key)
+                return existing
+
+            self._loaded[key] = store
+            self._loaded.move_to_end(key)
+            if existing is None:
+                self.stats["loads"] += 1
+            while len(self._loaded) > self.max_loaded_partitions:
+                evicted, _ = self._loaded.popitem(last=False)
+                self.stats["evictions"] += 1
+                logger.debug(f"Evicted partition {evicted}")
+            return store
+
+    def _ensure_writable(self) -> None:
+        """Reject index updates in read-only serving mode."""
+        self.public._ensure_writable()
+
+    def _group_by_partition(
+        self, documents: Iterable[Dict[str, Any]]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Route documents to partitions (and record owner aliases)."""
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for doc in documents:
+            metadata = doc.get("metadata", {})
+            key = get_partition_key(metadata)
+            for alias in get_owner_aliases(metadata):
+                self._aliases[alias] = key
+            groups.setdefault(key, []).append(doc)
+        return groups
+
+    def _record_partition(
+        self,
+        key: str,
+        store: LangChainVectorStore,
+        removed_ids: Iterable[str] = (),
+    ) -> None:
+        """Update manifest entries of a partition after a write."""
+        for doc_id in removed_ids:
+            if self._documents.get(doc_id) == key:
+                del self._documents[doc_id]
+        for doc_id in store.document_chunks:
+            self._documents[doc_id] = key
+        self._partition_chunks[key] = (
+            store.vectorstore.index.ntotal if store.vectorstore else 0
+        )
+        # The written instance is the freshest copy (a concurrent reader may
+        # have reloaded the partition from disk while it was being written)
+        self._cache_partition(key, store, replace=True)
+
+    def _drop_partition(self, key: str) -> None:
+        """Remove an emptied user partition from disk, memory và manifest."""
+        with self._lock:
+            self._loaded.pop(key, None)
+        shutil.rmtree(self._partition_directory(key), ignore_errors=True)
+        self._partition_chunks.pop(key, None)
+        self._aliases = {
+            alias: owner_key
+            for alias, owner_key in self._aliases.items()
+            if owner_key != key
+        }
+
+    def build_from_documents(self, documents: Iterable[Dict[str, Any]]) -> None:
+        """
+        Rebuild every partition from the complete document set.
+
+        Args:
+            documents: Documents with 'content' and 'metadata' fields
+        """
+        self._ensure_writable()
+        logger.info("Building partitioned FAISS index from documents...")
+
+        with self._update_lock:
+            self._aliases = {}
+            groups = self._group_by_partition(documents)
+            if not groups:
+                raise ValueError("No documents provided")
+
+            # Drop partitions of owners no longer present
+            if os.path.exists(self.persist_directory):
+                keep = {
+                    os.path.basename(self._partition_directory(key))
+                    for key in list(groups) + [PUBLIC_PARTITION]
+                }
+                for name in os.listdir(self.persist_directory):
+                    path = os.path.join(self.persist_directory, name)
+                    if os.path.isdir(path) and name not in keep:
+                        shutil.rmtree(path, ignore_errors=True)
+
+            with self._lock:
+                self._loaded.clear()
+            self._documents = {}
+            self._partition_chunks = {}
+
+            for key, docs in groups.items():
+                store = (
+                    self.public
+                    if key == PUBLIC_PARTITION
+                    else self._new_partition_store(key)
+                )
+                store.build_from_documents(docs)
+                self._record_partition(key, store)
+
+            if PUBLIC_PARTITION not in groups:
+                self.public.clear_index()
+
+            self.index_chunking = self.chunker.config.model_dump()
+            self.is_loaded = True
+            self.index_version += 1
+            self._save_manifest()
+
+        logger.info(
+            f"✅ Partitioned index built: {len(self._partition_chunks)} partitions, "
+            f"{len(self._documents)} documents"
+        )
+
+    def upsert_documents(self, documents: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Add new documents and re-embed changed ones in their partitions.
+
+        Documents whose owner changed are moved to the new partition.
+
+        Returns:
+            Counters of added, updated and unchanged documents
+        """
+        self._ensure_writable()
+        stats = {"added": 0, "updated": 0, "unchanged": 0}
+
+        with self._update_lock:
+            groups = self._group_by_partition(documents)
+
+            # Owner changed: remove from the previous partition first
+            moved: Dict[str, List[str]] = {}
+            for key, docs in groups.items():
+                for doc in docs:
+                    doc_id = self.public._get_document_id(doc)
+                    previous = self._documents.get(doc_id)
+                    if previous is not None and previous != key:
+                        moved.setdefault(previous, []).append(doc_id)
+            if moved:
+                self._delete_from_partitions(moved)
+
+            for key, docs in groups.items():
+                store = self._get_partition(key, create=True)
+                if store.is_loaded:
+                    partition_stats = store.upsert_documents(docs)
+                else:
+                    try:
+                        store.build_from_documents(docs)
+                    except ValueError as e:
+                        logger.warning(f"Partition {key} not created: {e}")
+                        continue
+                    partition_stats = {"added": len(docs)}
+                for name, count in partition_stats.items():
+                    stats[name] = stats.get(name, 0) + count
+                self._record_partition(key, store)
+
+            if groups:
+                self.index_version += 1
+                self._save_manifest()
+
+        return stats
+
+    def delete_documents(self, document_ids: List[str]) -> int:
+        """
+        Remove documents from their partitions.
+
+        Returns:
+            Number of documents removed
+        """
+        self._ensure_writable()
+
+        with self._update_lock:
+            grouped: Dict[str, List[str]] = {}
+            for doc_id in document_ids:
+                key = self._documents.get(doc_id)
+                if key is not None:
+                    grouped.setdefault(key, []).append(doc_id)
+
+            if not grouped:
+                return 0
+
+            removed = self._delete_from_partitions(grouped)
+            self.index_version += 1
+            self._save_manifest()
+            return removed
+
+    def _delete_from_partitions(self, grouped: Dict[str, List[str]]) -> int:
+        """Delete document ids grouped by partition; drop emptied user partitions."""
+        removed = 0
+        for key, doc_ids in grouped.items():
+            store = self._get_partition(key)
+            if store is None or not store.is_loaded:
+                continue
+
+            removed += store.delete_documents(doc_ids)
+            self._record_partition(key, store, doc_ids)
+            if key != PUBLIC_PARTITION and not store.document_chunks:
+                self._drop_partition(key)
+        return removed
+
+    def sync_documents(self, documents: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Make the partitions mirror the given document set.
+
+        Returns:
+            Counters of added, updated, unchanged and deleted documents
+        """
+        with self._update_lock:
+            current_ids = set()
+
+            def track_ids(docs: Iterable[Dict[str, Any]]):
+                for doc in docs:
+                    current_ids.add(self.public._get_document_id(doc))
+                    yield doc
+
+            stats = self.upsert_documents(track_ids(documents))
+
+            removed_ids = [
+                doc_id for doc_id in self._documents if doc_id not in current_ids
+            ]
+            stats["deleted"] = (
+                self.delete_documents(removed_ids) if removed_ids else 0
+            )
+            return stats
+
+    def get_document_ids(self, prefix: str = "") -> List[str]:
+        """Get indexed document IDs, optionally filtered by prefix."""
+        return [doc_id for doc_id in self._documents if doc_id.startswith(prefix)]
+
+    def _save_manifest(self) -> None:
+        """Persist partition manifest atomically."""
+        os.makedirs(self.persist_directory, exist_ok=True)
+        path = os.path.join(self.persist_directory, PARTITION_MANIFEST_FILENAME)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "documents": self._documents,
+                    "aliases": self._aliases,
+                    "partitions": self._partition_chunks,
+                    "chunking": self.index_chunking,
+                },
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(temp_path, path)
+
+    def load_from_disk(self) -> None:
+        """Load the manifest và public partition (user partitions load lazily)."""
+        path = os.path.join(self.persist_directory, PARTITION_MANIFEST_FILENAME)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Partition manifest not found: {path}")
+
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        with self._lock:
+            self._loaded.clear()
+        self._documents = manifest.get("documents", {})
+        self._aliases = manifest.get("aliases", {})
+        self._partition_chunks = manifest.get("partitions", {})
+        self.index_chunking = manifest.get("chunking")
+
+        if self._partition_exists(PUBLIC_PARTITION):
+            self.public.load_from_disk()
+
+        self.is_loaded = True
+        self.index_version += 1
+        logger.info(
+            f"✅ Partition manifest loaded: {len(self._partition_chunks)} partitions, "
+            f"{len(self._documents)} documents"
+        )
+
+    def needs_rechunk(self) -> bool:
+        """True if the partitions were chunked with another (or unknown) config."""
+        current = self.chunker.config.model_dump()
+        return self.is_loaded and self.index_chunking != current
+
+    def embed_query(self, query: str):
+        """Embed a search query, served from the shared LRU cache when possible."""
+        return self.public.embed_query(query)
+
+    def search_documents(
+        self,
+        query: str,
+        top_k: int = 5,
+        similarity_threshold: float = 0.0,
+        topic_filter: Optional[str] = None,
+        category_filter: Optional[str] = None,
+        user_filter: Optional[str] = None,
+        retrieval_mode: str = "vector",
+        rrf_k: int = 60,
+    ) -> List[Dict[str, Any]]:
+        """
+        Search the caller's partition (user_filter) và the public partition.
+
+        Queries without user_filter only see the public partition. Results of
+        the two partitions are merged by similarity (vector mode) or by
+        Reciprocal Rank Fusion (lexical/hybrid, BM25 scores are per partition).
+
+        Args: same as LangChainVectorStore.search_documents
+
+        Returns:
+            List of search results with metadata
+        """
+        if not self.is_loaded:
+            raise RuntimeError(
+                "Vector store not initialized. Call build_from_documents or load_from_disk first."
+            )
+
+        keys = [PUBLIC_PARTITION]
+        owner_key = self._aliases.get(user_filter.lower()) if user_filter else None
+        if owner_key:
+            keys.insert(0, owner_key)
+
+        result_lists = []
+        for key in keys:
+            store = self._get_partition(key)
+            if store is None or not store.is_loaded:
+                continue
+            # Owner filtering is implied by the partition
+            result_lists.append(
+                store.search_documents(
+                    query=query,
+                    top_k=top_k,
+                    similarity_threshold=similarity_threshold,
+                    topic_filter=topic_filter,
+                    category_filter=category_filter,
+                    retrieval_mode=retrieval_mode,
+                    rrf_k=rrf_k,
+                )
+            )
+
+        if len(result_lists) <= 1:
+            return result_lists[0] if result_lists else []
+
+        if retrieval_mode == "vector":
+            merged = [result for results in result_lists for result in results]
+            merged.sort(key=lambda result: result["similarity_score"], reverse=True)
+            return _distinct_results(merged, top_k)
+
+        by_chunk = {
+            result["chunk_id"]: result for results in result_lists for result in results
+        }
+        fused = reciprocal_rank_fusion(
+            [[result["chunk_id"] for result in results] for results in result_lists],
+            k=rrf_k,
+        )
+        return _distinct_results([by_chunk[chunk_id] for chunk_id, _ in fused], top_k)
+
+    def clear_cache(self) -> None:
+        """Clear any cached data."""
+        self.query_cache.clear()
+        logger.info("Vector store cache cleared")
+
+    def clear_index(self) -> None:
+        """Clear all persisted partitions."""
+        self._ensure_writable()
+        with self._update_lock:
+            self.public.clear_index()
+            with self._lock:
+                self._loaded.clear()
+            if os.path.exists(self.persist_directory):
+                shutil.rmtree(self.persist_directory)
+            self._documents = {}
+            self._aliases = {}
+            self._partition_chunks = {}
+            self.is_loaded = False
+            self.index_version += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get partitioned store statistics."""
+        with self._lock:
+            loaded = list(self._loaded)
+            partition_stats = dict(self.stats)
+
+        return {
+            "is_loaded": self.is_loaded,
+            "persist_directory": self.persist_directory,
+            "embedding_model": self.embedding_model_name,
+            "partitioned": True,
+            "partitions": len(self._partition_chunks),
+            "loaded_partitions": len(loaded),
+            "max_loaded_partitions": self.max_loaded_partitions,
+            "partition_cache": partition_stats,
+            "total_documents": len(self._documents),
+            "total_vectors": sum(self._partition_chunks.values()),
+            "public_partition": self.public.get_stats(),
+            "query_cache": self.query_cache.get_stats(),
+            "embedding_pipeline": self.embedding_pipeline.get_stats(),
+            "index_version": self.index_version,
+            "index_type": self.index_type,
+            "read_only": self.read_only,
+            "chunking": self.chunker.config.model_dump(),
+        }
+
+
+__all__ = [
+    "PartitionedVectorStore",
+    "get_partition_key",
+    "get_owner_aliases",
+    "PUBLIC_PARTITION",
+    "PARTITION_MANIFEST_FILENAME",
+]
@@ -0,0 +1,177 @@
+"""
+CPU cross-encoder re-ranking stage.
+
+Retriever over-fetch N candidates, cross-encoder chấm điểm (query, chunk) pairs
+theo batches và chỉ giữ những chunks tốt nhất cho context - prompt ngắn hơn,
+LLM trả lời nhanh hơn. Mỗi request có time budget: nếu scoring không kịp
+trong budget thì giữ nguyên vector order.
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from schemas import RetrievedDocument
+from embedding_pipeline import get_embedding_device
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+class CrossEncoderReranker:
+    """Re-rank retrieved chunks với a small cross-encoder (lazy loaded)."""
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        device: Optional[str] = None,
+        max_length: int = 512,
+    ):
+        """
+        Initialize reranker.
+
+        Args:
+            model_name: CrossEncoder model (default: RERANKER_MODEL env or
+                ms-marco-MiniLM-L-6-v2)
+            batch_size: Pairs per batch (default: RERANKER_BATCH_SIZE env or 8)
+            device: Torch device (default: EMBEDDING_DEVICE env or "cpu")
+            max_length: Max tokens per (query, chunk) pair
+        """
+        self.model_name = model_name or os.getenv(
+            "RERANKER_MODEL", DEFAULT_RERANKER_MODEL
+        )
+        self.batch_size = batch_size or int(os.getenv("RERANKER_BATCH_SIZE", "8"))
+        self.device = device or get_embedding_device()
+        self.max_length = max_length
+
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+        self.stats = {"requests": 0, "reranked": 0, "budget_exceeded": 0}
+        self._total_ms = 0.0
+
+    def _get_model(self):
+        """Load the cross-encoder on first use."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+
+                    start = time.perf_counter()
+                    self._model = CrossEncoder(
+                        self.model_name, max_length=self.max_length, device=self.device
+                    )
+                    logger.info(
+                        f"✅ Reranker loaded: {self.model_name} "
+                        f"({(time.perf_counter() - start) * 1000:.0f}ms)"
+                    )
+        return self._model
+
+    def rerank(
+        self,
+        query: str,
+        documents: List[RetrievedDocument],
+        top_k: int,
+        budget_ms: Optional[float] = None,
+    ) -> Tuple[List[RetrievedDocument], Dict[str, Any]]:
+        """
+        Re-rank candidates và keep the best top_k.
+
+        Args:
+            query: User query
+            documents: Candidates in retrieval order
+            top_k: Number of documents to keep
+            budget_ms: Scoring time budget (None/0 = unlimited); khi vượt budget
+                thì trả về top_k theo retrieval order
+
+        Returns:
+            (documents, timings) - timings has candidates, kept, scoring_ms,
+            load_ms, batches và budget_exceeded
+        """
+        timings: Dict[str, Any] = {
+            "candidates": len(documents),
+            "kept": min(top_k, len(documents)),
+            "load_ms": 0.0,
+            "scoring_ms": 0.0,
+            "batches": 0,
+            "budget_exceeded": False,
+        }
+        if len(documents) <= 1:
+            return documents[:top_k], timings
+
+        load_start = time.perf_counter()
+        model = self._get_model()
+        start = time.perf_counter()
+        timings["load_ms"] = round((start - load_start) * 1000, 2)
+
+        # Model loading is not charged to the request budget
+        deadline = start + budget_ms / 1000 if budget_ms else None
+        pairs = [(query, doc.content) for doc in documents]
+        scores: List[float] = []
+        batch_seconds = 0.0
+
+        for offset in range(0, len(pairs), self.batch_size):
+            batch_start = time.perf_counter()
+            # Stop early when the next batch is not expected to fit the budget
+            if deadline is not None and batch_start + batch_seconds > deadline:
+                timings["budget_exceeded"] = True
+                break
+
+            batch = pairs[offset : offset + self.batch_size]
+            scores.extend(
+                float(score)
+                for score in model.predict(
+                    batch, batch_size=len(batch), show_progress_bar=False
+                )
+            )
+            batch_seconds = time.perf_counter() - batch_start
+            timings["batches"] += 1
+
+        timings["scoring_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        self._record(timings)
+
+        if timings["budget_exceeded"]:
+            logger.warning(
+                f"⏱️ Rerank budget ({budget_ms}ms) exhausted after "
+                f"{timings['batches']} batches, keeping retrieval order"
+            )
+            return documents[:top_k], timings
+
+        ranked = sorted(
+            zip(documents, scores), key=lambda item: item[1], reverse=True
+        )[:top_k]
+        return [
+            doc.model_copy(update={"rerank_score": score}) for doc, score in ranked
+        ], timings
+
+    def _record(self, timings: Dict[str, Any]) -> None:
+        with self._stats_lock:
+            self.stats["requests"] += 1
+            if timings["budget_exceeded"]:
+                self.stats["budget_exceeded"] += 1
+            else:
+                self.stats["reranked"] += 1
+            self._total_ms += timings["scoring_ms"]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get reranker statistics."""
+        with self._stats_lock:
+            requests = self.stats["requests"]
+            return {
+                "model": self.model_name,
+                "loaded": self._model is not None,
+                "batch_size": self.batch_size,
+                "device": self.device,
+                **self.stats,
+                "avg_scoring_ms": (
+                    round(self._total_ms / requests, 2) if requests else 0.0
+                ),
+            }
+
+
+__all__ = ["CrossEncoderReranker", "DEFAULT_RERANKER_MODEL"]
@@ -0,0 +1,195 @@
+"""
+Semantic response cache cho RAGChatEngine.
+
+Lưu câu trả lời của các câu hỏi gần đây trong một FAISS index nhỏ (inner
+product trên normalized query embeddings). Một câu hỏi mới dùng lại câu trả lời
+cũ khi: similarity >= threshold, cùng retrieved source chunks, cùng chat config
+và cùng vector index version.
+"""
+
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import faiss
+import numpy as np
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse(BaseModel):
+    """Một câu trả lời đã cache."""
+
+    query: str
+    answer: str
+    source_ids: Tuple[str, ...]
+    config_key: str
+    index_version: int
+    created_at: float
+
+
+class SemanticResponseCache:
+    """Thread-safe semantic cache of recent RAG answers."""
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        similarity_threshold: float = 0.95,
+        ttl_seconds: Optional[float] = 3600,
+        candidates: int = 5,
+    ):
+        """
+        Initialize semantic response cache.
+
+        Args:
+            max_entries: Maximum cached answers (oldest evicted first)
+            similarity_threshold: Minimum cosine similarity between queries
+            ttl_seconds: Entry lifetime in seconds (None = no expiry)
+            candidates: Nearest cached queries checked per lookup
+        """
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.candidates = candidates
+
+        self._index: Optional[faiss.IndexFlatIP] = None
+        self._vectors: List[np.ndarray] = []
+        self._entries: List[CachedResponse] = []
+        self._index_version: Optional[int] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(
+        self,
+        query_vector: np.ndarray,
+        source_ids: List[str],
+        config_key: str,
+        index_version: int,
+    ) -> Optional[CachedResponse]:
+        """
+        Find a cached answer for a semantically equivalent question.
+
+        Args:
+            query_vector: Normalized query embedding
+            source_ids: Chunk IDs retrieved for the current query
+            config_key: Key of the chat config used to generate answers
+            index_version: Current vector index version
+
+        Returns:
+            Cached response or None
+        """
+        with self._lock:
+            self._check_index_version(index_version)
+
+            if self._index is None or self._index.ntotal == 0:
+                self.misses += 1
+                return None
+
+            k = min(self.candidates, self._index.ntotal)
+            scores, ids = self._index.search(_as_matrix(query_vector), k)
+
+            now = time.monotonic()
+            wanted_sources = tuple(source_ids)
+            for score, entry_id in zip(scores[0], ids[0]):
+                if entry_id == -1 or score < self.similarity_threshold:
+                    break
+
+                entry = self._entries[entry_id]
+                if self.ttl_seconds is not None and (
+                    now - entry.created_at > self.ttl_seconds
+                ):
+                    continue
+                if entry.source_ids == wanted_sources and (
+                    entry.config_key == config_key
+                ):
+                    self.hits += 1
+                    return entry
+
+            self.misses += 1
+            return None
+
+    def store(
+        self,
+        query: str,
+        query_vector: np.ndarray,
+        answer: str,
+        source_ids: List[str],
+        config_key: str,
+        index_version: int,
+    ) -> None:
+        """Cache an answer generated for the given query and sources."""
+        vector = _as_matrix(query_vector)
+
+        with self._lock:
+            self._check_index_version(index_version)
+
+            if self._index is None:
+                self._index = faiss.IndexFlatIP(vector.shape[1])
+
+            self._entries.append(
+                CachedResponse(
+                    query=query,
+                    answer=answer,
+                    source_ids=tuple(source_ids),
+                    config_key=config_key,
+                    index_version=index_version,
+                    created_at=time.monotonic(),
+                )
+            )
+            self._vectors.append(vector[0])
+            self._index.add(vector)
+
+            if len(self._entries) > self.max_entries:
+                # Evict oldest entries and rebuild the small flat index
+                overflow = len(self._entries) - self.max_entries
+                del self._entries[:overflow]
+                del self._vectors[:overflow]
+                self._index.reset()
+                self._index.add(np.vstack(self._vectors))
+
+    def invalidate(self) -> None:
+        """Drop all cached answers."""
+        with self._lock:
+            self._clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "similarity_threshold": self.similarity_threshold,
+                "index_version": self._index_version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def _check_index_version(self, index_version: int) -> None:
+        """Invalidate everything when the vector index has been rebuilt/updated."""
+        if self._index_version != index_version:
+            if self._entries:
+                logger.info(
+                    f"Vector index changed ({self._index_version} → {index_version}), "
+                    f"dropping {len(self._entries)} cached answers"
+                )
+            self._clear()
+            self._index_version = index_version
+
+    def _clear(self) -> None:
+        self._entries = []
+        self._vectors = []
+        if self._index is not None:
+            self._index.reset()
+
+
+def _as_matrix(vector: np.ndarray) -> np.ndarray:
+    return np.ascontiguousarray(np.asarray(vector, dtype=np.float32).reshape(1, -1))
+
+
+__all__ = ["SemanticResponseCache", "CachedResponse"]
@@ -37,16 +37,48 @@ class RetrievalConfig(BaseModel):
         default=0.3, ge=0.0, le=1.0, description="Minimum similarity score"
     )
     chunk_size: int = Field(
-        default=200, ge=50, le=1000, description="Chunk size in characters"
+        default=200,
+        ge=50,
+        le=1000,
+        description="Chunk size in embedding tokens (index build default)",
     )
     chunk_overlap: int = Field(
-        default=50, ge=0, le=200, description="Overlap between chunks"
+        default=50,
+        ge=0,
+        le=200,
+        description="Overlap between chunks in tokens (index build default)",
+    )
+    user_filter: Optional[str] = Field(
+        default=None,
+        description="Owner email or user ID (searched partition when partitioned)",
     )
-    user_filter: Optional[str] = Field(default=None, description="Filter by user ID")
     topic_filter: Optional[str] = Field(default=None, description="Filter by topic")
+    category_filter: Optional[str] = Field(
+        default=None, description="Filter by category"
+    )
     include_metadata: bool = Field(
         default=True, description="Include document metadata"
     )
+    retrieval_mode: str = Field(
+        default="vector",
+        pattern="^(vector|lexical|hybrid)$",
+        description="vector (FAISS), lexical (BM25) or hybrid (RRF fusion of both)",
+    )
+    rrf_k: int = Field(
+        default=60, ge=1, le=1000, description="Reciprocal Rank Fusion constant"
+    )
+    rerank: bool = Field(
+        default=False, description="Re-rank candidates với a cross-encoder"
+    )
+    rerank_candidates: int = Field(
+        default=20, ge=1, le=100, description="Candidates fetched for re-ranking"
+    )
+    rerank_budget_ms: int = Field(
+        default=300,
+        ge=0,
+        le=10000,
+        description="Re-rank time budget in ms (0 = unlimited)",
+    )
 
     class Config:
         json_schema_extra = {
@@ -55,6 +87,7 @@ class RetrievalConfig(BaseModel):
                 "similarity_threshold": 0.3,
                 "topic_filter": None,
                 "include_metadata": True,
+                "retrieval_mode": "hybrid",
             }
         }
 
@@ -78,6 +111,8 @@ class RetrievedDocument(BaseModel):
     category: str
     similarity_score: float
     tags: List[str] = Field(default_factory=list)
+    rerank_score: Optional[float] = None
+    chunk_index: Optional[int] = None
 
 
 class ChatResponse(BaseModel):
@@ -92,6 +127,32 @@ class ChatResponse(BaseModel):
     metadata: Optional[Dict[str, Any]] = None
 
 
+class ChunkingConfig(BaseModel):
+    """Chunking settings của một index (lưu trong index_state.json)."""
+
+    strategy: str = Field(
+        default="sentence",
+        pattern="^(sentence|character)$",
+        description="sentence (token-aware) or character (legacy splitter)",
+    )
+    chunk_size: int = Field(
+        default=200,
+        ge=10,
+        le=2000,
+        description="Max chunk size (tokens; characters for 'character')",
+    )
+    chunk_overlap: int = Field(
+        default=50, ge=0, le=1000, description="Overlap between consecutive chunks"
+    )
+    unsplit_categories: List[str] = Field(
+        default_factory=lambda: ["flashcard"],
+        description="Categories indexed as a single chunk (e.g. flashcard Q/A)",
+    )
+    tokenizer: Optional[str] = Field(
+        default=None, description="Tokenizer used to measure chunk sizes"
+    )
+
+
 class VectorStoreStats(BaseModel):
     """Thống kê vector store."""
 
@@ -117,6 +178,12 @@ class ChatConfig(BaseModel):
     max_context_docs: int = Field(
         default=5, ge=1, le=20, description="Maximum documents in context"
     )
+    max_context_tokens: int = Field(
+        default=3000,
+        ge=256,
+        le=32000,
+        description="Token budget for conversation history + sources in the prompt",
+    )
     include_sources: bool = Field(
         default=True, description="Include source references in response"
     )
@@ -131,6 +198,7 @@ class ChatConfig(BaseModel):
                 "top_p": 0.9,
                 "max_tokens": 500,
                 "max_context_docs": 5,
+                "max_context_tokens": 3000,
                 "include_sources": True,
                 "response_style": None,
             }
@@ -146,6 +214,9 @@ class ConversationContext(BaseModel):
         default_factory=list, description="Source documents"
     )
     context_text: Optional[str] = Field(default=None, description="Full context text")
+    context_tokens: Optional[int] = Field(
+        default=None, description="Prompt tokens of history + context text"
+    )
 
 
 class ConversationHistory(BaseModel):
@@ -157,6 +228,16 @@ class ConversationHistory(BaseModel):
     messages: List[Dict[str, Any]] = Field(
         default_factory=list, description="Conversation messages"
     )
+    summary: Optional[str] = Field(
+        default=None, description="Rolling summary of older messages"
+    )
+    summarized_message_count: int = Field(
+        default=0, description="Number of leading messages covered by summary"
+    )
+    message_count: Optional[int] = Field(
+        default=None,
+        description="Total messages (listings return headers without messages)",
+    )
 
 
 class ConversationListResponse(BaseModel):
@@ -167,6 +248,9 @@ class ConversationListResponse(BaseModel):
     )
     total: int = Field(..., description="Total conversations")
     has_more: bool = Field(..., description="Whether more conversations exist")
+    next_cursor: Optional[str] = Field(
+        default=None, description="Cursor of the next page (None on the last page)"
+    )
 
 
 class RAGChatRequest(BaseModel):
@@ -241,12 +325,16 @@ class RAGChatResponse(BaseModel):
     retrieved_documents: List[Dict[str, Any]] = Field(
         default_factory=list, description="Retrieved docs"
     )
+    metadata: Optional[Dict[str, Any]] = Field(
+        default=None, description="Processing metadata (cache hits, timings)"
+    )
 
 
 __all__ = [
     "SummaryDocument",
     "DocumentChunk",
     "RetrievalConfig",
+    "ChunkingConfig",
     "ChatRequest",
     "RetrievedDocument",
     "ChatResponse",
@@ -35,7 +35,7 @@ def check_faiss_db_status():
     print("📊 Checking current FAISS database status...")
 
     # Check each file
-    files_to_check = ["index.faiss", "index.pkl", "documents_metadata.json"]
+    files_to_check = ["index.faiss", "index.pkl", "documents_metadata.bin"]
 
     stats = {}
     for filename in files_to_check:
@@ -210,7 +210,7 @@ def main():
 
     # Step 5: Compare before and after
     print("\n📋 STEP 5: Compare before vs after rebuild")
-    for filename in ["index.faiss", "index.pkl", "documents_metadata.json"]:
+    for filename in ["index.faiss", "index.pkl", "documents_metadata.bin"]:
         initial = initial_stats.get(filename, {})
         final = final_stats.get(filename, {})
 
@@ -246,11 +246,11 @@ def main():
         print("❌ Rebuild endpoint failed")
 
     # Check if metadata file was fixed
-    metadata_after = final_stats.get("documents_metadata.json", {})
+    metadata_after = final_stats.get("documents_metadata.bin", {})
     if metadata_after.get("size", 0) > 0:
-        print("✅ documents_metadata.json was populated")
+        print("✅ documents_metadata.bin was populated")
     else:
-        print("❌ documents_metadata.json is still empty")
+        print("❌ documents_metadata.bin is still empty")
 
     if search_result and search_result.get("results_count", 0) > 0:
         print("✅ Search is working after rebuild")
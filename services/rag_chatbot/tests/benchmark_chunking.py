@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Benchmark Chunking Settings
+
+Build một index cho mỗi chunking setting trên cùng documents và so sánh:
+số chunks (vectors), index size, build time, avg tokens/chunk và retrieval
+hit rate. Queries là một câu lấy ngẫu nhiên từ mỗi sampled document; hit@k =
+document gốc nằm trong top_k results (MRR theo rank của document đó).
+
+Documents lấy từ MongoDB (mặc định) hoặc một JSON file
+([{"content": ..., "metadata": {"id", "topic", "category"}}]).
+
+Usage:
+    python tests/benchmark_chunking.py [--limit 500] [--queries 200] [--k 5]
+        [--json documents.json]
+        [--settings character:200:50 sentence:128:16 sentence:200:50]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# Fair build times: every setting embeds its chunks from scratch
+os.environ["EMBEDDING_CACHE_ENABLED"] = "false"
+
+from chunking import Chunker, split_sentences
+from schemas import ChunkingConfig
+from vector_store_langchain import LangChainVectorStore, create_embeddings
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+DEFAULT_SETTINGS = [
+    "character:200:50",
+    "sentence:128:16",
+    "sentence:200:50",
+    "sentence:256:32",
+]
+
+
+def load_documents(json_path: str, limit: int) -> list:
+    """Load index documents từ a JSON file or MongoDB."""
+    if json_path:
+        with open(json_path, "r", encoding="utf-8") as f:
+            return json.load(f)[:limit]
+
+    from mongodb_document_loader import get_mongodb_document_loader
+
+    loader = get_mongodb_document_loader()
+    loader.initialize()
+    return [
+        {
+            "content": doc["content"],
+            "metadata": {
+                "id": doc["id"],
+                "topic": doc["topic"],
+                "category": doc["category"],
+                **doc.get("metadata", {}),
+            },
+        }
+        for doc in loader.iter_documents(limit=limit)
+    ]
+
+
+def make_queries(documents: list, count: int, seed: int = 0) -> list:
+    """(query, document_id) pairs: one random sentence per sampled document."""
+    rng = random.Random(seed)
+    queries = []
+    for doc in rng.sample(documents, min(count, len(documents))):
+        sentences = [
+            sentence
+            for sentence in split_sentences(doc["content"])
+            if len(sentence.split()) >= 5
+        ]
+        if sentences:
+            queries.append((rng.choice(sentences), doc["metadata"]["id"]))
+    return queries
+
+
+def parse_setting(setting: str) -> ChunkingConfig:
+    """"strategy:size:overlap" -> ChunkingConfig."""
+    strategy, size, overlap = setting.split(":")
+    return ChunkingConfig(
+        strategy=strategy,
+        chunk_size=int(size),
+        chunk_overlap=int(overlap),
+        tokenizer=EMBEDDING_MODEL,
+    )
+
+
+def benchmark(
+    setting: str, documents: list, queries: list, k: int, embeddings
+) -> dict:
+    """Build one index và measure size, build time và hit rate."""
+    chunker = Chunker(parse_setting(setting))
+    persist_dir = tempfile.mkdtemp(prefix="chunking_")
+    try:
+        vector_store = LangChainVectorStore(
+            embedding_model=EMBEDDING_MODEL,
+            persist_directory=persist_dir,
+            embeddings=embeddings,
+            chunker=chunker,
+        )
+
+        start = time.perf_counter()
+        vector_store.build_from_documents(documents)
+        build_seconds = time.perf_counter() - start
+
+        stats = vector_store.get_stats()
+        chunk_texts = [
+            doc.page_content
+            for doc in vector_store.vectorstore.docstore._dict.values()
+        ]
+
+        hits = 0
+        reciprocal_ranks = 0.0
+        for query, document_id in queries:
+            results = vector_store.search_documents(query, top_k=k)
+            ranked_ids = list(dict.fromkeys(result["id"] for result in results))
+            if document_id in ranked_ids:
+                hits += 1
+                reciprocal_ranks += 1.0 / (ranked_ids.index(document_id) + 1)
+
+        return {
+            "setting": setting,
+            "chunks": stats["total_vectors"],
+            "size_mb": stats["index_size_mb"],
+            "build_s": build_seconds,
+            "avg_tokens": (
+                sum(chunker.count_tokens(text) for text in chunk_texts)
+                / max(1, len(chunk_texts))
+            ),
+            "hit_rate": hits / max(1, len(queries)),
+            "mrr": reciprocal_ranks / max(1, len(queries)),
+        }
+    finally:
+        shutil.rmtree(persist_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chunking settings")
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--json", default=None)
+    parser.add_argument("--settings", nargs="+", default=DEFAULT_SETTINGS)
+    args = parser.parse_args()
+
+    documents = load_documents(args.json, args.limit)
+    queries = make_queries(documents, args.queries)
+    print(f"📄 {len(documents)} documents, {len(queries)} queries, k={args.k}")
+
+    embeddings = create_embeddings(EMBEDDING_MODEL)
+
+    print(
+        f"{'setting':<18} {'chunks':>7} {'size':>9} {'build':>8} "
+        f"{'tokens':>7} {'hit@' + str(args.k):>7} {'MRR':>6}"
+    )
+    for setting in args.settings:
+        result = benchmark(setting, documents, queries, args.k, embeddings)
+        print(
+            f"{result['setting']:<18} {result['chunks']:>7} "
+            f"{result['size_mb']:7.2f}MB {result['build_s']:7.1f}s "
+            f"{result['avg_tokens']:7.1f} {result['hit_rate']:7.3f} "
+            f"{result['mrr']:6.3f}"
+        )
+
+    print("✅ Benchmark complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark FAISS Index Types
+
+So sánh các index types của index_factory (flat, hnsw, ivf, ivfpq, sq8):
+build time, recall@k so với Flat (exact), p50/p99 single-query latency và
+memory (serialized index size).
+
+Vectors lấy từ một persisted index (--index-dir, ví dụ faiss_db_mongodb) hoặc
+synthetic clustered unit vectors (mặc định).
+
+Usage:
+    python tests/benchmark_index_types.py [--vectors 20000] [--dim 384]
+        [--queries 200] [--k 10] [--index-dir faiss_db_mongodb]
+        [--types flat hnsw ivf ivfpq sq8]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import faiss
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from index_factory import INDEX_TYPES, create_index
+
+
+def load_vectors(index_dir: str) -> np.ndarray:
+    """Read all stored vectors from a persisted FAISS index."""
+    index = faiss.read_index(os.path.join(index_dir, "index.faiss"))
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def synthetic_vectors(count: int, dim: int, seed: int = 0) -> np.ndarray:
+    """Clustered, L2-normalized vectors (closer to real embeddings than noise)."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, count // 200), dim))
+    vectors = centers[rng.integers(0, len(centers), count)] + 0.5 * rng.normal(
+        size=(count, dim)
+    )
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+def benchmark(
+    index_type: str,
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    ground_truth: np.ndarray,
+) -> dict:
+    """Build one index type và measure recall, latency, memory."""
+    start = time.perf_counter()
+    index = create_index(index_type, vectors)
+    index.add(vectors)
+    build_seconds = time.perf_counter() - start
+
+    # Single-query latency (the chat hot path searches one query at a time)
+    latencies = []
+    found = np.empty((len(queries), k), dtype=np.int64)
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        _, ids = index.search(query.reshape(1, -1), k)
+        latencies.append(time.perf_counter() - start)
+        found[i] = ids[0]
+
+    recall = np.mean(
+        [
+            len(set(found[i]) & set(ground_truth[i])) / k
+            for i in range(len(queries))
+        ]
+    )
+    latencies_ms = np.asarray(latencies) * 1000
+
+    return {
+        "type": index_type,
+        "build_s": build_seconds,
+        "recall": recall,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "memory_mb": len(faiss.serialize_index(index)) / (1024 * 1024),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FAISS index types")
+    parser.add_argument("--vectors", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--index-dir", default=None)
+    parser.add_argument("--types", nargs="+", default=list(INDEX_TYPES))
+    args = parser.parse_args()
+
+    if args.index_dir:
+        vectors = load_vectors(args.index_dir)
+        print(f"📁 Loaded {len(vectors)} vectors from {args.index_dir}")
+    else:
+        vectors = synthetic_vectors(args.vectors, args.dim)
+        print(f"🧪 Generated {len(vectors)} synthetic vectors (dim={args.dim})")
+
+    # Queries: perturbed stored vectors (like paraphrased questions)
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.integers(0, len(vectors), args.queries)]
+    queries = queries + 0.1 * rng.normal(size=queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    exact = faiss.IndexFlatL2(vectors.shape[1])
+    exact.add(vectors)
+    _, ground_truth = exact.search(queries, args.k)
+
+    print(
+        f"{'type':<7} {'build':>8} {'recall@' + str(args.k):>10} "
+        f"{'p50':>9} {'p99':>9} {'memory':>10}"
+    )
+    for index_type in args.types:
+        result = benchmark(index_type, vectors, queries, args.k, ground_truth)
+        print(
+            f"{result['type']:<7} {result['build_s']:7.2f}s {result['recall']:10.3f} "
+            f"{result['p50_ms']:7.3f}ms {result['p99_ms']:7.3f}ms "
+            f"{result['memory_mb']:8.1f}MB"
+        )
+
+    print("✅ Benchmark complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Load Test RAG Chat API
+
+Gửi các /chat/quick requests song song với nhiều mức concurrency và in
+throughput (requests/s) + latency để kiểm tra async chat pipeline không
+block event loop (throughput phải tăng theo concurrency).
+
+Usage:
+    python tests/load_test_chat.py [--requests 40] [--concurrency 1 5 10 20]
+"""
+
+import os
+import time
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+API_BASE = os.getenv("RAG_API_BASE", "http://localhost:8006")
+
+QUERIES = [
+    "Python là gì?",
+    "Giải thích JavaScript event loop",
+    "So sánh SQL và NoSQL database",
+    "REST API best practices",
+    "What is network layered model?",
+]
+
+
+def _send_request(index: int) -> float:
+    """Send one quick chat request, return latency in seconds."""
+    params = {"query": QUERIES[index % len(QUERIES)], "top_k": 3}
+    start = time.perf_counter()
+    response = requests.post(f"{API_BASE}/chat/quick", params=params, timeout=120)
+    response.raise_for_status()
+    return time.perf_counter() - start
+
+
+def run_load_test(total_requests: int, concurrency: int) -> dict:
+    """Run total_requests với concurrency concurrent clients."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = sorted(pool.map(_send_request, range(total_requests)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "throughput": total_requests / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test RAG chat API")
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 10, 20])
+    args = parser.parse_args()
+
+    print(f"🚀 Load testing {API_BASE}/chat/quick ({args.requests} requests/level)")
+
+    # Warm up (index loading, model initialization)
+    _send_request(0)
+
+    results = []
+    for concurrency in args.concurrency:
+        result = run_load_test(args.requests, concurrency)
+        results.append(result)
+        print(
+            f"📊 concurrency={result['concurrency']:>3}  "
+            f"throughput={result['throughput']:6.2f} req/s  "
+            f"p50={result['p50'] * 1000:7.1f} ms  p95={result['p95'] * 1000:7.1f} ms"
+        )
+
+    baseline = results[0]["throughput"]
+    best = max(results, key=lambda r: r["throughput"])
+    print(
+        f"✅ Peak throughput {best['throughput']:.2f} req/s at concurrency "
+        f"{best['concurrency']} ({best['throughput'] / baseline:.1f}x vs "
+        f"concurrency {results[0]['concurrency']})"
+    )
+
+
+if __name__ == "__main__":
+    main()
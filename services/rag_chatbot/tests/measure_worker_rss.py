@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Measure Worker Memory: default vs read-only (mmapped) index loading
+
+Mô phỏng N uvicorn workers: mỗi worker là một spawned process load cùng
+persisted index, chạy vài searches, rồi report memory trong khi tất cả
+workers vẫn đang chạy (để shared pages được tính đúng):
+
+    RSS      - resident set size (shared file pages được đếm ở mọi worker)
+    RssAnon  - private heap (unpickled docstore, copied index vectors)
+    Pss      - proportional set size (shared pages chia đều cho các workers)
+
+Delta = sau khi load index - trước khi load index (embedding model đã load).
+Linux only (/proc/self/status, /proc/self/smaps_rollup).
+
+Usage:
+    python tests/measure_worker_rss.py [--workers 4] [--persist-dir faiss_db_mongodb]
+"""
+
+import os
+import sys
+import argparse
+import multiprocessing as mp
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+QUERIES = [
+    "cấu trúc dữ liệu",
+    "học máy là gì",
+    "giao thức mạng TCP",
+    "thuật toán sắp xếp",
+]
+
+
+def read_memory_kb() -> dict:
+    """Current RSS, RssAnon, RssFile và Pss (kB) of this process."""
+    memory = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "RssAnon", "RssFile"):
+                memory[key] = int(value.split()[0])
+
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    memory["Pss"] = int(line.split()[1])
+    except FileNotFoundError:
+        memory["Pss"] = 0
+
+    return memory
+
+
+def run_worker(persist_dir: str, read_only: bool, barrier, results) -> None:
+    """One simulated API worker: load index, search, report memory."""
+    os.environ["EMBEDDING_CACHE_ENABLED"] = "false"
+    from vector_store_langchain import LangChainVectorStore
+
+    vector_store = LangChainVectorStore(
+        persist_directory=persist_dir, read_only=read_only
+    )
+    vector_store.embed_query(QUERIES[0])  # model weights resident
+    before = read_memory_kb()
+
+    vector_store.load_from_disk()
+    for query in QUERIES:
+        vector_store.search_documents(query, top_k=5)
+        vector_store.search_documents(query, top_k=5, retrieval_mode="hybrid")
+
+    # Measure while every worker is alive so shared pages are split in Pss
+    barrier.wait()
+    after = read_memory_kb()
+    results.put((os.getpid(), before, after))
+    barrier.wait()
+
+
+def measure(persist_dir: str, workers: int, read_only: bool) -> list:
+    """Run workers for one mode and collect (pid, before, after) tuples."""
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=run_worker, args=(persist_dir, read_only, barrier, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return collected
+
+
+def print_report(mode: str, collected: list) -> None:
+    """Print per-worker deltas and totals (MB)."""
+    print(f"\n📊 {mode}")
+    print(
+        f"{'pid':>8} {'RSS Δ':>10} {'RssAnon Δ':>10} {'Pss Δ':>10} "
+        f"{'RSS':>10} {'Pss':>10}"
+    )
+
+    totals = {"VmRSS": 0, "RssAnon": 0, "Pss": 0}
+    for pid, before, after in collected:
+        delta = {key: (after[key] - before[key]) / 1024 for key in totals}
+        for key in totals:
+            totals[key] += delta[key]
+        print(
+            f"{pid:>8} {delta['VmRSS']:8.1f}MB {delta['RssAnon']:8.1f}MB "
+            f"{delta['Pss']:8.1f}MB {after['VmRSS'] / 1024:8.1f}MB "
+            f"{after['Pss'] / 1024:8.1f}MB"
+        )
+    print(
+        f"{'total':>8} {totals['VmRSS']:8.1f}MB {totals['RssAnon']:8.1f}MB "
+        f"{totals['Pss']:8.1f}MB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-worker index memory")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--persist-dir",
+        default=os.path.join(os.path.dirname(__file__), "..", "faiss_db_mongodb"),
+    )
+    args = parser.parse_args()
+
+    from chunk_docstore import CHUNK_DOCSTORE_FILENAME
+
+    if not os.path.exists(os.path.join(args.persist_dir, CHUNK_DOCSTORE_FILENAME)):
+        print(
+            f"⚠️ {CHUNK_DOCSTORE_FILENAME} not found in {args.persist_dir} - "
+            "save the index once (e.g. POST /admin/rebuild-index)"
+        )
+        return
+
+    print(f"🧪 {args.workers} workers, index: {args.persist_dir}")
+    for mode, read_only in (
+        ("Default (index.pkl + read_index)", False),
+        ("Read-only (mmap)", True),
+    ):
+        print_report(mode, measure(args.persist_dir, args.workers, read_only))
+    print("\n✅ Measurement complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test MongoDB Change Watcher
+
+Chạy poller fallback của MongoDBChangeWatcher trên mongomock (không cần
+MongoDB server) và kiểm tra inserts/updates/deletes được gom thành batch.
+"""
+
+import os
+import sys
+import time
+import threading
+from datetime import datetime, timedelta
+
+import mongomock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from mongodb_change_watcher import MongoDBChangeWatcher
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_poller_batches_source_changes():
+    """Poller should report inserted, updated and deleted source records."""
+    print("🧪 Testing change watcher poller fallback...")
+
+    database = mongomock.MongoClient()["hackathon"]
+    base_time = datetime(2025, 1, 1)
+    database["WH_Note"].insert_one(
+        {"_id": "n1", "content": "Old note content", "updatedAt": base_time}
+    )
+    database["flash_cards"].insert_one({"_id": "s1", "cards": []})
+
+    batches = []
+    lock = threading.Lock()
+
+    def on_changes(changes):
+        with lock:
+            batches.append(sorted(changes, key=str))
+
+    watcher = MongoDBChangeWatcher(
+        database=database,
+        on_changes=on_changes,
+        poll_interval=0.1,
+        reconcile_every=1,
+    )
+    watcher.start()
+
+    try:
+        assert _wait_for(lambda: watcher.mode == "poller"), "poller not started"
+        time.sleep(0.3)  # first poll establishes checkpoints
+
+        database["WH_Note"].update_one(
+            {"_id": "n1"},
+            {"$set": {"content": "New", "updatedAt": base_time + timedelta(hours=1)}},
+        )
+        database["flash_cards"].delete_one({"_id": "s1"})
+        database["users"].insert_one({"_id": "u1", "summaries": ["hello world"]})
+
+        expected = {("WH_Note", "n1"), ("flash_cards", "s1"), ("users", "u1")}
+
+        def seen():
+            with lock:
+                return expected <= {change for batch in batches for change in batch}
+
+        assert _wait_for(seen), f"changes not applied: {batches}"
+        print(f"✅ Batches: {batches}")
+
+    finally:
+        watcher.stop()
+
+    assert watcher.get_stats()["batches_applied"] >= 1
+
+
+if __name__ == "__main__":
+    test_poller_batches_source_changes()
+    print("🎉 Change watcher test completed!")
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Test Dedup State on Failed Incremental Updates
+
+Embedding lỗi giữa upsert_documents/delete_documents không được để lại
+canonical chunk không có vector hay self-loop trong duplicate_of; lần retry
+phải index được document và các bản copy của nó. Index legacy (docstore id là
+UUID) vẫn phải xóa/thay được chunks.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from vector_store_langchain import LangChainVectorStore
+
+CARD = "Q: TCP là gì?\nA: Giao thức truyền tải tin cậy, hướng kết nối."
+NOTE = "Ghi chú: UDP không bắt tay, nhanh nhưng không đảm bảo thứ tự gói tin."
+
+
+def _doc(doc_id, content, user_email):
+    return {
+        "content": content,
+        "metadata": {
+            "id": doc_id,
+            "topic": "Networking",
+            "category": "flashcard",
+            "user_email": user_email,
+        },
+    }
+
+
+def _fail_next_embed(vector_store):
+    """Make the next embedding call raise, as a model/cache outage would."""
+    embed = vector_store.embedding_pipeline.embed
+
+    def failing_embed(texts):
+        vector_store.embedding_pipeline.embed = embed
+        raise RuntimeError("embedding backend unavailable")
+
+    vector_store.embedding_pipeline.embed = failing_embed
+
+
+def _dedup_state(vector_store):
+    return len(vector_store.deduplicator), dict(vector_store.duplicate_of)
+
+
+def _assert_consistent(vector_store):
+    indexed = set(vector_store.vectorstore.index_to_docstore_id.values())
+    for chunk_id, canonical_id in vector_store.duplicate_of.items():
+        assert chunk_id != canonical_id, f"self-loop in duplicate_of: {chunk_id}"
+        assert canonical_id in indexed, f"duplicate of unindexed {canonical_id}"
+    assert len(vector_store.deduplicator) == len(indexed), "orphaned canonical ids"
+
+
+def _result_ids(vector_store, query, user_email):
+    return [
+        result["id"]
+        for result in vector_store.search_documents(
+            query, top_k=5, user_filter=user_email
+        )
+    ]
+
+
+def test_failed_upsert_keeps_dedup_state():
+    """A failed embed must not register canonicals; the retry indexes everything."""
+    print("🧪 Testing failed upsert...")
+
+    vector_store = LangChainVectorStore(persist_directory=tempfile.mkdtemp())
+    vector_store.build_from_documents([_doc("card0", CARD, "u0@example.com")])
+    before = _dedup_state(vector_store)
+
+    _fail_next_embed(vector_store)
+    try:
+        vector_store.upsert_documents([_doc("note1", NOTE, "u1@example.com")])
+        raise AssertionError("upsert should propagate the embedding error")
+    except RuntimeError as e:
+        print(f"✅ Upsert failed as expected: {e}")
+
+    assert _dedup_state(vector_store) == before, "dedup state changed on failure"
+    _assert_consistent(vector_store)
+
+    stats = vector_store.upsert_documents(
+        [
+            _doc("note1", NOTE, "u1@example.com"),
+            _doc("note2", NOTE, "u2@example.com"),
+        ]
+    )
+    assert stats["added"] == 2, stats
+    _assert_consistent(vector_store)
+
+    assert _result_ids(vector_store, "UDP", "u1@example.com"), "retry not searchable"
+    assert _result_ids(vector_store, "UDP", "u2@example.com"), "copy not searchable"
+    print(f"✅ Retry indexed note1 and its copy: {vector_store.duplicate_of}")
+
+
+def test_failed_delete_keeps_dedup_state():
+    """Deleting a shared canonical must not detach it when promotion fails."""
+    print("🧪 Testing failed delete of a shared canonical chunk...")
+
+    vector_store = LangChainVectorStore(persist_directory=tempfile.mkdtemp())
+    vector_store.build_from_documents(
+        [_doc("card0", CARD, "u0@example.com"), _doc("card1", CARD, "u1@example.com")]
+    )
+    before = _dedup_state(vector_store)
+
+    _fail_next_embed(vector_store)
+    try:
+        vector_store.delete_documents(["card0"])
+        raise AssertionError("delete should propagate the embedding error")
+    except RuntimeError as e:
+        print(f"✅ Delete failed as expected: {e}")
+
+    assert _dedup_state(vector_store) == before, "dedup state changed on failure"
+    _assert_consistent(vector_store)
+
+    assert vector_store.delete_documents(["card0"]) == 1
+    _assert_consistent(vector_store)
+    assert _result_ids(vector_store, "TCP", "u1@example.com"), "copy lost"
+    assert not _result_ids(vector_store, "TCP", "u0@example.com"), "deleted owner"
+    print("✅ Retry promoted card1 to canonical")
+
+
+def test_legacy_index_updates():
+    """Indexes with UUID docstore ids must still delete and replace chunks."""
+    print("🧪 Testing updates on a legacy (UUID docstore id) index...")
+
+    persist_directory = tempfile.mkdtemp()
+    vector_store = LangChainVectorStore(persist_directory=persist_directory)
+    FAISS.from_documents(
+        [
+            Document(
+                page_content=f"{doc_id}: {NOTE}",
+                metadata={
+                    "document_id": doc_id,
+                    "chunk_id": f"{doc_id}_chunk_0",
+                    "topic": "Networking",
+                    "category": "note",
+                },
+            )
+            for doc_id in ("a", "b")
+        ],
+        vector_store.embeddings,
+    ).save_local(persist_directory)
+    vector_store.load_from_disk()
+    assert not vector_store.duplicate_of, vector_store.duplicate_of
+
+    assert vector_store.delete_documents(["a"]) == 1
+    assert vector_store.vectorstore.index.ntotal == 1, "vector not removed"
+    result_ids = [result["id"] for result in vector_store.search_documents("UDP")]
+    assert "a" not in result_ids, result_ids
+    print(f"✅ Deleted legacy document, remaining: {result_ids}")
+
+
+if __name__ == "__main__":
+    test_failed_upsert_keeps_dedup_state()
+    test_failed_delete_keeps_dedup_state()
+    test_legacy_index_updates()
+    print("🎉 Dedup update tests completed!")
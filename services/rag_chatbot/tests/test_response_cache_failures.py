@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test Semantic Response Cache on Failed Generations
+
+Khi mọi Gemini model lỗi (hoặc circuit breakers đều mở), câu xin lỗi
+FAILURE_MESSAGE không được lưu vào semantic cache; câu trả lời thật sau đó
+vẫn được cache như bình thường. Chạy trên stub retriever/LLM (không cần
+MongoDB, Gemini hay embedding model).
+"""
+
+import os
+import sys
+import asyncio
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from chat_engine import RAGChatEngine
+from llm_adapter import FAILURE_MESSAGE
+from response_cache import SemanticResponseCache
+from schemas import RAGChatRequest
+
+
+class _StubVectorStore:
+    index_version = 0
+
+    def embed_query(self, query):
+        vector = np.ones(8, dtype=np.float32)
+        return vector / np.linalg.norm(vector)
+
+
+class _StubRetriever:
+    vector_store = _StubVectorStore()
+
+    def retrieve_documents(self, query, config):
+        return []
+
+    async def aretrieve_documents(self, query, config):
+        return []
+
+
+class _StubLLM:
+    use_canned_responses = False
+
+    def __init__(self):
+        self.answer = FAILURE_MESSAGE
+
+    def generate_response(self, messages, config):
+        return self.answer
+
+    async def agenerate_response(self, messages, config):
+        return self.answer
+
+    async def astream_response(self, messages, config):
+        yield self.answer
+
+
+def _create_engine():
+    llm = _StubLLM()
+    cache = SemanticResponseCache(similarity_threshold=0.9)
+    engine = RAGChatEngine(
+        retriever=_StubRetriever(),
+        llm_adapter=llm,
+        response_cache=cache,
+        conversation_store=object(),
+        summarizer=object(),
+    )
+    return engine, llm, cache
+
+
+async def _stream(engine, request):
+    return [event async for event in engine.astream_chat(request)]
+
+
+def test_failed_generation_is_not_cached():
+    """chat, achat and astream_chat must not cache FAILURE_MESSAGE."""
+    print("🧪 Testing failed generations bypass the response cache...")
+
+    engine, llm, cache = _create_engine()
+    request = RAGChatRequest(query="TCP là gì?")
+
+    assert engine.chat(request).answer == FAILURE_MESSAGE
+    assert asyncio.run(engine.achat(request)).answer == FAILURE_MESSAGE
+    asyncio.run(_stream(engine, request))
+    assert cache.get_stats()["size"] == 0, "failure message was cached"
+    print("✅ Failure message not cached (sync, async, streaming)")
+
+    llm.answer = "TCP là giao thức truyền tải tin cậy."
+    engine.chat(request)
+    assert cache.get_stats()["size"] == 1, "real answer was not cached"
+
+    response = engine.chat(request)
+    assert response.metadata["cache_hit"] and response.answer == llm.answer
+    print("✅ Real answer cached and served from cache")
+
+
+if __name__ == "__main__":
+    test_failed_generation_is_not_cached()
+    print("🎉 Response cache failure test completed!")
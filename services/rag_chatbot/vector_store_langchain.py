@@ -1,20 +1,200 @@
 import os
 import json
+import hashlib
 import logging
-from typing import List, Optional, Dict, Any
+import threading
+from contextlib import contextmanager
+from typing import Iterable, List, Optional, Dict, Any, Set, Tuple, Union
 from datetime import datetime
 import shutil
 
+import faiss
+import numpy as np
 from langchain_community.vectorstores import FAISS
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_core.documents import Document
-from langchain_text_splitters import CharacterTextSplitter
 
 from schemas import SummaryDocument, DocumentChunk, RetrievalConfig, RetrievedDocument
-from bulletproof_json import create_bulletproof_save_index_method
+from embedding_cache import PersistentEmbeddingCache, QueryEmbeddingCache
+from embedding_pipeline import EmbeddingPipeline, get_embedding_device
+from metadata_store import ChunkMetadataStore, LEGACY_METADATA_FILENAME
+from lexical_index import BM25Index, reciprocal_rank_fusion
+from chunk_docstore import MmapDocstore, write_chunk_docstore
+from chunking import Chunker, get_chunking_config
+from dedup import ChunkDeduplicator, StagedDeduplicator, get_deduplicator
+from index_factory import (
+    compact_index,
+    configure_search,
+    create_index,
+    describe_index,
+    get_index_type,
+    is_exact,
+    read_index_mmapped,
+    search_parameters,
+    search_subset,
+    supports_remove_ids,
+)
 
 logger = logging.getLogger(__name__)
 
+# Metadata keys that change on every load and must not affect content hashes
+VOLATILE_METADATA_KEYS = {"processed_at", "content_length"}
+
+_EMPTY_IDS = np.empty(0, dtype=np.int64)
+
+# Chunk metadata kept per source chunk of a deduplicated (canonical) chunk
+SOURCE_METADATA_KEYS = (
+    "document_id",
+    "chunk_id",
+    "chunk_index",
+    "title",
+    "topic",
+    "category",
+    "source",
+    "user_email",
+    "user_id",
+)
+_OWNER_KEYS = ("user_email", "user_id")
+
+
+def _source_entry(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Source entry of one chunk (identity, facets and owner)."""
+    return {
+        key: metadata[key]
+        for key in SOURCE_METADATA_KEYS
+        if metadata.get(key) not in (None, "")
+    }
+
+
+def get_chunk_sources(metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Source chunks an indexed chunk stands for.
+
+    Canonical chunks with duplicates list every source ("sources", canonical
+    first); other chunks only represent themselves.
+    """
+    return metadata.get("sources") or [_source_entry(metadata)]
+
+
+def _set_chunk_sources(
+    metadata: Dict[str, Any], sources: List[Dict[str, Any]]
+) -> None:
+    """Store sources và owners of a canonical chunk in its metadata."""
+    if len(sources) <= 1:
+        metadata.pop("sources", None)
+        metadata.pop("owners", None)
+        return
+
+    metadata["sources"] = sources
+    metadata["owners"] = sorted(
+        {
+            str(source[key]).lower()
+            for source in sources
+            for key in _OWNER_KEYS
+            if source.get(key) and str(source[key]).lower() != "unknown"
+        }
+    )
+
+
+def _source_matches(
+    source: Dict[str, Any],
+    topic_filter: Optional[str] = None,
+    category_filter: Optional[str] = None,
+    user_filter: Optional[str] = None,
+) -> bool:
+    """Whether one source satisfies the filters (same rules as the facet index)."""
+    topic = str(source.get("topic", "")).lower()
+    if topic_filter and topic_filter.lower() not in topic:
+        return False
+
+    category = str(source.get("category", "")).lower()
+    if category_filter and category != category_filter.lower():
+        return False
+
+    owners = {str(source.get(key, "")).lower() for key in _OWNER_KEYS}
+    return not user_filter or user_filter.lower() in owners
+
+
+def select_chunk_source(
+    metadata: Dict[str, Any],
+    topic_filter: Optional[str] = None,
+    category_filter: Optional[str] = None,
+    user_filter: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Source reported for a hit: the first copy matching every active filter,
+    else the canonical.
+    """
+    sources = get_chunk_sources(metadata)
+    if topic_filter or category_filter or user_filter:
+        for source in sources:
+            if _source_matches(source, topic_filter, category_filter, user_filter):
+                return source
+    return sources[0]
+
+
+def create_embeddings(embedding_model: str) -> HuggingFaceEmbeddings:
+    """HuggingFace embedding model (normalized, EMBEDDING_DEVICE)."""
+    return HuggingFaceEmbeddings(
+        model_name=embedding_model,
+        model_kwargs={"device": get_embedding_device()},
+        encode_kwargs={"normalize_embeddings": True},
+    )
+
+
+def create_embedding_cache(
+    persist_directory: str,
+) -> Optional[PersistentEmbeddingCache]:
+    """Persistent chunk embedding cache (survives clear_index/rebuilds)."""
+    if os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() != "true":
+        return None
+
+    cache_path = os.getenv("EMBEDDING_CACHE_PATH") or (
+        os.path.normpath(persist_directory) + "_embeddings.sqlite"
+    )
+    try:
+        return PersistentEmbeddingCache(cache_path)
+    except Exception as e:
+        logger.warning(f"Embedding cache disabled ({cache_path}): {e}")
+        return None
+
+
+class ReadWriteLock:
+    """Cho phép nhiều searches chạy song song, index mutations chạy độc quyền."""
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+
+    @contextmanager
+    def read(self):
+        with self._condition:
+            while self._writer:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._condition:
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
 
 class LangChainVectorStore:
     """
@@ -26,6 +206,14 @@ class LangChainVectorStore:
         self,
         embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2",
         persist_directory: str = "faiss_db",
+        query_cache_size: Optional[int] = None,
+        query_cache_ttl: Optional[float] = None,
+        embedding_pipeline: Optional[EmbeddingPipeline] = None,
+        index_type: Optional[str] = None,
+        read_only: Optional[bool] = None,
+        embeddings: Optional[HuggingFaceEmbeddings] = None,
+        query_cache: Optional[QueryEmbeddingCache] = None,
+        chunker: Optional[Chunker] = None,
     ):
         """
         Initialize LangChain FAISS vector store.
@@ -33,23 +221,91 @@ class LangChainVectorStore:
         Args:
             embedding_model: HuggingFace embedding model name
             persist_directory: Directory to save FAISS index
+            query_cache_size: Max cached query embeddings
+                (default: QUERY_EMBEDDING_CACHE_SIZE env or 1024, 0 disables)
+            query_cache_ttl: Query embedding TTL in seconds
+                (default: QUERY_EMBEDDING_CACHE_TTL env or 3600)
+            embedding_pipeline: Batched embedding stage for index builds
+                (default: configured từ EMBEDDING_* env vars, với persistent
+                embedding cache next to persist_directory unless
+                EMBEDDING_CACHE_ENABLED=false)
+            index_type: FAISS index built by build_from_documents - flat, hnsw,
+                ivf, ivfpq or sq8 (default: FAISS_INDEX_TYPE env or "flat")
+            read_only: Serve a persisted index without updates: index.faiss và
+                chunk_docstore.bin are mmapped so worker processes share one
+                page cache copy (default: RAG_READ_ONLY_INDEX env or false)
+            embeddings: Shared embedding model (e.g. across index partitions)
+            query_cache: Shared query embedding cache (overrides query_cache_*)
+            chunker: Chunking stage for new/changed documents (default:
+                RAG_CHUNK_* env, token sizes from the embedding tokenizer)
         """
         self.embedding_model_name = embedding_model
         self.persist_directory = persist_directory
+        self.index_type = index_type or get_index_type()
+        self.read_only = (
+            read_only
+            if read_only is not None
+            else os.getenv("RAG_READ_ONLY_INDEX", "false").lower() == "true"
+        )
 
         # Initialize embeddings (lightweight operation)
-        self.embeddings = HuggingFaceEmbeddings(
+        self.embeddings = embeddings or create_embeddings(embedding_model)
+
+        # Explicit batched embedding stage (optional multi-process fan-out)
+        self.embedding_pipeline = embedding_pipeline or EmbeddingPipeline(
             model_name=embedding_model,
-            model_kwargs={"device": "cpu"},
-            encode_kwargs={"normalize_embeddings": True},
+            embed_documents=self.embeddings.embed_documents,
+            cache=create_embedding_cache(persist_directory),
         )
 
+        # LRU cache of query embeddings (normalized query + model name)
+        self.query_cache = query_cache or QueryEmbeddingCache(
+            max_size=(
+                query_cache_size
+                if query_cache_size is not None
+                else int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+            ),
+            ttl_seconds=(
+                query_cache_ttl
+                if query_cache_ttl is not None
+                else float(os.getenv("QUERY_EMBEDDING_CACHE_TTL", "3600"))
+            ),
+        )
+
+        # Chunking stage; the config an index was built with is persisted
+        self.chunker = chunker or Chunker(get_chunking_config(embedding_model))
+        self.index_chunking: Optional[Dict[str, Any]] = None
+
         # Vector store instance (lazy initialized)
         self.vectorstore: Optional[FAISS] = None
         self.is_loaded = False
 
-        # Document metadata storage
-        self.documents: Dict[str, SummaryDocument] = {}
+        # Document metadata storage (chunk_id -> document_id + parent content)
+        self.documents = ChunkMetadataStore()
+
+        # Duplicate chunks are not embedded: duplicate chunk id -> canonical id
+        self.deduplicator = get_deduplicator()
+        self.duplicate_of: Dict[str, str] = {}
+
+        # Incremental update state: document_id -> docstore ids / content hash
+        self.document_chunks: Dict[str, List[str]] = {}
+        self.content_hashes: Dict[str, str] = {}
+
+        # Searches share the read lock; writers serialize on _update_lock and
+        # only take the write lock to swap/mutate the in-memory index
+        self._rw_lock = ReadWriteLock()
+        self._update_lock = threading.RLock()
+
+        # Facet value -> FAISS ids, rebuilt lazily after index mutations
+        self._facet_index: Optional[Dict[str, Dict[str, np.ndarray]]] = None
+        # Docstore id -> FAISS id (lexical hits -> vectors), rebuilt lazily
+        self._faiss_ids: Optional[Dict[str, int]] = None
+
+        # BM25 index over chunk texts (hybrid retrieval), keyed by docstore id
+        self.lexical_index = self._new_lexical_index()
+
+        # Bumped on every index build/load/mutation (cache invalidation)
+        self.index_version = 0
 
     def load_or_create_index(self, json_path: str, force_rebuild: bool = False) -> None:
         """
@@ -67,19 +323,10 @@ class LangChainVectorStore:
         )
 
         if index_exists and not force_rebuild:
-            # Load existing index (FAST!)
+            # Load existing index (FAST!) - same state as load_from_disk:
+            # search parameters, BM25 index, incremental update state
             try:
-                logger.info("Loading existing FAISS index from disk...")
-                self.vectorstore = FAISS.load_local(
-                    self.persist_directory,
-                    self.embeddings,
-                    allow_dangerous_deserialization=True,  # Required for FAISS loading
-                )
-
-                # Load document metadata
-                self._load_document_metadata()
-
-                self.is_loaded = True
+                self.load_from_disk()
                 logger.info(
                     f"✅ FAISS index loaded successfully! Documents: {len(self.documents)}"
                 )
@@ -91,82 +338,684 @@ class LangChainVectorStore:
         # Create new index từ documents
         self._build_new_index(json_path)
 
-    def build_from_documents(self, documents: List[Dict[str, Any]]) -> None:
+    def _new_lexical_index(self) -> BM25Index:
+        """Create empty BM25 index (LEXICAL_FOLD_DIACRITICS env, default true)."""
+        return BM25Index(
+            fold=os.getenv("LEXICAL_FOLD_DIACRITICS", "true").lower() == "true"
+        )
+
+    def build_from_documents(self, documents: Iterable[Dict[str, Any]]) -> None:
         """
         Build FAISS index from document list (for MongoDB integration).
 
+        Args:
+            documents: Documents with 'content' and 'metadata' fields
+                (list or lazily streamed iterator)
+        """
+        self._ensure_writable()
+        logger.info("Building new FAISS index from documents...")
+
+        with self._update_lock:
+            document_count = 0
+            # Convert to LangChain documents với chunking
+            langchain_docs = []
+            chunk_entries: Dict[str, Any] = {}
+            document_chunks: Dict[str, List[str]] = {}
+            content_hashes: Dict[str, str] = {}
+            deduplicator = get_deduplicator()
+            duplicate_of: Dict[str, str] = {}
+            duplicate_sources: Dict[str, List[Dict[str, Any]]] = {}
+
+            for doc in documents:
+                document_count += 1
+                doc_id, chunk_docs = self._chunk_document(doc)
+                if not chunk_docs:
+                    continue
+
+                canonical_chunks, duplicates = self._deduplicate_chunks(
+                    chunk_docs, deduplicator, duplicate_of
+                )
+                langchain_docs.extend(canonical_chunks)
+                for canonical_id, sources in duplicates.items():
+                    duplicate_sources.setdefault(canonical_id, []).extend(sources)
+
+                chunk_entries.update(self._build_chunk_entries(doc, chunk_docs))
+                document_chunks[doc_id] = [
+                    chunk.metadata["chunk_id"] for chunk in chunk_docs
+                ]
+                content_hashes[doc_id] = self._compute_content_hash(doc)
+
+            if not document_count:
+                raise ValueError("No documents provided")
+            if not langchain_docs:
+                raise ValueError("No valid chunks created from documents")
+
+            self._attach_duplicate_sources(langchain_docs, duplicate_sources)
+            logger.info(
+                f"Created {len(langchain_docs)} chunks from {document_count} documents"
+                f" ({len(duplicate_of)} duplicate chunks merged)"
+            )
+
+            # Embed theo batches, then build FAISS vectorstore
+            # (docstore ids = chunk ids for incremental updates)
+            logger.info("Creating embeddings and building FAISS index...")
+            texts = [chunk.page_content for chunk in langchain_docs]
+            vectors = self.embedding_pipeline.embed(texts)
+            vectorstore = FAISS(
+                embedding_function=self.embeddings,
+                index=create_index(self.index_type, vectors),
+                docstore=InMemoryDocstore(),
+                index_to_docstore_id={},
+            )
+            vectorstore.add_embeddings(
+                list(zip(texts, vectors)),
+                metadatas=[chunk.metadata for chunk in langchain_docs],
+                ids=[chunk.metadata["chunk_id"] for chunk in langchain_docs],
+            )
+
+            lexical_index = self._new_lexical_index()
+            for chunk in langchain_docs:
+                lexical_index.add(chunk.metadata["chunk_id"], chunk.page_content)
+
+            # Swap in the new index atomically for concurrent searches
+            with self._rw_lock.write():
+                self._mark_index_changed()
+                self.vectorstore = vectorstore
+                self.lexical_index = lexical_index
+                self.documents = ChunkMetadataStore()
+                self.documents.update(chunk_entries)
+                self.document_chunks = document_chunks
+                self.content_hashes = content_hashes
+                self.deduplicator = deduplicator
+                self.duplicate_of = duplicate_of
+                self.index_chunking = self.chunker.config.model_dump()
+                self.is_loaded = True
+
+            # Save to disk
+            self._save_index()
+
+        logger.info(f"✅ FAISS index built and saved with {len(langchain_docs)} chunks")
+
+    def upsert_documents(
+        self, documents: Iterable[Dict[str, Any]]
+    ) -> Dict[str, int]:
+        """
+        Add new documents and re-embed changed ones, skipping unchanged content.
+
         Args:
             documents: List of documents with 'content' and 'metadata' fields
+
+        Returns:
+            Counters of added, updated and unchanged documents
         """
-        logger.info(f"Building new FAISS index from {len(documents)} documents...")
+        if self.vectorstore is None:
+            raise RuntimeError(
+                "Vector store not initialized. Call build_from_documents or load_from_disk first."
+            )
+        self._ensure_writable()
 
-        if not documents:
-            raise ValueError("No documents provided")
+        with self._update_lock:
+            stats = {"added": 0, "updated": 0, "unchanged": 0}
+            changed_docs: List[Tuple[Dict[str, Any], str]] = []
+            stale_ids: List[str] = []
 
-        # Convert to LangChain documents với chunking
-        langchain_docs = []
-        self.documents = {}
+            for doc in documents:
+                doc_id = self._get_document_id(doc)
+                content_hash = self._compute_content_hash(doc)
+
+                if self.content_hashes.get(doc_id) == content_hash:
+                    stats["unchanged"] += 1
+                    continue
 
-        # Text splitter for chunking
-        text_splitter = CharacterTextSplitter(
-            chunk_size=200, chunk_overlap=50, separator=". "
+                if doc_id in self.document_chunks:
+                    stale_ids.extend(self.document_chunks[doc_id])
+                    stats["updated"] += 1
+                else:
+                    stats["added"] += 1
+
+                changed_docs.append((doc, content_hash))
+
+            if not changed_docs:
+                return stats
+
+            # Chunk, dedup and embed outside the write lock so searches keep
+            # running; stale chunks leave their duplicate groups first. Dedup
+            # changes are staged and committed with the chunks they describe
+            deduplicator = StagedDeduplicator(self.deduplicator)
+            duplicate_of: Dict[str, Optional[str]] = {}
+            removed_sources, promoted = self._detach_chunks(
+                stale_ids, deduplicator, duplicate_of
+            )
+            new_chunks: List[Document] = list(promoted.values())
+            chunk_entries: Dict[str, Any] = {}
+            document_chunks: Dict[str, List[str]] = {}
+            duplicate_sources: Dict[str, List[Dict[str, Any]]] = {}
+            for doc, content_hash in changed_docs:
+                doc_id, chunk_docs = self._chunk_document(doc)
+                canonical_chunks, duplicates = self._deduplicate_chunks(
+                    chunk_docs, deduplicator, duplicate_of
+                )
+                new_chunks.extend(canonical_chunks)
+                for canonical_id, sources in duplicates.items():
+                    duplicate_sources.setdefault(canonical_id, []).extend(sources)
+
+                chunk_entries.update(self._build_chunk_entries(doc, chunk_docs))
+                document_chunks[doc_id] = [
+                    chunk.metadata["chunk_id"] for chunk in chunk_docs
+                ]
+
+            # Duplicates of chunks embedded now are stored before the add,
+            # duplicates of indexed chunks are applied under the write lock
+            self._attach_duplicate_sources(new_chunks, duplicate_sources)
+            embeddings = self.embedding_pipeline.embed(
+                [chunk.page_content for chunk in new_chunks]
+            )
+            term_counts = [
+                self.lexical_index.analyze(chunk.page_content) for chunk in new_chunks
+            ]
+
+            with self._rw_lock.write():
+                self._mark_index_changed()
+                # Drop outdated chunks first (chunk ids are reused)
+                self._remove_chunks(stale_ids)
+                self._add_chunks(new_chunks, embeddings, term_counts)
+                self._update_chunk_sources(removed_sources, duplicate_sources)
+                self._commit_dedup_changes(deduplicator, duplicate_of)
+
+                self.documents.update(chunk_entries)
+                self.document_chunks.update(document_chunks)
+                self.content_hashes.update(
+                    {
+                        self._get_document_id(doc): content_hash
+                        for doc, content_hash in changed_docs
+                    }
+                )
+
+            self._save_index()
+
+        logger.info(
+            f"Incremental upsert: {stats['added']} added, {stats['updated']} updated, "
+            f"{stats['unchanged']} unchanged ({len(new_chunks)} chunks embedded)"
         )
+        return stats
+
+    def delete_documents(self, document_ids: List[str]) -> int:
+        """
+        Remove documents and all their chunks from the index.
+
+        Args:
+            document_ids: IDs of documents to remove
+
+        Returns:
+            Number of documents removed
+        """
+        if self.vectorstore is None:
+            raise RuntimeError(
+                "Vector store not initialized. Call build_from_documents or load_from_disk first."
+            )
+        self._ensure_writable()
+
+        with self._update_lock:
+            stale_ids = [
+                chunk_id
+                for doc_id in document_ids
+                for chunk_id in self.document_chunks.get(doc_id, [])
+            ]
+            removed = sum(
+                1 for doc_id in document_ids if doc_id in self.document_chunks
+            )
 
-        for doc in documents:
-            content = doc.get("content", "").strip()
-            metadata = doc.get("metadata", {})
+            # Canonical chunks still shared by other documents are re-keyed
+            # to a remaining duplicate (embedded outside the write lock)
+            deduplicator = StagedDeduplicator(self.deduplicator)
+            duplicate_of: Dict[str, Optional[str]] = {}
+            removed_sources, promoted = self._detach_chunks(
+                stale_ids, deduplicator, duplicate_of
+            )
+            promoted_chunks = list(promoted.values())
+            embeddings = self.embedding_pipeline.embed(
+                [chunk.page_content for chunk in promoted_chunks]
+            )
+            term_counts = [
+                self.lexical_index.analyze(chunk.page_content)
+                for chunk in promoted_chunks
+            ]
 
-            if not content or len(content) < 10:
+            with self._rw_lock.write():
+                self._mark_index_changed()
+                for doc_id in document_ids:
+                    self.document_chunks.pop(doc_id, None)
+                    self.content_hashes.pop(doc_id, None)
+
+                if not removed:
+                    return 0
+
+                self._remove_chunks(stale_ids)
+                self._add_chunks(promoted_chunks, embeddings, term_counts)
+                self._update_chunk_sources(removed_sources, {})
+                self._commit_dedup_changes(deduplicator, duplicate_of)
+
+            self._save_index()
+
+        logger.info(f"Deleted {removed} documents ({len(stale_ids)} chunks)")
+        return removed
+
+    def sync_documents(self, documents: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        Make the index mirror the given document set.
+
+        Documents missing from the set are deleted, changed ones re-embedded
+        and unchanged ones left untouched.
+
+        Args:
+            documents: Complete set of source documents (consumed once, so a
+                streamed iterator works)
+
+        Returns:
+            Counters of added, updated, unchanged and deleted documents
+        """
+        with self._update_lock:
+            current_ids = set()
+
+            def track_ids(docs: Iterable[Dict[str, Any]]):
+                for doc in docs:
+                    current_ids.add(self._get_document_id(doc))
+                    yield doc
+
+            stats = self.upsert_documents(track_ids(documents))
+
+            removed_ids = [
+                doc_id for doc_id in self.document_chunks if doc_id not in current_ids
+            ]
+            stats["deleted"] = (
+                self.delete_documents(removed_ids) if removed_ids else 0
+            )
+            return stats
+
+    def get_document_ids(self, prefix: str = "") -> List[str]:
+        """Get indexed document IDs, optionally filtered by prefix."""
+        with self._rw_lock.read():
+            return [
+                doc_id for doc_id in self.document_chunks if doc_id.startswith(prefix)
+            ]
+
+    def _chunk_document(self, doc: Dict[str, Any]) -> Tuple[str, List[Document]]:
+        """Split one source document into LangChain chunk documents."""
+        content = doc.get("content", "").strip()
+        metadata = doc.get("metadata", {})
+        doc_id = self._get_document_id(doc)
+
+        if not content or len(content) < 10:
+            return doc_id, []
+
+        chunk_docs = []
+        for i, chunk in enumerate(self.chunker.split(content, metadata)):
+            if len(chunk.strip()) < 10:
                 continue
 
-            # Split text into chunks
-            chunks = text_splitter.split_text(content)
+            # Create unique chunk ID
+            chunk_id = f"{doc_id}_chunk_{i}"
 
-            for i, chunk in enumerate(chunks):
-                if len(chunk.strip()) < 10:
-                    continue
+            # Create LangChain document
+            langchain_doc = Document(
+                page_content=chunk,
+                metadata={
+                    "chunk_id": chunk_id,
+                    "document_id": doc_id,
+                    "chunk_index": i,
+                    "topic": metadata.get("topic", "Unknown"),
+                    "category": metadata.get("category", "Unknown"),
+                    **metadata,
+                },
+            )
+            chunk_docs.append(langchain_doc)
+
+        return doc_id, chunk_docs
+
+    def _build_chunk_entries(
+        self, doc: Dict[str, Any], chunk_docs: List[Document]
+    ) -> Dict[str, Any]:
+        """Build chunk_id -> metadata entries stored for retrieval."""
+        content = doc.get("content", "").strip()
+        # chunk_text/metadata already live in the FAISS docstore
+        return {
+            chunk.metadata["chunk_id"]: {
+                "document_id": chunk.metadata["document_id"],
+                "content": content,  # Original full content
+            }
+            for chunk in chunk_docs
+        }
 
-                # Create unique chunk ID
-                doc_id = metadata.get("id", f"doc_{len(self.documents)}")
-                chunk_id = f"{doc_id}_chunk_{i}"
-
-                # Create LangChain document
-                langchain_doc = Document(
-                    page_content=chunk,
-                    metadata={
-                        "chunk_id": chunk_id,
-                        "document_id": doc_id,
-                        "chunk_index": i,
-                        "topic": metadata.get("topic", "Unknown"),
-                        "category": metadata.get("category", "Unknown"),
-                        **metadata,
-                    },
+    def _deduplicate_chunks(
+        self,
+        chunk_docs: List[Document],
+        deduplicator: Union[ChunkDeduplicator, StagedDeduplicator],
+        duplicate_of: Dict[str, Optional[str]],
+    ) -> Tuple[List[Document], Dict[str, List[Dict[str, Any]]]]:
+        """
+        Split chunks into new canonical chunks and duplicates of known ones.
+
+        New canonical chunks are registered in the deduplicator and
+        duplicates in duplicate_of (a new index's, or staged changes).
+
+        Returns:
+            (canonical chunks to embed, canonical id -> source entries of
+            its new duplicates)
+        """
+        if not deduplicator.enabled:
+            return chunk_docs, {}
+
+        canonical_chunks: List[Document] = []
+        duplicates: Dict[str, List[Dict[str, Any]]] = {}
+        for chunk in chunk_docs:
+            chunk_id = chunk.metadata["chunk_id"]
+            fingerprint = deduplicator.fingerprint(chunk.page_content)
+            canonical_id = deduplicator.find(fingerprint)
+            if canonical_id is None:
+                deduplicator.add(chunk_id, fingerprint)
+                canonical_chunks.append(chunk)
+            else:
+                duplicate_of[chunk_id] = canonical_id
+                duplicates.setdefault(canonical_id, []).append(
+                    _source_entry(chunk.metadata)
                 )
+        return canonical_chunks, duplicates
 
-                langchain_docs.append(langchain_doc)
+    def _attach_duplicate_sources(
+        self,
+        chunks: List[Document],
+        duplicate_sources: Dict[str, List[Dict[str, Any]]],
+    ) -> None:
+        """Move sources of duplicates of not-yet-indexed chunks into their metadata."""
+        for chunk in chunks:
+            sources = duplicate_sources.pop(chunk.metadata["chunk_id"], None)
+            if sources:
+                _set_chunk_sources(
+                    chunk.metadata, get_chunk_sources(chunk.metadata) + sources
+                )
 
-                # Store for retrieval
-                self.documents[chunk_id] = {
-                    "content": content,  # Original full content
-                    "chunk_text": chunk,
-                    "metadata": langchain_doc.metadata,
-                }
+    def _detach_chunks(
+        self,
+        chunk_ids: List[str],
+        deduplicator: StagedDeduplicator,
+        duplicate_of: Dict[str, Optional[str]],
+    ) -> Tuple[Dict[str, Set[str]], Dict[str, Document]]:
+        """
+        Remove chunks about to be deleted from their duplicate groups.
 
-        if not langchain_docs:
-            raise ValueError("No valid chunks created from documents")
+        A deleted canonical chunk that still has other sources is replaced by
+        its first remaining source (same text, that source's metadata).
+        Nothing is changed in place: dedup changes are staged in deduplicator
+        and duplicate_of (chunk id -> canonical id, None = drop).
 
-        logger.info(
-            f"Created {len(langchain_docs)} chunks from {len(documents)} documents"
+        Returns:
+            (canonical id -> deleted duplicate ids to drop from its sources,
+            deleted canonical id -> replacement chunk to embed)
+        """
+        stale = set(chunk_ids)
+        removed_sources: Dict[str, Set[str]] = {}
+        promoted: Dict[str, Document] = {}
+
+        for chunk_id in chunk_ids:
+            canonical_id = self.duplicate_of.get(chunk_id)
+            duplicate_of[chunk_id] = None
+            if canonical_id is not None:
+                if canonical_id not in stale:
+                    removed_sources.setdefault(canonical_id, set()).add(chunk_id)
+                continue
+
+            doc = self.vectorstore.docstore.search(chunk_id)
+            if not isinstance(doc, Document):
+                continue
+
+            # Only canonical chunks with duplicates have other sources (the
+            # docstore id of a legacy chunk is not its chunk id)
+            remaining = [
+                source
+                for source in doc.metadata.get("sources", [])
+                if source["chunk_id"] not in stale
+            ]
+            if not remaining:
+                deduplicator.remove(chunk_id)
+                continue
+
+            new_id = remaining[0]["chunk_id"]
+            metadata = dict(remaining[0])
+            _set_chunk_sources(metadata, remaining)
+            promoted[chunk_id] = Document(
+                page_content=doc.page_content, metadata=metadata
+            )
+            deduplicator.rename(chunk_id, new_id)
+            duplicate_of[new_id] = None
+            for source in remaining[1:]:
+                duplicate_of[source["chunk_id"]] = new_id
+
+        return removed_sources, promoted
+
+    def _commit_dedup_changes(
+        self,
+        deduplicator: StagedDeduplicator,
+        duplicate_of: Dict[str, Optional[str]],
+    ) -> None:
+        """Apply staged dedup changes once their chunks are indexed (write lock)."""
+        deduplicator.commit()
+        for chunk_id, canonical_id in duplicate_of.items():
+            if canonical_id is None:
+                self.duplicate_of.pop(chunk_id, None)
+            else:
+                self.duplicate_of[chunk_id] = canonical_id
+
+    def _add_chunks(
+        self,
+        chunks: List[Document],
+        embeddings: np.ndarray,
+        term_counts: List[Dict[str, int]],
+    ) -> None:
+        """Add embedded chunks to the FAISS và BM25 indexes."""
+        if not chunks:
+            return
+
+        self.vectorstore.add_embeddings(
+            [(chunk.page_content, vector) for chunk, vector in zip(chunks, embeddings)],
+            metadatas=[chunk.metadata for chunk in chunks],
+            ids=[chunk.metadata["chunk_id"] for chunk in chunks],
         )
+        for chunk, counts in zip(chunks, term_counts):
+            self.lexical_index.add_terms(chunk.metadata["chunk_id"], counts)
 
-        # Create FAISS vectorstore
-        logger.info("Creating embeddings and building FAISS index...")
-        self.vectorstore = FAISS.from_documents(langchain_docs, self.embeddings)
+    def _update_chunk_sources(
+        self,
+        removed_sources: Dict[str, Set[str]],
+        added_sources: Dict[str, List[Dict[str, Any]]],
+    ) -> None:
+        """Update sources/owners of indexed canonical chunks (under write lock)."""
+        for chunk_id in set(removed_sources) | set(added_sources):
+            doc = self.vectorstore.docstore.search(chunk_id)
+            if not isinstance(doc, Document):
+                continue
 
-        # Save to disk
-        self._save_index()
+            removed = removed_sources.get(chunk_id, set())
+            sources = [
+                source
+                for source in get_chunk_sources(doc.metadata)
+                if source["chunk_id"] not in removed
+            ]
+            _set_chunk_sources(doc.metadata, sources + added_sources.get(chunk_id, []))
+
+    def _ensure_writable(self) -> None:
+        """Reject index updates in read-only serving mode."""
+        if self.read_only:
+            raise RuntimeError(
+                "Vector store is read-only (RAG_READ_ONLY_INDEX=true); "
+                "rebuild the index from a writer process"
+            )
 
-        logger.info(f"✅ FAISS index built and saved with {len(langchain_docs)} chunks")
+    def _mark_index_changed(self) -> None:
+        """Invalidate derived search state after the index changed."""
+        self._facet_index = None
+        self._faiss_ids = None
+        self.index_version += 1
+
+    def _get_document_id(self, doc: Dict[str, Any]) -> str:
+        """
+        Get stable document ID from a source document.
+
+        Documents without an id are keyed by source collection + content, so
+        the id is the same across runs and distinct within a batch.
+        """
+        metadata = doc.get("metadata", {})
+        doc_id = metadata.get("id") or doc.get("id")
+        if doc_id:
+            return str(doc_id)
+
+        payload = f"{metadata.get('source', '')}\0{doc.get('content', '').strip()}"
+        return "doc_" + hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+    def _compute_content_hash(self, doc: Dict[str, Any]) -> str:
+        """Hash content and stable metadata to detect changed documents."""
+        metadata = {
+            key: value
+            for key, value in doc.get("metadata", {}).items()
+            if key not in VOLATILE_METADATA_KEYS
+        }
+        payload = json.dumps(
+            {"content": doc.get("content", "").strip(), "metadata": metadata},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _remove_chunks(self, chunk_ids: List[str]) -> None:
+        """Remove chunk vectors và metadata from the index."""
+        indexed_ids = set(self.vectorstore.index_to_docstore_id.values())
+        existing = [chunk_id for chunk_id in chunk_ids if chunk_id in indexed_ids]
+        if existing:
+            if supports_remove_ids(self.vectorstore.index):
+                self.vectorstore.delete(existing)
+            else:
+                self._compact_index(existing)
+
+        for chunk_id in chunk_ids:
+            self.documents.pop(chunk_id, None)
+            self.lexical_index.remove(chunk_id)
+
+    def _compact_index(self, chunk_ids: List[str]) -> None:
+        """Remove chunks from HNSW/IVF indexes by re-adding the remaining vectors."""
+        vectorstore = self.vectorstore
+        removed = set(chunk_ids)
+        keep = [
+            (faiss_id, docstore_id)
+            for faiss_id, docstore_id in sorted(
+                vectorstore.index_to_docstore_id.items()
+            )
+            if docstore_id not in removed
+        ]
+
+        vectorstore.index = compact_index(
+            vectorstore.index,
+            np.asarray([faiss_id for faiss_id, _ in keep], dtype=np.int64),
+        )
+        vectorstore.index_to_docstore_id = {
+            position: docstore_id for position, (_, docstore_id) in enumerate(keep)
+        }
+        vectorstore.docstore.delete(chunk_ids)
+
+    def _rebuild_document_chunks(self) -> None:
+        """Rebuild document_id -> chunk ids và duplicate maps from the docstore."""
+        self.document_chunks = {}
+        self.duplicate_of = {}
+        for docstore_id in self.vectorstore.index_to_docstore_id.values():
+            doc = self.vectorstore.docstore.search(docstore_id)
+            if not isinstance(doc, Document):
+                continue
+
+            if not doc.metadata.get("sources"):
+                # Chunk without duplicates: legacy indexes use UUID docstore
+                # ids, so map the document to the docstore id itself
+                doc_id = doc.metadata.get("document_id")
+                if doc_id:
+                    self.document_chunks.setdefault(doc_id, []).append(docstore_id)
+                continue
+
+            for source in doc.metadata["sources"]:
+                doc_id = source.get("document_id")
+                chunk_id = source.get("chunk_id", docstore_id)
+                if doc_id:
+                    self.document_chunks.setdefault(doc_id, []).append(chunk_id)
+                if chunk_id != docstore_id:
+                    self.duplicate_of[chunk_id] = docstore_id
+
+    def _load_dedup_index(self) -> None:
+        """Load deduplicator state, re-fingerprinting indexed chunks if needed."""
+        deduplicator = get_deduplicator()
+        try:
+            loaded = deduplicator.load(self.persist_directory)
+        except Exception as e:
+            logger.warning(f"Failed to load dedup index: {e}")
+            loaded = False
+
+        if loaded and len(deduplicator) == len(self.vectorstore.index_to_docstore_id):
+            self.deduplicator = deduplicator
+        else:
+            self._rebuild_dedup_index()
+
+    def _rebuild_dedup_index(self) -> None:
+        """Register every indexed chunk as canonical (legacy or stale dedup state)."""
+        deduplicator = get_deduplicator()
+        if deduplicator.enabled:
+            for docstore_id in self.vectorstore.index_to_docstore_id.values():
+                doc = self.vectorstore.docstore.search(docstore_id)
+                if isinstance(doc, Document):
+                    deduplicator.add(
+                        docstore_id, deduplicator.fingerprint(doc.page_content)
+                    )
+            logger.info(f"Built dedup index for {len(deduplicator)} chunks")
+        self.deduplicator = deduplicator
+
+    def _save_index_state(self) -> None:
+        """Save content hashes và chunking config used by incremental updates."""
+        state_path = os.path.join(self.persist_directory, "index_state.json")
+        temp_path = state_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "content_hashes": self.content_hashes,
+                    "chunking": self.index_chunking,
+                },
+                f,
+            )
+        os.replace(temp_path, state_path)
+
+    def _load_index_state(self) -> None:
+        """Load incremental update state for the loaded index."""
+        self._rebuild_document_chunks()
+        self._load_dedup_index()
+        self.index_chunking = None
+
+        state_path = os.path.join(self.persist_directory, "index_state.json")
+        if not os.path.exists(state_path):
+            # Legacy index: every document will be re-embedded once on next sync
+            self.content_hashes = {}
+            return
+
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self.content_hashes = {
+                doc_id: content_hash
+                for doc_id, content_hash in state.get("content_hashes", {}).items()
+                if doc_id in self.document_chunks
+            }
+            self.index_chunking = state.get("chunking")
+        except Exception as e:
+            logger.warning(f"Failed to load index state: {e}")
+            self.content_hashes = {}
+
+    def needs_rechunk(self) -> bool:
+        """True if the loaded index was chunked with another (or unknown) config."""
+        current = self.chunker.config.model_dump()
+        return self.is_loaded and self.index_chunking != current
 
     def load_from_disk(self) -> None:
         """Load existing FAISS index from disk."""
@@ -180,15 +1029,84 @@ class LangChainVectorStore:
             raise FileNotFoundError(f"FAISS index not found: {index_file}")
 
         logger.info("Loading existing FAISS index from disk...")
-        self.vectorstore = FAISS.load_local(
-            self.persist_directory,
-            self.embeddings,
-            allow_dangerous_deserialization=True,
-        )
+        vectorstore = None
+        if self.read_only:
+            vectorstore = self._load_mmapped_vectorstore(index_file)
+        if vectorstore is None:
+            vectorstore = FAISS.load_local(
+                self.persist_directory,
+                self.embeddings,
+                allow_dangerous_deserialization=True,
+            )
+        self.vectorstore = vectorstore
+        configure_search(self.vectorstore.index)
+        self._mark_index_changed()
 
         # Load document metadata
         self._load_document_metadata()
-        logger.info("✅ FAISS index loaded from disk")
+        if not self.read_only:
+            # Incremental update state is only needed by writers
+            self._load_index_state()
+        self._load_lexical_index()
+        self.is_loaded = True
+        logger.info(
+            "✅ FAISS index loaded from disk"
+            + (" (read-only, mmapped)" if self.read_only else "")
+        )
+
+    def _load_mmapped_vectorstore(self, index_file: str) -> Optional[FAISS]:
+        """
+        Open index.faiss và chunk_docstore.bin via mmap (read-only serving).
+
+        Returns:
+            FAISS vectorstore, or None for indexes saved without chunk_docstore.bin
+        """
+        docstore = MmapDocstore.load(self.persist_directory)
+        if docstore is None:
+            logger.warning(
+                "chunk_docstore.bin not found - loading index.pkl (not shared)"
+            )
+            return None
+
+        index = read_index_mmapped(index_file)
+        if index.ntotal != len(docstore):
+            docstore.close()
+            raise ValueError(
+                f"chunk_docstore.bin has {len(docstore)} chunks, "
+                f"index.faiss has {index.ntotal} vectors"
+            )
+
+        return FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=docstore.index_to_docstore_id,
+        )
+
+    def _load_lexical_index(self) -> None:
+        """Load persisted BM25 index, or rebuild it from the docstore (legacy index)."""
+        try:
+            lexical_index = BM25Index.load(self.persist_directory)
+        except Exception as e:
+            logger.warning(f"Failed to load lexical index: {e}")
+            lexical_index = None
+
+        if lexical_index is None:
+            self._rebuild_lexical_index()
+            return
+
+        self.lexical_index = lexical_index
+
+    def _rebuild_lexical_index(self) -> None:
+        """Rebuild BM25 index from chunk texts in the FAISS docstore."""
+        lexical_index = self._new_lexical_index()
+        for docstore_id in self.vectorstore.index_to_docstore_id.values():
+            doc = self.vectorstore.docstore.search(docstore_id)
+            if isinstance(doc, Document):
+                lexical_index.add(docstore_id, doc.page_content)
+
+        self.lexical_index = lexical_index
+        logger.info(f"Built lexical index for {len(lexical_index)} chunks")
 
     def search_documents(
         self,
@@ -196,15 +1114,26 @@ class LangChainVectorStore:
         top_k: int = 5,
         similarity_threshold: float = 0.0,
         topic_filter: Optional[str] = None,
+        category_filter: Optional[str] = None,
+        user_filter: Optional[str] = None,
+        retrieval_mode: str = "vector",
+        rrf_k: int = 60,
     ) -> List[Dict[str, Any]]:
         """
-        Search documents using vector similarity.
+        Search documents using vector similarity, BM25 or both (hybrid).
+
+        Filters are resolved to FAISS ids before the search, so filtered
+        queries still return up to top_k matching chunks in one pass.
 
         Args:
             query: Search query
             top_k: Number of results to return
             similarity_threshold: Minimum similarity score
-            topic_filter: Filter by topic (optional)
+            topic_filter: Filter by topic, substring match (optional)
+            category_filter: Filter by category (optional)
+            user_filter: Filter by owner email or user ID (optional)
+            retrieval_mode: "vector", "lexical" or "hybrid" (RRF fusion)
+            rrf_k: Reciprocal Rank Fusion constant (hybrid mode)
 
         Returns:
             List of search results with metadata
@@ -215,13 +1144,31 @@ class LangChainVectorStore:
             )
 
         try:
-            # Perform similarity search with scores
-            docs_with_scores = self.vectorstore.similarity_search_with_score(
-                query, k=top_k
-            )
+            query_vector = self.embed_query(query).reshape(1, -1)
+
+            # Perform filtered similarity search with scores
+            with self._rw_lock.read():
+                allowed_ids = self._resolve_filter_ids(
+                    topic_filter, category_filter, user_filter
+                )
+                if retrieval_mode == "vector":
+                    hits = self._search_vectors(query_vector, top_k, allowed_ids)
+                else:
+                    hits = self._search_hybrid(
+                        query, query_vector, top_k, allowed_ids, retrieval_mode, rrf_k
+                    )
+
+                docs_with_scores = []
+                for faiss_id, score in hits:
+                    docstore_id = self.vectorstore.index_to_docstore_id[faiss_id]
+                    doc = self.vectorstore.docstore.search(docstore_id)
+                    docs_with_scores.append((doc, score))
 
             results = []
             for doc, score in docs_with_scores:
+                if not isinstance(doc, Document):
+                    continue
+
                 # Convert distance to similarity (FAISS returns L2 distance)
                 similarity_score = 1.0 / (1.0 + score)
 
@@ -229,22 +1176,24 @@ class LangChainVectorStore:
                 if similarity_score < similarity_threshold:
                     continue
 
-                # Apply topic filter
-                doc_topic = doc.metadata.get("topic", "")
-                if topic_filter and topic_filter.lower() not in doc_topic.lower():
-                    continue
-
-                # Get full document info
-                chunk_id = doc.metadata.get("chunk_id", "")
+                # Get full document info (of the caller's copy for duplicates)
+                source = select_chunk_source(
+                    doc.metadata,
+                    topic_filter=topic_filter,
+                    category_filter=category_filter,
+                    user_filter=user_filter,
+                )
+                chunk_id = source.get("chunk_id", "")
                 doc_info = self.documents.get(chunk_id, {})
 
                 result = {
-                    "id": doc.metadata.get("document_id", ""),
+                    "id": source.get("document_id", ""),
                     "chunk_id": chunk_id,
+                    "chunk_index": source.get("chunk_index"),
                     "content": doc_info.get("content", doc.page_content),
                     "chunk_text": doc.page_content,
-                    "topic": doc.metadata.get("topic", "Unknown"),
-                    "category": doc.metadata.get("category", "Unknown"),
+                    "topic": source.get("topic", "Unknown"),
+                    "category": source.get("category", "Unknown"),
                     "similarity_score": similarity_score,
                     "tags": doc.metadata.get("tags", []),
                     "metadata": doc.metadata,
@@ -258,14 +1207,227 @@ class LangChainVectorStore:
             logger.error(f"Error in document search: {e}")
             return []
 
+    def embed_query(self, query: str) -> np.ndarray:
+        """Embed a search query, served from the LRU cache when possible."""
+        return self.query_cache.get_or_compute(
+            self.embedding_model_name, query, self.embeddings.embed_query
+        )
+
+    def _search_vectors(
+        self, query_vector: np.ndarray, top_k: int, allowed_ids: Optional[np.ndarray]
+    ) -> List[Tuple[int, float]]:
+        """
+        Run FAISS search restricted to allowed ids.
+
+        Uses an IDSelector when the index supports it, otherwise over-fetches
+        adaptively until top_k allowed hits are found.
+
+        Returns:
+            List of (faiss_id, distance) ordered by distance
+        """
+        index = self.vectorstore.index
+        if index.ntotal == 0:
+            return []
+
+        if allowed_ids is None:
+            distances, ids = index.search(query_vector, min(top_k, index.ntotal))
+            return [(int(i), float(d)) for i, d in zip(ids[0], distances[0]) if i != -1]
+
+        if len(allowed_ids) == 0:
+            return []
+
+        k = min(top_k, len(allowed_ids))
+
+        # Approximate indexes only visit probed lists / graph nodes: small
+        # filtered sets are searched exactly on their stored vectors
+        if not is_exact(index) and len(allowed_ids) <= int(
+            os.getenv("FAISS_EXACT_FILTER_LIMIT", "4096")
+        ):
+            return search_subset(index, query_vector, allowed_ids, k)
+
+        try:
+            params = search_parameters(index, faiss.IDSelectorBatch(allowed_ids))
+            distances, ids = index.search(query_vector, k, params=params)
+            return [(int(i), float(d)) for i, d in zip(ids[0], distances[0]) if i != -1]
+        except (TypeError, RuntimeError) as e:
+            logger.debug(f"IDSelector not supported ({e}), over-fetching instead")
+
+        # Fallback: adaptive over-fetch với post-filtering
+        allowed = set(allowed_ids.tolist())
+        fetch_k = min(index.ntotal, max(k * 4, 16))
+        while True:
+            distances, ids = index.search(query_vector, fetch_k)
+            hits = [
+                (int(i), float(d))
+                for i, d in zip(ids[0], distances[0])
+                if i != -1 and int(i) in allowed
+            ]
+            if len(hits) >= k or fetch_k >= index.ntotal:
+                return hits[:k]
+            fetch_k = min(index.ntotal, fetch_k * 4)
+
+    def _search_hybrid(
+        self,
+        query: str,
+        query_vector: np.ndarray,
+        top_k: int,
+        allowed_ids: Optional[np.ndarray],
+        retrieval_mode: str,
+        rrf_k: int,
+    ) -> List[Tuple[int, float]]:
+        """
+        BM25 search, fused với vector search via RRF in hybrid mode.
+
+        Returns:
+            List of (faiss_id, distance) in fused rank order; distances of
+            lexical-only hits are computed from the stored vectors
+        """
+        index_to_docstore_id = self.vectorstore.index_to_docstore_id
+        faiss_ids = self._get_faiss_ids()
+
+        # Over-fetch candidates from both retrievers before fusion
+        candidates = top_k if retrieval_mode == "lexical" else max(top_k * 4, 20)
+        allowed_chunks = (
+            None
+            if allowed_ids is None
+            else {index_to_docstore_id[int(i)] for i in allowed_ids}
+        )
+        lexical_ranking = [
+            faiss_ids[chunk_id]
+            for chunk_id, _ in self.lexical_index.search(
+                query, candidates, allowed_chunks
+            )
+            if chunk_id in faiss_ids
+        ]
+
+        if retrieval_mode == "lexical":
+            distances: Dict[int, float] = {}
+            ranked = lexical_ranking
+        else:
+            vector_hits = self._search_vectors(query_vector, candidates, allowed_ids)
+            distances = dict(vector_hits)
+            fused = reciprocal_rank_fusion(
+                [[faiss_id for faiss_id, _ in vector_hits], lexical_ranking], k=rrf_k
+            )
+            ranked = [faiss_id for faiss_id, _ in fused[:top_k]]
+
+        return [
+            (
+                faiss_id,
+                distances[faiss_id]
+                if faiss_id in distances
+                else self._vector_distance(query_vector, faiss_id),
+            )
+            for faiss_id in ranked
+        ]
+
+    def _vector_distance(self, query_vector: np.ndarray, faiss_id: int) -> float:
+        """Squared L2 distance between the query and a stored vector."""
+        try:
+            vector = self.vectorstore.index.reconstruct(int(faiss_id))
+        except RuntimeError:
+            return float("inf")
+        return float(np.sum((query_vector[0] - vector) ** 2))
+
+    def _get_faiss_ids(self) -> Dict[str, int]:
+        """Docstore id -> FAISS id map (lazily rebuilt after index mutations)."""
+        faiss_ids = self._faiss_ids
+        if faiss_ids is None:
+            index_to_docstore_id = self.vectorstore.index_to_docstore_id
+            faiss_ids = {
+                docstore_id: faiss_id
+                for faiss_id, docstore_id in index_to_docstore_id.items()
+            }
+            self._faiss_ids = faiss_ids
+        return faiss_ids
+
+    def _resolve_filter_ids(
+        self,
+        topic_filter: Optional[str] = None,
+        category_filter: Optional[str] = None,
+        user_filter: Optional[str] = None,
+    ) -> Optional[np.ndarray]:
+        """
+        Resolve metadata filters to the FAISS ids that satisfy all of them.
+
+        Returns:
+            Sorted int64 id array, or None when no filter is set
+        """
+        if not (topic_filter or category_filter or user_filter):
+            return None
+
+        facets = self._get_facet_index()
+        selected: Optional[np.ndarray] = None
+
+        def intersect(ids: np.ndarray) -> None:
+            nonlocal selected
+            selected = ids if selected is None else np.intersect1d(selected, ids)
+
+        if topic_filter:
+            # Topic filter keeps substring semantics
+            needle = topic_filter.lower()
+            matches = [
+                ids for value, ids in facets["topic"].items() if needle in value
+            ]
+            intersect(np.unique(np.concatenate(matches)) if matches else _EMPTY_IDS)
+
+        if category_filter:
+            intersect(facets["category"].get(category_filter.lower(), _EMPTY_IDS))
+
+        if user_filter:
+            intersect(facets["user"].get(user_filter.lower(), _EMPTY_IDS))
+
+        return selected
+
+    def _get_facet_index(self) -> Dict[str, Dict[str, np.ndarray]]:
+        """Build (lazily) facet value -> FAISS id arrays for filtered search."""
+        facet_index = self._facet_index
+        if facet_index is not None:
+            return facet_index
+
+        buckets: Dict[str, Dict[str, List[int]]] = {
+            "topic": {},
+            "category": {},
+            "user": {},
+        }
+        for faiss_id, docstore_id in self.vectorstore.index_to_docstore_id.items():
+            doc = self.vectorstore.docstore.search(docstore_id)
+            if not isinstance(doc, Document):
+                continue
+
+            # Canonical chunks match the facets of every source they stand for
+            for source in get_chunk_sources(doc.metadata):
+                buckets["topic"].setdefault(
+                    str(source.get("topic", "")).lower(), []
+                ).append(faiss_id)
+                buckets["category"].setdefault(
+                    str(source.get("category", "")).lower(), []
+                ).append(faiss_id)
+                for owner_key in _OWNER_KEYS:
+                    owner = source.get(owner_key)
+                    if owner:
+                        buckets["user"].setdefault(str(owner).lower(), []).append(
+                            faiss_id
+                        )
+
+        facet_index = {
+            facet: {
+                value: np.unique(np.asarray(ids, dtype=np.int64))
+                for value, ids in values.items()
+            }
+            for facet, values in buckets.items()
+        }
+        self._facet_index = facet_index
+        return facet_index
+
     def clear_cache(self) -> None:
         """Clear any cached data."""
-        # For FAISS, we don't have explicit cache to clear
-        # But we can reset documents dict if needed
+        self.query_cache.clear()
         logger.info("Vector store cache cleared")
 
     def _build_new_index(self, json_path: str) -> None:
         """Build new FAISS index từ JSON documents."""
+        self._ensure_writable()
         logger.info("Building new FAISS index from documents...")
 
         if not os.path.exists(json_path):
@@ -285,12 +1447,7 @@ class LangChainVectorStore:
 
         # Convert to LangChain documents với chunking
         langchain_docs = []
-        self.documents = {}
-
-        # Text splitter for chunking
-        text_splitter = CharacterTextSplitter(
-            chunk_size=200, chunk_overlap=50, separator=". "
-        )
+        self.documents = ChunkMetadataStore()
 
         logger.info(f"Processing {len(raw_documents)} documents...")
 
@@ -309,7 +1466,9 @@ class LangChainVectorStore:
             self.documents[summary_doc.id] = summary_doc
 
             # Split document into chunks
-            chunks = text_splitter.split_text(summary_doc.content)
+            chunks = self.chunker.split(
+                summary_doc.content, {"category": summary_doc.category}
+            )
 
             # Create LangChain documents for each chunk
             for i, chunk_text in enumerate(chunks):
@@ -338,9 +1497,18 @@ class LangChainVectorStore:
 
         # Create FAISS vectorstore (memory intensive operation)
         logger.info("Building FAISS index... (this may take a while)")
+        # Docstore ids = chunk ids, like build_from_documents (incremental updates)
         self.vectorstore = FAISS.from_documents(
-            documents=langchain_docs, embedding=self.embeddings
+            documents=langchain_docs,
+            embedding=self.embeddings,
+            ids=[doc.metadata["chunk_id"] for doc in langchain_docs],
         )
+        self.index_chunking = self.chunker.config.model_dump()
+        self.content_hashes = {}
+        self._mark_index_changed()
+        self._rebuild_document_chunks()
+        self._rebuild_lexical_index()
+        self._rebuild_dedup_index()
 
         # Save to disk for future use
         self._save_index()
@@ -355,189 +1523,62 @@ class LangChainVectorStore:
             os.makedirs(self.persist_directory, exist_ok=True)
 
             # Save FAISS index
-            self.vectorstore.save_local(self.persist_directory)
-
-            # Save document metadata
-            metadata_path = os.path.join(
-                self.persist_directory, "documents_metadata.json"
-            )
-            with open(metadata_path, "w", encoding="utf-8") as f:
-                serializable_docs = {}
-                for doc_id, doc in self.documents.items():
-                    try:
-                        # Handle both dict and Pydantic model
-                        if hasattr(doc, "model_dump"):
-                            doc_dict = doc.model_dump()
-                        elif isinstance(doc, dict):
-                            doc_dict = dict(doc)
-                        else:
-                            # Convert object to dict
-                            doc_dict = {
-                                key: getattr(doc, key)
-                                for key in dir(doc)
-                                if not key.startswith("_")
-                                and not callable(getattr(doc, key))
-                            }
-
-                        # Convert any datetime objects to ISO format recursively
-                        def serialize_datetime(obj):
-                            if isinstance(obj, dict):
-                                return {
-                                    key: serialize_datetime(value)
-                                    for key, value in obj.items()
-                                }
-                            elif isinstance(obj, list):
-                                return [serialize_datetime(item) for item in obj]
-                            elif obj is None:
-                                return None
-                            elif hasattr(obj, "isoformat"):
-                                try:
-                                    return obj.isoformat()
-                                except Exception:
-                                    return str(obj)
-                            else:
-                                return obj
-
-                        doc_dict = serialize_datetime(doc_dict)
-
-                        # STRONG validation and cleanup document dictionary
-                        def fix_document_fields(doc):
-                            """Fix all problematic fields in document"""
-                            fixed_doc = {}
-                            for key, value in doc.items():
-                                try:
-                                    # Fix created_at specifically
-                                    if key == "created_at":
-                                        if value is None or value == "":
-                                            fixed_doc[key] = datetime.now().isoformat()
-                                        elif isinstance(value, str):
-                                            fixed_doc[key] = value
-                                        elif hasattr(value, "isoformat"):
-                                            fixed_doc[key] = value.isoformat()
-                                        else:
-                                            fixed_doc[key] = datetime.now().isoformat()
-                                    # Fix metadata recursively
-                                    elif key == "metadata" and isinstance(value, dict):
-                                        fixed_meta = {}
-                                        for k, v in value.items():
-                                            if v is not None:
-                                                if k == "created_at" and (
-                                                    v is None or v == ""
-                                                ):
-                                                    fixed_meta[k] = (
-                                                        datetime.now().isoformat()
-                                                    )
-                                                else:
-                                                    fixed_meta[k] = v
-                                        fixed_doc[key] = fixed_meta
-                                    # Fix other fields
-                                    else:
-                                        if value is not None:
-                                            fixed_doc[key] = value
-                                except Exception as field_error:
-                                    logger.warning(
-                                        f"Skipping problematic field {key}: {field_error}"
-                                    )
-                                    continue
-                            return fixed_doc
-
-                        doc_dict = fix_document_fields(doc_dict)
-
-                        # Final validation - ensure created_at exists
-                        if "created_at" not in doc_dict or not doc_dict["created_at"]:
-                            doc_dict["created_at"] = datetime.now().isoformat()
-
-                        serializable_docs[doc_id] = doc_dict
-
-                    except Exception as doc_error:
-                        logger.warning(
-                            f"Failed to serialize document {doc_id}: {doc_error}"
-                        )
-                        # Skip this document and continue
-                        continue
-
-                # Try to write JSON with error handling and validation
-                try:
-                    # Final validation before writing
-                    validated_docs = {}
-                    for doc_id, doc_data in serializable_docs.items():
-                        try:
-                            # Test if this document can be JSON serialized
-                            json.dumps(doc_data)
-                            validated_docs[doc_id] = doc_data
-                        except Exception as validate_error:
-                            logger.warning(
-                                f"Skipping document {doc_id} due to serialization error: {validate_error}"
-                            )
-                            # Create a safe fallback version
-                            validated_docs[doc_id] = {
-                                "content": str(doc_data.get("content", ""))[
-                                    :500
-                                ],  # Truncate if too long
-                                "chunk_text": str(doc_data.get("chunk_text", ""))[:200],
-                                "metadata": {
-                                    "error": "serialization_failed",
-                                    "original_error": str(validate_error)[:100],
-                                },
-                            }
-
-                    json.dump(validated_docs, f, ensure_ascii=False, indent=2)
-                    f.flush()  # Force write to disk
-                    logger.info(
-                        f"Successfully saved {len(validated_docs)} documents to metadata file"
-                    )
+            self._save_faiss_files()
+            write_chunk_docstore(
+                self.persist_directory,
+                self.vectorstore.index_to_docstore_id,
+                self.vectorstore.docstore,
+            )
+            self._save_index_state()
+            self.lexical_index.save(self.persist_directory)
+            if self.deduplicator.enabled:
+                self.deduplicator.save(self.persist_directory)
 
-                except Exception as json_error:
-                    logger.error(f"Critical JSON write error: {json_error}")
-                    # Last resort: write minimal safe data
-                    f.seek(0)
-                    f.truncate()
-                    safe_docs = {
-                        "error": "critical_serialization_failure",
-                        "timestamp": datetime.now().isoformat(),
-                        "total_documents": len(self.documents),
-                    }
-                    json.dump(safe_docs, f, ensure_ascii=False, indent=2)
-                    f.flush()
+            # Save document metadata (compact binary store, atomic write)
+            self.documents.save(self.persist_directory)
+
+            # Legacy JSON metadata has been converted to the binary store
+            legacy_path = os.path.join(
+                self.persist_directory, LEGACY_METADATA_FILENAME
+            )
+            if os.path.exists(legacy_path):
+                os.remove(legacy_path)
 
             logger.info(
-                f"Index saved to: {self.persist_directory} with {len(serializable_docs)} documents"
+                f"Index saved to: {self.persist_directory} with {len(self.documents)} documents"
             )
 
         except Exception as e:
             logger.error(f"Failed to save index: {e}")
-            # Clean up corrupted metadata file if it exists
-            try:
-                metadata_path = os.path.join(
-                    self.persist_directory, "documents_metadata.json"
-                )
-                if os.path.exists(metadata_path):
-                    os.remove(metadata_path)
-                    logger.info("Removed corrupted metadata file")
-            except:
-                pass
             raise
 
-    def _load_document_metadata(self) -> None:
-        """Load document metadata từ disk."""
-        metadata_path = os.path.join(self.persist_directory, "documents_metadata.json")
+    def _save_faiss_files(self) -> None:
+        """
+        Write index.faiss và index.pkl atomically.
 
-        if not os.path.exists(metadata_path):
-            logger.warning("No document metadata found")
-            return
+        Both are written under temp names, fsynced, then moved into place,
+        so a crash mid-save never leaves a truncated index (workers mapping
+        the old index.faiss keep their inode).
+        """
+        temp_name = f".index.tmp{os.getpid()}"
+        self.vectorstore.save_local(self.persist_directory, index_name=temp_name)
+        for extension in ("faiss", "pkl"):
+            temp_path = os.path.join(
+                self.persist_directory, f"{temp_name}.{extension}"
+            )
+            with open(temp_path, "rb") as f:
+                os.fsync(f.fileno())
+            os.replace(
+                temp_path, os.path.join(self.persist_directory, f"index.{extension}")
+            )
 
+    def _load_document_metadata(self) -> None:
+        """Load document metadata từ disk (lazy, mmapped)."""
         try:
-            with open(metadata_path, "r", encoding="utf-8") as f:
-                serializable_docs = json.load(f)
-
-            for doc_id, doc_data in serializable_docs.items():
-                doc_data["created_at"] = datetime.fromisoformat(doc_data["created_at"])
-                self.documents[doc_id] = SummaryDocument(**doc_data)
-
-            logger.info(f"Loaded metadata for {len(self.documents)} documents")
-
+            self.documents = ChunkMetadataStore.load(self.persist_directory)
         except Exception as e:
             logger.error(f"Failed to load document metadata: {e}")
+            self.documents = ChunkMetadataStore()
 
     def search(self, query: str, config: RetrievalConfig) -> List[RetrievedDocument]:
         """
@@ -559,52 +1600,38 @@ class LangChainVectorStore:
             return []
 
         try:
-            # Perform similarity search with scores
-            results = self.vectorstore.similarity_search_with_score(
-                query=query, k=config.top_k
+            # Filters are resolved before the FAISS search (search_documents),
+            # so filtered queries still get up to top_k results
+            results = self.search_documents(
+                query=query,
+                top_k=config.top_k,
+                similarity_threshold=config.similarity_threshold,
+                topic_filter=config.topic_filter,
+                category_filter=config.category_filter,
+                user_filter=config.user_filter,
+                retrieval_mode=config.retrieval_mode,
+                rrf_k=config.rrf_k,
             )
 
             retrieved_docs = []
-
-            for doc, score in results:
-                # Convert score to similarity (FAISS returns distance, lower = more similar)
-                similarity_score = 1 / (1 + score)  # Convert distance to similarity
-
-                # Apply similarity threshold
-                if similarity_score < config.similarity_threshold:
-                    continue
-
-                # Apply filters if specified
-                if (
-                    config.user_filter
-                    and doc.metadata.get("user_id") != config.user_filter
-                ):
-                    continue
-                if (
-                    config.topic_filter
-                    and doc.metadata.get("topic") != config.topic_filter
-                ):
-                    continue
-
-                retrieved_doc = RetrievedDocument(
-                    document_id=doc.metadata["document_id"],
-                    chunk_id=doc.metadata["chunk_id"],
-                    content=doc.page_content,
-                    topic=doc.metadata["topic"],
-                    category=doc.metadata["category"],
-                    similarity_score=similarity_score,
-                    tags=(
-                        doc.metadata.get("tags", "").split(",")
-                        if doc.metadata.get("tags")
-                        else []
-                    ),
+            for result in results:
+                tags = result.get("tags") or []
+                if isinstance(tags, str):
+                    tags = tags.split(",")
+
+                retrieved_docs.append(
+                    RetrievedDocument(
+                        document_id=result["id"],
+                        chunk_id=result["chunk_id"],
+                        chunk_index=result.get("chunk_index"),
+                        content=result["chunk_text"],
+                        topic=result["topic"],
+                        category=result["category"],
+                        similarity_score=result["similarity_score"],
+                        tags=tags,
+                    )
                 )
 
-                retrieved_docs.append(retrieved_doc)
-
-            # Sort by similarity score (descending)
-            retrieved_docs.sort(key=lambda x: x.similarity_score, reverse=True)
-
             return retrieved_docs
 
         except Exception as e:
@@ -618,12 +1645,24 @@ class LangChainVectorStore:
             "persist_directory": self.persist_directory,
             "embedding_model": self.embedding_model_name,
             "total_documents": len(self.documents),
+            "query_cache": self.query_cache.get_stats(),
+            "embedding_pipeline": self.embedding_pipeline.get_stats(),
+            "index_version": self.index_version,
+            "index_type": self.index_type,
+            "read_only": self.read_only,
+            "chunking": self.chunker.config.model_dump(),
+            "lexical_index": self.lexical_index.get_stats(),
+            "deduplication": {
+                **self.deduplicator.get_stats(),
+                "duplicate_chunks": len(self.duplicate_of),
+            },
         }
 
         if self.is_loaded and self.vectorstore:
             stats.update(
                 {
                     "total_vectors": self.vectorstore.index.ntotal,
+                    "index_type": describe_index(self.vectorstore.index),
                     "embedding_dimension": self.vectorstore.index.d,
                     "index_size_mb": self._get_index_size_mb(),
                 }
@@ -654,17 +1693,30 @@ class LangChainVectorStore:
 
     def clear_index(self) -> None:
         """Clear persisted index."""
+        self._ensure_writable()
         try:
             if os.path.exists(self.persist_directory):
                 shutil.rmtree(self.persist_directory)
                 logger.info("FAISS index cleared")
 
             self.vectorstore = None
+            self._mark_index_changed()
             self.is_loaded = False
-            self.documents = {}
+            self.documents = ChunkMetadataStore()
+            self.lexical_index = self._new_lexical_index()
+            self.document_chunks = {}
+            self.content_hashes = {}
+            self.deduplicator = get_deduplicator()
+            self.duplicate_of = {}
 
         except Exception as e:
             logger.error(f"Failed to clear index: {e}")
 
 
-__all__ = ["LangChainVectorStore"]
+__all__ = [
+    "LangChainVectorStore",
+    "create_embeddings",
+    "create_embedding_cache",
+    "get_chunk_sources",
+    "select_chunk_source",
+]